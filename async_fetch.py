@@ -0,0 +1,125 @@
+"""Asynchronous bulk fetch engine for the scraper layer.
+
+`afetch_many` schedules many URLs on an asyncio loop and yields `(url, html)` as each
+page completes. Every URL goes through `rpa_scraper.fetch_html`, so results share the
+memory/disk caches and keep the per-URL Playwright fallback; the blocking transport
+runs on a bounded thread pool whose size is the concurrency limit.
+
+`fetch_many` is the synchronous wrapper for scripts that are not async; `iterate` does
+the same for any async generator. `afetch_many_rendered` is the browser counterpart,
+rendering many pages concurrently in one Playwright browser.
+"""
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Callable, Iterable, Iterator, Optional, Tuple
+
+import http_client
+
+
+async def afetch_many(urls: Iterable[str], concurrency: int = 8, timeout: int = 10,
+                      use_cache: bool = True) -> AsyncIterator[Tuple[str, Optional[str]]]:
+    """Fetch `urls` concurrently and yield `(url, html)` in completion order.
+
+    Duplicate URLs are fetched once. A URL whose fetch (including fallback) fails
+    yields `(url, None)` so one bad page does not abort the batch.
+    """
+    from rpa_scraper import fetch_html
+
+    todo = list(dict.fromkeys(u for u in urls if u))
+    if not todo:
+        return
+    concurrency = max(1, min(int(concurrency), len(todo)))
+    if concurrency > http_client.get_pool_size():
+        http_client.set_pool_size(concurrency)
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def one(u):
+        try:
+            html = await loop.run_in_executor(executor, partial(fetch_html, u, timeout=timeout, use_cache=use_cache))
+        except Exception:
+            html = None
+        return u, html
+
+    tasks = [asyncio.ensure_future(one(u)) for u in todo]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for t in tasks:
+            t.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+_DONE = object()
+
+
+def iterate(make_agen: Callable[[], AsyncIterator]) -> Iterator:
+    """Drive the async generator returned by `make_agen()` on a private event loop thread
+    and yield its items here, so synchronous scripts can use the async batch APIs.
+
+    Leaving the loop early (break, exception, or the generator being closed) cancels the
+    async generator, so no further requests are started for the rest of the batch.
+    """
+    results: 'queue.Queue' = queue.Queue()
+    stop = threading.Event()
+    running = {}
+
+    async def drain():
+        running['loop'] = asyncio.get_running_loop()
+        running['task'] = asyncio.current_task()
+        if stop.is_set():
+            return
+        agen = make_agen()
+        try:
+            async for item in agen:
+                results.put(item)
+                if stop.is_set():
+                    break
+        finally:
+            await agen.aclose()
+
+    def run():
+        try:
+            asyncio.run(drain())
+        except BaseException as e:
+            results.put(e)
+        finally:
+            results.put(_DONE)
+
+    threading.Thread(target=run, name='async_fetch', daemon=True).start()
+    try:
+        while True:
+            item = results.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        loop, task = running.get('loop'), running.get('task')
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass  # the loop already finished
+
+
+def fetch_many(urls: Iterable[str], concurrency: int = 8, timeout: int = 10,
+               use_cache: bool = True) -> Iterator[Tuple[str, Optional[str]]]:
+    """Synchronous wrapper around `afetch_many`: a generator of `(url, html)` as pages complete."""
+    return iterate(lambda: afetch_many(urls, concurrency=concurrency, timeout=timeout, use_cache=use_cache))
+
+
+async def afetch_many_rendered(urls: Iterable[str], wait_for: str = None, timeout: int = 15000,
+                               pages: int = None, use_cache: bool = True) -> AsyncIterator[Tuple[str, Optional[str]]]:
+    """Browser-rendered counterpart of `afetch_many` (see rpa_playwright.arender_many)."""
+    from rpa_playwright import arender_many
+
+    async for item in arender_many(urls, wait_for=wait_for, timeout=timeout, pages=pages, use_cache=use_cache):
+        yield item
@@ -0,0 +1,120 @@
+"""Structured data embedded in SofaScore pages.
+
+SofaScore is a Next.js app: every page carries its initial state as JSON in
+`<script id="__NEXT_DATA__" type="application/json">`. Decoding that payload once is
+both faster and more reliable than walking the DOM and guessing labels, so the
+match-page and team-stat helpers in rpa_scraper read it first and only fall back
+to the text heuristics when it is missing.
+
+The mappers (`event_info`, `team_stats`) work on any SofaScore JSON, so the same
+code also handles API responses.
+"""
+import json
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, Optional
+
+_NEXT_DATA_RE = re.compile(
+    r'<script[^>]*\bid=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+_JSON_SCRIPT_RE = re.compile(
+    r'<script[^>]*\btype=["\']application/json["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+
+
+def extract_state(html: str) -> Optional[Dict[str, Any]]:
+    """Decode the embedded page state (`__NEXT_DATA__`, else the largest JSON script block)."""
+    if not html:
+        return None
+    m = _NEXT_DATA_RE.search(html)
+    candidates = [m.group(1)] if m else sorted(
+        (b.group(1) for b in _JSON_SCRIPT_RE.finditer(html)), key=len, reverse=True)
+    for raw in candidates:
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def iter_dicts(obj: Any, pred: Callable[[dict], bool] = None) -> Iterator[dict]:
+    """Yield every nested dict (depth-first, document order) for which `pred` holds."""
+    stack = [obj]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, dict):
+            if pred is None or pred(cur):
+                yield cur
+            stack.extend(reversed(list(cur.values())))
+        elif isinstance(cur, list):
+            stack.extend(reversed(cur))
+
+
+def find_event(state: Any) -> Optional[dict]:
+    """The first object that looks like a SofaScore event (has homeTeam and awayTeam)."""
+    for d in iter_dicts(state, lambda d: 'homeTeam' in d and 'awayTeam' in d):
+        return d
+    return None
+
+
+def team_url(team: dict) -> Optional[str]:
+    if not team or not team.get('slug') or team.get('id') is None:
+        return None
+    return f"https://www.sofascore.com/football/team/{team['slug']}/{team['id']}"
+
+
+def event_info(event: Optional[dict]) -> Dict[str, Any]:
+    """Map a SofaScore event object to id, local kickoff date (YYYY-MM-DD), teams, team URLs and score."""
+    if not event:
+        return {}
+    home = event.get('homeTeam') or {}
+    away = event.get('awayTeam') or {}
+    out: Dict[str, Any] = {'id': event.get('id'), 'home': home.get('name'), 'away': away.get('name'),
+                           'home_url': team_url(home), 'away_url': team_url(away),
+                           'status': (event.get('status') or {}).get('type')}
+    ts = event.get('startTimestamp')
+    if isinstance(ts, (int, float)):
+        # local calendar date, like the date.today() filters in runner and the scripts
+        out['date'] = datetime.fromtimestamp(ts).date().isoformat()
+    hs = (event.get('homeScore') or {}).get('current')
+    as_ = (event.get('awayScore') or {}).get('current')
+    if isinstance(hs, int) and isinstance(as_, int):
+        out['score'] = (hs, as_)
+    tour = event.get('tournament') or {}
+    if tour.get('name'):
+        out['tournament'] = tour['name']
+    return out
+
+
+# SofaScore season-statistics counters -> per-game keys used by the analyzer
+_TOTALS = {
+    'goalsScored': 'goals_per_game',
+    'corners': 'corners_per_game',
+    'shots': 'shots_per_game',
+    'fouls': 'fouls_per_game',
+}
+_AVERAGES = {
+    'averageGoals': 'goals_per_game',
+    'averageCorners': 'corners_per_game',
+    'averageShots': 'shots_per_game',
+}
+
+
+def team_stats(state: Any) -> Dict[str, float]:
+    """Per-game averages from the first statistics object carrying match totals or averages."""
+    def looks_like_stats(d):
+        return ('matches' in d and any(k in d for k in _TOTALS)) or any(k in d for k in _AVERAGES)
+
+    for stats in iter_dicts(state, looks_like_stats):
+        out: Dict[str, float] = {}
+        for key, name in _AVERAGES.items():
+            if isinstance(stats.get(key), (int, float)):
+                out[name] = round(float(stats[key]), 2)
+        matches = stats.get('matches')
+        if isinstance(matches, (int, float)) and matches > 0:
+            for key, name in _TOTALS.items():
+                if name not in out and isinstance(stats.get(key), (int, float)):
+                    out[name] = round(stats[key] / matches, 2)
+        if out:
+            return out
+    return {}
@@ -0,0 +1,232 @@
+"""Local index of a tournament's fixtures (event id -> URL, kickoff, teams, status).
+
+Keeping only today's/tomorrow's games used to mean fetching every match page of the
+league (300-400 URLs) just to read its date. The index is built once from a
+tournament-level source and persisted as JSON, so date filtering becomes an
+in-memory query:
+
+- SofaScore API (preferred): every round of the season on the first build, then
+  only the next/last event pages on later refreshes (rescheduled games are updated
+  in place by event id).
+- League page fallback: events embedded in the page state, plus the league's match
+  links; only links not yet in the index have their match page fetched.
+
+A refresh is skipped while the index is younger than `max_age` seconds.
+
+    idx = get_index(league_url)
+    idx.refresh()
+    for fx in idx.on_dates({'2026-01-11'}): ...
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import embedded_state
+import http_cache
+import sofascore_api
+
+DEFAULT_DIR = os.path.join('data', 'fixtures')
+DEFAULT_MAX_AGE = 3600
+
+_dir = DEFAULT_DIR
+_max_age = DEFAULT_MAX_AGE
+
+
+class FixtureIndex:
+    def __init__(self, league_url: str, path: Optional[str] = None, max_age: float = DEFAULT_MAX_AGE):
+        self.league_url = league_url
+        self.ut_id, self.season_id = sofascore_api.tournament_ids_from_url(league_url)
+        self.path = path or os.path.join(_dir, self._file_name())
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.fixtures: Dict[str, Dict[str, Any]] = {}
+        # match page slug id (last URL segment, same in every language) -> fixture key
+        self._aliases: Dict[str, str] = {}
+        self.refreshed_at = 0.0
+        self.complete = False
+        self.counters = {'refreshes': 0, 'api_events': 0, 'pages_fetched': 0}
+        self.load()
+
+    def _file_name(self) -> str:
+        if self.ut_id:
+            return f"{self.ut_id}-{self.season_id or 'current'}.json"
+        return hashlib.sha1(http_cache.canonical_url(self.league_url).encode('utf-8')).hexdigest()[:16] + '.json'
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        self.fixtures = data.get('fixtures') or {}
+        for key, fx in self.fixtures.items():
+            self._alias(fx.get('url'), key)
+        self.refreshed_at = float(data.get('refreshed_at') or 0)
+        self.complete = bool(data.get('complete'))
+
+    def save(self):
+        with self._lock:
+            snapshot = json.dumps({'league_url': self.league_url, 'refreshed_at': self.refreshed_at,
+                                   'complete': self.complete, 'fixtures': self.fixtures},
+                                  ensure_ascii=False, indent=1)
+        d = os.path.dirname(self.path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            fh.write(snapshot)
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def _slug_id(url: Optional[str]) -> Optional[str]:
+        path = (url or '').split('#')[0].split('?')[0].rstrip('/')
+        return path.rsplit('/', 1)[-1] if '/match/' in path else None
+
+    def _alias(self, url: Optional[str], key: str):
+        sid = self._slug_id(url)
+        if sid:
+            self._aliases[sid] = key
+
+    @staticmethod
+    def _key(fx: Dict[str, Any]) -> Optional[str]:
+        if fx.get('id') is not None:
+            return str(fx['id'])
+        return http_cache.canonical_url(fx['url']) if fx.get('url') else None
+
+    def add(self, fx: Dict[str, Any]):
+        """Insert or update one fixture (a sofascore_api.fixture / event_info dict with 'url')."""
+        key = self._key(fx)
+        if not key:
+            return
+        fx = {k: (list(v) if isinstance(v, tuple) else v) for k, v in fx.items()}
+        fx['updated_at'] = time.time()
+        with self._lock:
+            old = self.fixtures.get(key) or {}
+            self.fixtures[key] = {**old, **{k: v for k, v in fx.items() if v is not None}}
+            self._alias(fx.get('url'), key)
+
+    def __len__(self):
+        return len(self.fixtures)
+
+    def __contains__(self, url: str) -> bool:
+        return self.lookup(url) is not None
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        eid = sofascore_api.event_id_from_url(url)
+        with self._lock:
+            if eid and eid in self.fixtures:
+                return self.fixtures[eid]
+            key = self._aliases.get(self._slug_id(url) or '')
+            return self.fixtures.get(key or http_cache.canonical_url(url))
+
+    def all(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(fx) for fx in self.fixtures.values()]
+
+    def on_dates(self, dates: Iterable[str]) -> List[Dict[str, Any]]:
+        """Fixtures whose local kickoff date is in `dates`, in kickoff order (no network)."""
+        dates = set(dates)
+        out = []
+        with self._lock:
+            items = list(self.fixtures.values())
+        for fx in items:
+            if fx.get('start'):
+                # recomputed so the stored date never disagrees with the local timezone
+                fx = {**fx, 'date': datetime.fromtimestamp(fx['start']).date().isoformat()}
+            if fx.get('date') in dates and fx.get('url'):
+                if isinstance(fx.get('score'), list):
+                    fx['score'] = tuple(fx['score'])
+                out.append(fx)
+        out.sort(key=lambda fx: (fx.get('start') or 0, fx.get('url')))
+        return out
+
+    def refresh(self, force: bool = False, workers: int = 8) -> int:
+        """Bring the index up to date; returns how many fixtures were added or updated."""
+        if not force and self.fixtures and time.time() - self.refreshed_at < self.max_age:
+            return 0
+        n = None
+        if self.ut_id and sofascore_api.preferred():
+            try:
+                n = self._refresh_api()
+            except Exception as e:
+                print(f"Índice de partidas: API indisponível ({e}); usando a página da liga.")
+        if n is None:
+            n = self._refresh_league_page(workers)
+        self.refreshed_at = time.time()
+        self.counters['refreshes'] += 1
+        self.save()
+        return n
+
+    def _refresh_api(self) -> int:
+        season = self.season_id or sofascore_api.current_season(self.ut_id)
+        if season is None:
+            raise LookupError(f"no season for tournament {self.ut_id}")
+        if self.complete:
+            # incremental: upcoming pages and the latest results cover what can change
+            evs = sofascore_api.season_events(self.ut_id, season, 'next', max_pages=3)
+            evs += sofascore_api.season_events(self.ut_id, season, 'last', max_pages=1)
+        else:
+            rs = sofascore_api.rounds(self.ut_id, season)
+            evs = sofascore_api.round_events(self.ut_id, season, rs['rounds'])
+            if not evs:
+                evs = sofascore_api.season_events(self.ut_id, season, 'next')
+                evs += sofascore_api.season_events(self.ut_id, season, 'last')
+            self.complete = bool(rs['rounds']) and bool(evs)
+        for ev in evs:
+            self.add(sofascore_api.fixture(ev))
+        self.counters['api_events'] += len(evs)
+        return len(evs)
+
+    def _refresh_league_page(self, workers: int) -> int:
+        from rpa_scraper import MatchPage, extract_match_urls_from_sofascore_league, fetch_html, fetch_many
+
+        n = 0
+        # events embedded in the league page state
+        state = embedded_state.extract_state(fetch_html(self.league_url))
+        for ev in embedded_state.iter_dicts(state, lambda d: 'homeTeam' in d and 'awayTeam' in d and 'startTimestamp' in d):
+            self.add(sofascore_api.fixture(ev))
+            n += 1
+
+        # league links: only match pages not indexed yet are fetched
+        urls = [u for u in extract_match_urls_from_sofascore_league(self.league_url, max_matches=400)
+                if '/football/' in u and u not in self]
+        for u, html in fetch_many(urls, concurrency=workers):
+            if not html:
+                continue
+            self.counters['pages_fetched'] += 1
+            page = MatchPage(u, html=html)
+            info = dict(page.info)
+            info['date'] = page.date
+            info['url'] = u
+            if info['date']:
+                self.add(info)
+                n += 1
+        return n
+
+
+_indexes: Dict[str, FixtureIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def configure_fixtures(cfg: Optional[Dict[str, Any]]):
+    """Apply a `fixture_index` config section: {path, max_age}."""
+    global _dir, _max_age
+    if not cfg:
+        return
+    _dir = cfg.get('path') or _dir
+    _max_age = float(cfg.get('max_age', _max_age))
+
+
+def get_index(league_url: str) -> FixtureIndex:
+    """Shared FixtureIndex for a league URL (loaded from disk on first use)."""
+    with _indexes_lock:
+        idx = _indexes.get(league_url)
+        if idx is None:
+            idx = _indexes[league_url] = FixtureIndex(league_url, max_age=_max_age)
+        return idx
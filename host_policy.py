@@ -0,0 +1,382 @@
+"""Per-host traffic policy shared by the requests and Playwright fetch paths.
+
+Each host gets a token bucket (steady `rate` requests/second with `burst` capacity)
+plus a cap on simultaneous in-flight requests. Worker threads wait for their turn
+instead of hitting a bookmaker all at once and tripping its bot protection.
+
+Limits come from config.local.yaml: a top-level `rate_limits` mapping
+(host -> {rate, burst, max_in_flight}, with an optional `default` entry) and/or a
+`rate_limit` block on any `sites` entry (applied to that site's host).
+
+The module also remembers, per host, which transport ('requests', 'playwright' or
+'api') actually works and how fast it is, so hosts that always block plain requests
+go straight to the browser. The table is persisted as JSON (`host_strategy.path`).
+
+Finally it holds the retry policy (jittered exponential backoff) and a circuit
+breaker per host: after repeated transient failures the host is failed fast for a
+cooling-off window instead of every page waiting out the full timeout.
+"""
+import atexit
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+
+class HostLimiter:
+    """Token bucket + in-flight semaphore for one host."""
+
+    def __init__(self, rate: float = 0, burst: int = 1, max_in_flight: int = 0):
+        self.rate = float(rate or 0)
+        self.burst = max(1, int(burst or 1))
+        self.max_in_flight = int(max_in_flight or 0)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_in_flight) if self.max_in_flight > 0 else None
+        self.counters = {'requests': 0, 'waited_s': 0.0, 'in_flight': 0, 'peak_in_flight': 0}
+
+    def _take_token(self) -> float:
+        # returns seconds to wait before a token is available (0 when one was taken)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        start = time.monotonic()
+        if self._slots is not None:
+            self._slots.acquire()
+        if self.rate > 0:
+            while True:
+                delay = self._take_token()
+                if delay <= 0:
+                    break
+                time.sleep(delay)
+        with self._lock:
+            c = self.counters
+            c['requests'] += 1
+            c['waited_s'] += time.monotonic() - start
+            c['in_flight'] += 1
+            c['peak_in_flight'] = max(c['peak_in_flight'], c['in_flight'])
+
+    def release(self):
+        with self._lock:
+            self.counters['in_flight'] -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+
+_limits: Dict[str, Dict[str, Any]] = {}
+_default_limit: Optional[Dict[str, Any]] = None
+_limiters: Dict[str, HostLimiter] = {}
+_lock = threading.Lock()
+
+
+def host_of(url: str) -> str:
+    host = (urlsplit(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def _settings_for(host: str) -> Optional[Dict[str, Any]]:
+    # exact host first, then parent domains (superbet.bet.br covers api.superbet.bet.br)
+    parts = host.split('.')
+    for i in range(len(parts) - 1):
+        cand = '.'.join(parts[i:])
+        if cand in _limits:
+            return _limits[cand]
+    return _default_limit
+
+
+def get_limiter(url: str) -> Optional[HostLimiter]:
+    host = host_of(url)
+    lim = _limiters.get(host)
+    if lim is not None:
+        return lim
+    settings = _settings_for(host)
+    if not settings:
+        return None
+    with _lock:
+        lim = _limiters.get(host)
+        if lim is None:
+            lim = HostLimiter(settings.get('rate', 0), settings.get('burst', 1),
+                              settings.get('max_in_flight', 0))
+            _limiters[host] = lim
+    return lim
+
+
+@contextmanager
+def limit(url: str):
+    """Hold a rate/concurrency slot for the URL's host for the duration of the block."""
+    lim = get_limiter(url)
+    if lim is None:
+        yield
+        return
+    lim.acquire()
+    try:
+        yield
+    finally:
+        lim.release()
+
+
+def set_host_limit(host: str, rate: float = 0, burst: int = 1, max_in_flight: int = 0):
+    """Configure limits for one host (e.g. 'betano.bet.br'); use host='default' for the fallback."""
+    global _default_limit
+    settings = {'rate': rate, 'burst': burst, 'max_in_flight': max_in_flight}
+    with _lock:
+        if host == 'default':
+            _default_limit = settings
+        else:
+            h = host.lower()
+            _limits[h[4:] if h.startswith('www.') else h] = settings
+        # limiters are rebuilt lazily with the new settings
+        _limiters.clear()
+
+
+def configure_limits(cfg: Dict[str, Any]):
+    """Load `rate_limits` and per-site `rate_limit` blocks from a config dict."""
+    for host, settings in (cfg.get('rate_limits') or {}).items():
+        if isinstance(settings, dict):
+            set_host_limit(host, **{k: settings[k] for k in ('rate', 'burst', 'max_in_flight') if k in settings})
+    for site in cfg.get('sites') or []:
+        settings = site.get('rate_limit')
+        if isinstance(settings, dict) and site.get('url'):
+            set_host_limit(host_of(site['url']),
+                           **{k: settings[k] for k in ('rate', 'burst', 'max_in_flight') if k in settings})
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-host request / wait counters, for run summaries."""
+    with _lock:
+        items = list(_limiters.items())
+    return {h: {**lim.counters, 'waited_s': round(lim.counters['waited_s'], 2)} for h, lim in items}
+
+
+# --- host capability memory -------------------------------------------------
+
+DEFAULT_STRATEGY_PATH = os.path.join('data', 'host_strategy.json')
+# weight of the newest observation in the success / latency moving averages
+_EWMA_ALPHA = 0.3
+# transports whose recent success rate is below this are tried last
+_MIN_SUCCESS = 0.5
+
+_strategy: Dict[str, Dict[str, Dict[str, Any]]] = {}
+_strategy_path: Optional[str] = None
+_strategy_dirty = False
+_reprobe_every = 20
+_decisions: Dict[str, int] = {}
+_strategy_lock = threading.Lock()
+
+
+def record(url: str, transport: str, ok: bool, latency_s: float):
+    """Record the outcome of fetching `url` over `transport` ('requests', 'playwright', 'api')."""
+    global _strategy_dirty
+    host = host_of(url)
+    with _strategy_lock:
+        st = _strategy.setdefault(host, {}).setdefault(
+            transport, {'ok': 0, 'fail': 0, 'success': 1.0, 'latency_ms': None})
+        st['ok' if ok else 'fail'] += 1
+        st['success'] = (1 - _EWMA_ALPHA) * st['success'] + _EWMA_ALPHA * (1.0 if ok else 0.0)
+        if ok:
+            ms = latency_s * 1000.0
+            st['latency_ms'] = ms if st['latency_ms'] is None else (
+                (1 - _EWMA_ALPHA) * st['latency_ms'] + _EWMA_ALPHA * ms)
+        _strategy_dirty = True
+
+
+def transport_order(url: str, candidates=('requests', 'playwright')) -> list:
+    """Order `candidates` for this host: working transports first, fastest first.
+
+    Untried transports keep their given (cheapest-first) order. When the cheap
+    first candidate has been demoted, it is still tried first every
+    `reprobe_every` decisions so a host that stops blocking is noticed.
+    """
+    host = host_of(url)
+    with _strategy_lock:
+        stats = dict(_strategy.get(host) or {})
+        n = _decisions[host] = _decisions.get(host, 0) + 1
+
+    def key(item):
+        idx, t = item
+        st = stats.get(t)
+        if not st or (st['ok'] + st['fail']) == 0:
+            # untried: after known-good transports, before known-bad ones
+            return (0, float('inf'), idx)
+        working = st['success'] >= _MIN_SUCCESS and st['ok'] > 0
+        return (0 if working else 1, st['latency_ms'] or 0.0, idx)
+
+    order = [t for _, t in sorted(enumerate(candidates), key=key)]
+    cheap = candidates[0]
+    if order[0] != cheap and _reprobe_every and n % _reprobe_every == 0:
+        order.remove(cheap)
+        order.insert(0, cheap)
+    return order
+
+
+def transport_usable(url: str, transport: str) -> bool:
+    """Is `transport` worth trying for this host, judged on its own record (no rival needed)?
+
+    True while untried or working; a transport known to fail is still allowed every
+    `reprobe_every` decisions so a host that stops blocking is noticed.
+    """
+    host = host_of(url)
+    with _strategy_lock:
+        st = (_strategy.get(host) or {}).get(transport)
+        n = _decisions[host] = _decisions.get(host, 0) + 1
+    if not st or (st['ok'] + st['fail']) == 0:
+        return True
+    if st['success'] >= _MIN_SUCCESS and st['ok'] > 0:
+        return True
+    return bool(_reprobe_every) and n % _reprobe_every == 0
+
+
+def load_strategy(path: str = DEFAULT_STRATEGY_PATH):
+    """Load (and keep saving to) the persisted strategy table at `path`."""
+    global _strategy_path
+    with _strategy_lock:
+        _strategy_path = path
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as fh:
+                    _strategy.update(json.load(fh))
+            except (OSError, ValueError):
+                pass
+
+
+def save_strategy():
+    global _strategy_dirty
+    with _strategy_lock:
+        if not _strategy_path or not _strategy_dirty:
+            return
+        snapshot = json.dumps(_strategy, ensure_ascii=False, indent=2)
+        _strategy_dirty = False
+    d = os.path.dirname(_strategy_path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    tmp = _strategy_path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        fh.write(snapshot)
+    os.replace(tmp, _strategy_path)
+
+
+atexit.register(save_strategy)
+
+
+def configure_strategy(cfg: Optional[Dict[str, Any]]):
+    """Apply a `host_strategy` config section: {enabled, path, reprobe_every}."""
+    global _reprobe_every
+    if not cfg or not cfg.get('enabled', True):
+        return
+    _reprobe_every = int(cfg.get('reprobe_every', _reprobe_every))
+    load_strategy(cfg.get('path') or DEFAULT_STRATEGY_PATH)
+
+
+def strategy_stats() -> Dict[str, Dict[str, Any]]:
+    with _strategy_lock:
+        return json.loads(json.dumps(_strategy))
+
+
+# --- retries and circuit breaker ---------------------------------------------
+
+# HTTP statuses worth retrying (rate limiting / server trouble, not blocks)
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of fetching while a host's circuit breaker is open."""
+
+
+_retry = {'attempts': 3, 'backoff': 0.5, 'max_backoff': 8.0}
+_breaker_cfg = {'threshold': 5, 'cooldown': 60.0}
+_breakers: Dict[str, Dict[str, Any]] = {}
+_breaker_lock = threading.Lock()
+
+
+def _breaker(host: str) -> Dict[str, Any]:
+    b = _breakers.get(host)
+    if b is None:
+        b = _breakers[host] = {'state': 'closed', 'failures': 0, 'opened_at': 0.0, 'trial': False,
+                               'retries': 0, 'trips': 0, 'fast_fails': 0}
+    return b
+
+
+def retry_attempts() -> int:
+    return max(1, int(_retry['attempts']))
+
+
+def backoff_delay(attempt: int) -> float:
+    """Seconds to sleep before retry number `attempt` + 1 (exponential, full jitter)."""
+    cap = min(_retry['max_backoff'], _retry['backoff'] * (2 ** attempt))
+    return random.uniform(0, cap)
+
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, (requests.Timeout, requests.ConnectionError)):
+        return True
+    resp = getattr(exc, 'response', None)
+    return isinstance(exc, requests.HTTPError) and resp is not None and resp.status_code in RETRYABLE_STATUS
+
+
+def note_retry(url: str):
+    with _breaker_lock:
+        _breaker(host_of(url))['retries'] += 1
+
+
+def check_circuit(url: str):
+    """Raise CircuitOpenError if the host is cooling off; lets one trial through afterwards."""
+    host = host_of(url)
+    with _breaker_lock:
+        b = _breaker(host)
+        if b['state'] == 'closed':
+            return
+        if b['state'] == 'open' and time.monotonic() - b['opened_at'] >= _breaker_cfg['cooldown']:
+            b['state'] = 'half_open'
+        if b['state'] == 'half_open' and not b['trial']:
+            b['trial'] = True
+            return
+        b['fast_fails'] += 1
+    raise CircuitOpenError(f"circuit open for {host} (cooling off after repeated failures)")
+
+
+def report_success(url: str):
+    with _breaker_lock:
+        b = _breaker(host_of(url))
+        b.update(state='closed', failures=0, trial=False)
+
+
+def report_failure(url: str):
+    """Count a transient failure (after retries); opens the breaker at the threshold."""
+    with _breaker_lock:
+        b = _breaker(host_of(url))
+        b['failures'] += 1
+        if b['state'] == 'half_open' or b['failures'] >= _breaker_cfg['threshold']:
+            if b['state'] != 'open':
+                b['trips'] += 1
+            b.update(state='open', opened_at=time.monotonic(), trial=False)
+
+
+def configure_retries(cfg: Dict[str, Any]):
+    """Apply `retries: {attempts, backoff, max_backoff}` and `circuit_breaker: {threshold, cooldown}`."""
+    for k, v in (cfg.get('retries') or {}).items():
+        if k in _retry:
+            _retry[k] = float(v) if k != 'attempts' else int(v)
+    for k, v in (cfg.get('circuit_breaker') or {}).items():
+        if k in _breaker_cfg:
+            _breaker_cfg[k] = float(v) if k == 'cooldown' else int(v)
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    with _breaker_lock:
+        return {h: {k: v for k, v in b.items() if k not in ('opened_at', 'trial')} for h, b in _breakers.items()}
@@ -0,0 +1,321 @@
+"""Pluggable HTML parser backend for the scraper helpers.
+
+`parse(html)` returns a small `Document` with the handful of queries the scrapers need
+(CSS text lookup, anchors, tag texts, table rows, dt/dd pairs, text-node search).
+Backends, fastest first:
+
+- 'selectolax': lexbor CSS engine (pip install selectolax)
+- 'lxml':       BeautifulSoup on the lxml tree builder (pip install lxml)
+- 'html.parser': BeautifulSoup on the stdlib parser (always available)
+
+'auto' (the default) picks the fastest one installed. Override with `set_backend`,
+the `html_parser.backend` config key or the HTML_PARSER_BACKEND env var.
+
+`reduce_html(html)` strips the parts of a page no extractor needs (scripts, styles,
+SVG, comments, cookie banners) once per page; `reduction_stats()` reports the bytes saved.
+"""
+import html as _html
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401
+    _HAS_LXML = True
+except ImportError:
+    _HAS_LXML = False
+
+BACKENDS = ('selectolax', 'lxml', 'html.parser')
+
+
+def available_backends() -> List[str]:
+    out = []
+    if LexborHTMLParser is not None:
+        out.append('selectolax')
+    if _HAS_LXML:
+        out.append('lxml')
+    out.append('html.parser')
+    return out
+
+
+def _resolve(name: Optional[str]) -> str:
+    name = (name or 'auto').lower()
+    avail = available_backends()
+    if name == 'auto':
+        return avail[0]
+    if name not in BACKENDS:
+        raise ValueError(f"unknown HTML parser backend: {name}")
+    # a configured backend that is not installed degrades to the best available one
+    return name if name in avail else avail[0]
+
+
+_backend = _resolve(os.environ.get('HTML_PARSER_BACKEND'))
+
+
+def set_backend(name: str) -> str:
+    """Select 'auto', 'selectolax', 'lxml' or 'html.parser'; returns the backend actually used."""
+    global _backend
+    _backend = _resolve(name)
+    return _backend
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def configure_parser(cfg: Optional[dict]):
+    """Apply an `html_parser` config section: {backend, reduce}. HTML_PARSER_BACKEND takes precedence."""
+    if cfg and 'reduce' in cfg:
+        set_reduction(cfg['reduce'])
+    if os.environ.get('HTML_PARSER_BACKEND'):
+        return
+    if cfg and cfg.get('backend'):
+        set_backend(cfg['backend'])
+
+
+def soup_features() -> str:
+    """BeautifulSoup tree builder to use where a real soup is still needed."""
+    return 'lxml' if _HAS_LXML else 'html.parser'
+
+
+def make_soup(html: str) -> BeautifulSoup:
+    return BeautifulSoup(html or '', soup_features())
+
+
+class _Document:
+    def heading(self) -> Optional[str]:
+        """Text of the first <h1>, falling back to <title>."""
+        return self.select_text('h1') or self.select_text('title') or None
+
+
+class SoupDocument(_Document):
+    """Document queries implemented on BeautifulSoup ('lxml' or 'html.parser' builder)."""
+
+    def __init__(self, html: str, features: str = 'html.parser'):
+        self.soup = BeautifulSoup(html or '', features)
+
+    def select_text(self, selector: str) -> Optional[str]:
+        el = self.soup.select_one(selector)
+        return el.get_text(strip=True) if el else None
+
+    def attr(self, selector: str, name: str) -> Optional[str]:
+        el = self.soup.select_one(selector)
+        return el.get(name) if el else None
+
+    def anchors(self) -> List[Tuple[str, str]]:
+        return [(a['href'], a.get_text(strip=True)) for a in self.soup.find_all('a', href=True)]
+
+    def texts(self, tags: Iterable[str]) -> List[str]:
+        return [t.get_text(" ", strip=True) for t in self.soup.find_all(list(tags))]
+
+    def table_rows(self) -> List[List[str]]:
+        rows = []
+        for table in self.soup.find_all('table'):
+            for tr in table.find_all('tr'):
+                rows.append([td.get_text(strip=True) for td in tr.find_all(['td', 'th'])])
+        return rows
+
+    def dl_pairs(self) -> List[Tuple[str, str]]:
+        pairs = []
+        for dl in self.soup.find_all('dl'):
+            for dt, dd in zip(dl.find_all('dt'), dl.find_all('dd')):
+                pairs.append((dt.get_text(strip=True), dd.get_text(strip=True)))
+        return pairs
+
+    def parents_of_text(self, needle: str, limit: int = 30) -> List[str]:
+        """Text of the parent element of each text node containing `needle` (case-insensitive)."""
+        needle = needle.lower()
+        out = []
+        for el in self.soup.find_all(string=lambda s: s and needle in s.lower()):
+            if len(out) >= limit:
+                break
+            if el.parent is not None:
+                out.append(el.parent.get_text(" ", strip=True))
+        return out
+
+
+class LexborDocument(_Document):
+    """Document queries implemented on selectolax's lexbor engine."""
+
+    def __init__(self, html: str):
+        self.tree = LexborHTMLParser(html or '')
+
+    def select_text(self, selector: str) -> Optional[str]:
+        el = self.tree.css_first(selector)
+        return el.text(strip=True) if el is not None else None
+
+    def attr(self, selector: str, name: str) -> Optional[str]:
+        el = self.tree.css_first(selector)
+        return el.attributes.get(name) if el is not None else None
+
+    def anchors(self) -> List[Tuple[str, str]]:
+        return [(a.attributes.get('href') or '', a.text(strip=True)) for a in self.tree.css('a[href]')]
+
+    def texts(self, tags: Iterable[str]) -> List[str]:
+        return [n.text(separator=' ', strip=True) for n in self.tree.css(', '.join(tags))]
+
+    def table_rows(self) -> List[List[str]]:
+        return [[td.text(strip=True) for td in tr.css('td, th')] for tr in self.tree.css('table tr')]
+
+    def dl_pairs(self) -> List[Tuple[str, str]]:
+        pairs = []
+        for dl in self.tree.css('dl'):
+            pairs.extend((dt.text(strip=True), dd.text(strip=True))
+                         for dt, dd in zip(dl.css('dt'), dl.css('dd')))
+        return pairs
+
+    def parents_of_text(self, needle: str, limit: int = 30) -> List[str]:
+        needle = needle.lower()
+        out = []
+        root = self.tree.root
+        if root is None:
+            return out
+        for node in root.traverse(include_text=True):
+            if len(out) >= limit:
+                break
+            if node.tag == '-text' and needle in (node.text_content or '').lower() and node.parent is not None:
+                out.append(node.parent.text(separator=' ', strip=True))
+        return out
+
+
+def parse(html: str, backend: Optional[str] = None):
+    """Parse `html` with the configured (or given) backend and return a Document."""
+    name = _resolve(backend) if backend else _backend
+    if name == 'selectolax':
+        return LexborDocument(html)
+    return SoupDocument(html, 'lxml' if name == 'lxml' else 'html.parser')
+
+
+_TAG_RE = re.compile(r"<!--[\s\S]*?-->|<[^>]*>")
+
+
+@lru_cache(maxsize=8192)
+def fragment_text(fragment: str) -> str:
+    """Text of an HTML fragment, like BeautifulSoup(fragment).get_text(' ', strip=True).
+
+    Tags and comments are cut with one regex and entities decoded; no tree is built, and
+    results are memoized per fragment, so repeated snippets cost a dict lookup.
+    """
+    pieces = []
+    for piece in _TAG_RE.split(fragment or ''):
+        piece = piece.strip()
+        if piece:
+            pieces.append(_html.unescape(piece) if '&' in piece else piece)
+    return ' '.join(pieces)
+
+
+_HREF_RE = re.compile(r"""<a\s[^>]*?\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+
+
+def iter_links(html: str, contains: Optional[str] = None) -> Iterator[str]:
+    """Yield the href of every <a> tag in document order, scanning the raw markup.
+
+    No DOM is built and scanning stops as soon as the caller stops iterating, so
+    collecting the first N links of a large page costs a fraction of a full parse.
+    Entities are decoded; `contains` keeps only hrefs with that substring.
+    """
+    for m in _HREF_RE.finditer(html or ''):
+        href = m.group(1) if m.group(1) is not None else (m.group(2) if m.group(2) is not None else m.group(3))
+        if '&' in href:
+            href = _html.unescape(href)
+        href = href.strip()
+        if href and (contains is None or contains in href):
+            yield href
+
+
+# --- document reduction ---------------------------------------------------------------------------
+
+_NOISE_RE = re.compile(
+    r"<!--[\s\S]*?-->"
+    r"|<(script|style|noscript|svg|template)\b(?:[^>]*/>|[^>]*>[\s\S]*?</\1\s*>)", re.IGNORECASE)
+# root elements of the known consent platforms only: a wrapper whose class merely mentions
+# "cookie" (e.g. "has-cookie-bar") must keep its content
+_CONSENT_RE = re.compile(
+    r"""<(div|section|aside|dialog|form)\b[^>]*\bid\s*=\s*["']"""
+    r"""(?:onetrust-|didomi-|CybotCookiebot|usercentrics-root|qc-cmp2-)[^"']*["'][^>]*>""", re.IGNORECASE)
+
+_reduce_enabled = True
+_reduced: "OrderedDict[str, str]" = OrderedDict()
+_reduced_lock = threading.Lock()
+_REDUCED_MAX = 16
+_reduce_counters = {'pages': 0, 'cache_hits': 0, 'bytes_in': 0, 'bytes_out': 0}
+
+
+def set_reduction(enabled: bool):
+    global _reduce_enabled
+    _reduce_enabled = bool(enabled)
+
+
+def _subtree_end(html: str, tag: str, start: int) -> int:
+    """End offset of the element whose opening tag ends at `start` (nesting of `tag` counted), or -1."""
+    depth = 1
+    for m in re.compile(rf"<(/?){tag}\b[^>]*>", re.IGNORECASE).finditer(html, start):
+        depth += -1 if m.group(1) else 1
+        if depth == 0:
+            return m.end()
+    return -1
+
+
+def _drop_consent(html: str) -> str:
+    parts = []
+    pos = 0
+    for m in _CONSENT_RE.finditer(html):
+        if m.start() < pos:
+            continue  # nested inside a banner already dropped
+        end = _subtree_end(html, m.group(1), m.end())
+        if end < 0:
+            continue  # unbalanced markup: keep it rather than lose the rest of the page
+        parts.append(html[pos:m.start()])
+        pos = end
+    if not parts:
+        return html
+    parts.append(html[pos:])
+    return ' '.join(parts)
+
+
+def _nbytes(s: str) -> int:
+    return len(s.encode('utf-8', 'replace'))
+
+
+def reduce_html(html: str) -> str:
+    """Page markup without script/style/noscript/svg/template blocks, comments and cookie banners.
+
+    Extractors that read text, links or odds run on this form; embedded JSON state must be
+    read from the original page. Results are cached per page (last 16 documents).
+    """
+    if not html or not _reduce_enabled:
+        return html or ''
+    with _reduced_lock:
+        out = _reduced.get(html)
+        if out is not None:
+            _reduced.move_to_end(html)
+            _reduce_counters['cache_hits'] += 1
+            return out
+    out = _drop_consent(_NOISE_RE.sub(' ', html))
+    with _reduced_lock:
+        _reduced[html] = out
+        while len(_reduced) > _REDUCED_MAX:
+            _reduced.popitem(last=False)
+        _reduce_counters['pages'] += 1
+        _reduce_counters['bytes_in'] += _nbytes(html)
+        _reduce_counters['bytes_out'] += _nbytes(out)
+    return out
+
+
+def reduction_stats() -> dict:
+    """Pages reduced, cache hits and bytes removed before parsing."""
+    with _reduced_lock:
+        st = dict(_reduce_counters)
+    st['saved'] = st['bytes_in'] - st['bytes_out']
+    st['saved_pct'] = round(100.0 * st['saved'] / st['bytes_in'], 1) if st['bytes_in'] else 0.0
+    return st
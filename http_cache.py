@@ -0,0 +1,410 @@
+"""Persistent HTTP response cache shared by the requests and Playwright fetch paths.
+
+Pages are stored in a small SQLite file keyed by canonical URL (fragment removed,
+host lowercased, query sorted) and by transport ('requests' or 'playwright').
+Each entry lives for a TTL chosen from per-host / URL-pattern rules; once it
+expires the stored ETag / Last-Modified validators let `fetch_html` revalidate
+with a conditional request instead of downloading the page again.
+
+`MemoryCache` is the in-process layer in front of it: a byte-bounded LRU that
+worker threads can share.
+
+`NegativeCache` remembers guessed bookmaker URLs that produced no markets (or an
+error), with the reason and an expiry, so later runs skip them.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_DB_PATH = os.path.join('data', 'http_cache.db')
+DEFAULT_TTL = 30 * 60
+
+# (regex matched against the canonical URL, ttl in seconds) - first match wins.
+# Match/team metadata barely changes, league listings change daily, odds change all the time.
+DEFAULT_TTLS: List[Tuple[str, int]] = [
+    (r'sofascore\.com/.*/match/', 3 * 3600),
+    (r'sofascore\.com/.*/team/', 12 * 3600),
+    (r'sofascore\.com/.*/(torneio|tournament)/', 3600),
+    (r'api\.sofascore\.com/', 10 * 60),
+    (r'betano\.bet\.br', 5 * 60),
+    (r'superbet\.bet\.br', 5 * 60),
+]
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so equivalent spellings share one cache entry.
+
+    The fragment is dropped (SofaScore '#id:...' fragments never reach the server),
+    scheme/host are lowercased, default ports removed and query parameters sorted.
+    """
+    if not url:
+        return url
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    scheme = (parts.scheme or 'https').lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+class DiskCache:
+    """SQLite-backed page cache with per-pattern TTLs and HTTP validators."""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, ttls: Optional[List[Tuple[str, int]]] = None,
+                 default_ttl: int = DEFAULT_TTL):
+        self.path = path
+        self.default_ttl = int(default_ttl)
+        self._ttls = [(re.compile(p, re.IGNORECASE), int(t))
+                      for p, t in (ttls if ttls is not None else DEFAULT_TTLS)]
+        self._lock = threading.Lock()
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            """
+        CREATE TABLE IF NOT EXISTS http_cache (
+            url TEXT,
+            transport TEXT,
+            status INTEGER,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL,
+            expires_at REAL,
+            body TEXT,
+            PRIMARY KEY (url, transport)
+        )
+        """
+        )
+        self._conn.commit()
+        self.counters = {'fresh_hits': 0, 'revalidated': 0, 'misses': 0, 'stores': 0}
+
+    def ttl_for(self, url: str) -> int:
+        key = canonical_url(url)
+        for rx, ttl in self._ttls:
+            if rx.search(key):
+                return ttl
+        return self.default_ttl
+
+    def get(self, url: str, transport: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return the stored entry (dict with 'body', 'etag', 'last_modified', 'fresh', ...) or None.
+
+        With transport=None the 'requests' entry is preferred over a rendered one.
+        Stale entries are still returned so callers can revalidate them.
+        """
+        key = canonical_url(url)
+        with self._lock:
+            if transport:
+                rows = self._conn.execute(
+                    "SELECT * FROM http_cache WHERE url = ? AND transport = ?", (key, transport)).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM http_cache WHERE url = ? ORDER BY transport = 'requests' DESC", (key,)).fetchall()
+            if not rows:
+                self.counters['misses'] += 1
+                return None
+            entry = dict(rows[0])
+            entry['fresh'] = entry['expires_at'] > time.time()
+            if entry['fresh']:
+                self.counters['fresh_hits'] += 1
+        return entry
+
+    def put(self, url: str, body: str, transport: str = 'requests', status: int = 200,
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        key = canonical_url(url)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_cache (url, transport, status, etag, last_modified, fetched_at, expires_at, body) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, transport, status, etag, last_modified, now, now + self.ttl_for(url), body),
+            )
+            self._conn.commit()
+            self.counters['stores'] += 1
+
+    def touch(self, url: str, transport: str = 'requests'):
+        """Extend an entry's lifetime after a 304 Not Modified."""
+        key = canonical_url(url)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE http_cache SET fetched_at = ?, expires_at = ? WHERE url = ? AND transport = ?",
+                (now, now + self.ttl_for(url), key, transport),
+            )
+            self._conn.commit()
+            self.counters['revalidated'] += 1
+
+    def purge_expired(self, older_than: float = 7 * 24 * 3600) -> int:
+        """Delete entries that expired more than `older_than` seconds ago."""
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM http_cache WHERE expires_at < ?", (time.time() - older_than,))
+            self._conn.commit()
+            return cur.rowcount
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU for page bodies, bounded by a byte budget.
+
+    Entries are evicted least-recently-used first once the total size passes
+    `max_bytes`, and optionally expire after `ttl` seconds.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, ttl: Optional[float] = None):
+        self.max_bytes = int(max_bytes)
+        self.ttl = ttl
+        self._data: 'OrderedDict[str, Tuple[str, int, float]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, url: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(url)
+            if item is None:
+                self.counters['misses'] += 1
+                return None
+            body, size, stored_at = item
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                del self._data[url]
+                self._bytes -= size
+                self.counters['misses'] += 1
+                self.counters['evictions'] += 1
+                return None
+            self._data.move_to_end(url)
+            self.counters['hits'] += 1
+            return body
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return url in self._data
+
+    def put(self, url: str, body: Any, size: Optional[int] = None):
+        """Store `body` (a page string; any object when its `size` in bytes is given)."""
+        if size is None:
+            size = len(body.encode('utf-8', 'ignore')) if body else 0
+        with self._lock:
+            old = self._data.pop(url, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                # a single page larger than the whole budget is never kept
+                return
+            self._data[url] = (body, size, time.time())
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._data:
+                _, (_, evicted, _) = self._data.popitem(last=False)
+                self._bytes -= evicted
+                self.counters['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, 'entries': len(self._data), 'bytes': self._bytes,
+                    'max_bytes': self.max_bytes}
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one execution.
+
+    The first caller (leader) runs the function; callers arriving while it is in
+    flight block and receive the same result (or exception).
+    """
+
+    class _Call:
+        __slots__ = ('event', 'result', 'error')
+
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, 'SingleFlight._Call'] = {}
+        self.counters = {'executed': 0, 'saved': 0}
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._Call()
+                self._calls[key] = call
+                self.counters['executed'] += 1
+            else:
+                self.counters['saved'] += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+
+# Shared by fetch_html and fetch_html_playwright; keys are '<transport> <canonical url>'.
+_inflight = SingleFlight()
+
+
+def single_flight(transport: str, url: str, fn):
+    """Run `fn` once for concurrent fetches of the same canonical URL over `transport`."""
+    return _inflight.do(f"{transport} {canonical_url(url)}", fn)
+
+
+def inflight_stats() -> Dict[str, int]:
+    """How many fetches ran vs. how many were saved by joining an in-flight one."""
+    return dict(_inflight.counters)
+
+
+# Process-wide cache used by rpa_scraper.fetch_html and rpa_playwright.fetch_html_playwright.
+# Enabled through `set_disk_cache`, the `http_cache` config section or the HTTP_CACHE_PATH env var.
+_disk_cache: Optional[DiskCache] = None
+_disk_cache_lock = threading.Lock()
+
+
+def set_disk_cache(path: Optional[str] = DEFAULT_DB_PATH, ttls: Optional[List[Tuple[str, int]]] = None,
+                   default_ttl: int = DEFAULT_TTL) -> Optional[DiskCache]:
+    """Enable the persistent cache at `path` (or disable it with path=None)."""
+    global _disk_cache
+    with _disk_cache_lock:
+        if _disk_cache is not None:
+            _disk_cache.close()
+        _disk_cache = DiskCache(path, ttls=ttls, default_ttl=default_ttl) if path else None
+        return _disk_cache
+
+
+def get_disk_cache() -> Optional[DiskCache]:
+    if _disk_cache is None and os.environ.get('HTTP_CACHE_PATH'):
+        set_disk_cache(os.environ['HTTP_CACHE_PATH'])
+    return _disk_cache
+
+
+def configure_disk_cache(cfg: Optional[Dict[str, Any]]) -> Optional[DiskCache]:
+    """Apply an `http_cache` config section: {enabled, path, default_ttl, ttls: [{pattern, ttl}]}."""
+    if not cfg or not cfg.get('enabled', True):
+        return set_disk_cache(None)
+    ttls = None
+    if cfg.get('ttls'):
+        ttls = [(t['pattern'], int(t['ttl'])) for t in cfg['ttls'] if t.get('pattern')]
+        # keep the built-in rules as defaults behind the configured ones
+        ttls += DEFAULT_TTLS
+    return set_disk_cache(cfg.get('path') or DEFAULT_DB_PATH, ttls=ttls,
+                          default_ttl=int(cfg.get('default_ttl', DEFAULT_TTL)))
+
+
+DEFAULT_NEGATIVE_TTL = 12 * 3600
+
+
+class NegativeCache:
+    """Persistent record of candidate URLs that yielded nothing, with reason and expiry."""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, ttl: int = DEFAULT_NEGATIVE_TTL):
+        self.path = path
+        self.ttl = int(ttl)
+        self._lock = threading.Lock()
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+        CREATE TABLE IF NOT EXISTS negative_cache (
+            url TEXT PRIMARY KEY,
+            reason TEXT,
+            failures INTEGER,
+            first_seen REAL,
+            expires_at REAL
+        )
+        """
+        )
+        self._conn.commit()
+        self.counters = {'skipped': 0, 'recorded': 0}
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Return the failure reason if `url` is known dead and not yet expired, else None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT reason, expires_at FROM negative_cache WHERE url = ?", (canonical_url(url),)).fetchone()
+            if not row or row[1] <= time.time():
+                return None
+            self.counters['skipped'] += 1
+            return row[0]
+
+    def add(self, url: str, reason: str, ttl: Optional[int] = None):
+        """Mark `url` dead for `ttl` seconds; repeated failures keep the first_seen time."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO negative_cache (url, reason, failures, first_seen, expires_at) VALUES (?, ?, 1, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET reason=excluded.reason, failures=failures + 1, expires_at=excluded.expires_at",
+                (canonical_url(url), (reason or '')[:300], now, now + (self.ttl if ttl is None else ttl)),
+            )
+            self._conn.commit()
+            self.counters['recorded'] += 1
+
+    def remove(self, url: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM negative_cache WHERE url = ?", (canonical_url(url),))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+
+_negative_cache: Optional[NegativeCache] = None
+
+
+def set_negative_cache(path: Optional[str] = DEFAULT_DB_PATH, ttl: int = DEFAULT_NEGATIVE_TTL) -> Optional[NegativeCache]:
+    """Enable the dead-candidate cache at `path` (or disable it with path=None)."""
+    global _negative_cache
+    with _disk_cache_lock:
+        if _negative_cache is not None:
+            _negative_cache.close()
+        _negative_cache = NegativeCache(path, ttl=ttl) if path else None
+        return _negative_cache
+
+
+def get_negative_cache() -> Optional[NegativeCache]:
+    return _negative_cache
+
+
+def configure_negative_cache(cfg: Optional[Dict[str, Any]]) -> Optional[NegativeCache]:
+    """Apply a `negative_cache` config section: {enabled, path, ttl}."""
+    if not cfg or not cfg.get('enabled', True):
+        return set_negative_cache(None)
+    return set_negative_cache(cfg.get('path') or DEFAULT_DB_PATH,
+                              ttl=int(cfg.get('ttl', DEFAULT_NEGATIVE_TTL)))
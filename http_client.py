@@ -0,0 +1,95 @@
+"""Pooled keep-alive HTTP sessions for the scraper layer.
+
+One `requests.Session` per host (scheme + netloc) is shared by every worker thread,
+so repeated fetches to sofascore.com / betano.bet.br / superbet.bet.br reuse open
+TCP+TLS connections instead of paying a new handshake per page. Each session's
+connection pool is sized to the number of workers (`set_pool_size`, grow-only).
+"""
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def _accept_encoding() -> str:
+    # urllib3 decodes brotli transparently only when a brotli package is installed
+    for mod in ('brotli', 'brotlicffi'):
+        try:
+            __import__(mod)
+            return 'gzip, deflate, br'
+        except ImportError:
+            continue
+    return 'gzip, deflate'
+
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/115.0 Safari/537.36",
+    "Accept-Language": "pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": _accept_encoding(),
+}
+
+DEFAULT_POOL_SIZE = 10
+
+_pool_size = DEFAULT_POOL_SIZE
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{(parts.scheme or 'https').lower()}://{parts.netloc.lower()}"
+
+
+def set_pool_size(n: int):
+    """Grow per-host connection pools to `n` (use the --workers count); never shrinks them.
+
+    Sessions created from now on get the larger pool. Live sessions are left alone,
+    because other threads may be using them; a smaller pool only means connections
+    beyond its size are not kept alive.
+    """
+    global _pool_size
+    with _lock:
+        _pool_size = max(_pool_size, int(n))
+
+
+def get_pool_size() -> int:
+    return _pool_size
+
+
+def get_session(url: str) -> requests.Session:
+    """Return the shared keep-alive session for the URL's host, creating it on first use."""
+    key = _host_key(url)
+    sess = _sessions.get(key)
+    if sess is not None:
+        return sess
+    with _lock:
+        sess = _sessions.get(key)
+        if sess is None:
+            sess = requests.Session()
+            sess.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=_pool_size)
+            sess.mount('http://', adapter)
+            sess.mount('https://', adapter)
+            _sessions[key] = sess
+    return sess
+
+
+def get(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 10, **kwargs) -> requests.Response:
+    """GET through the pooled session; `headers` are merged over the session defaults."""
+    return get_session(url).get(url, headers=headers, timeout=timeout, **kwargs)
+
+
+def close_sessions():
+    """Close every pooled session (and their open connections)."""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for s in sessions:
+        try:
+            s.close()
+        except Exception:
+            pass
@@ -0,0 +1,251 @@
+"""Single-pass market extraction for bookmaker pages.
+
+The bookmaker scrapers used to run one regex per market shape over the whole page
+(1X2 sequences, over/under lines, corner labels, team names) and then re-scan a
+window around every hit for odds. `tokenize` instead walks the document once with a
+single alternation that recognises team names, market labels, 1X2 markers and
+numbers; the assemblers below build markets from the positions of those tokens.
+Odds inside a window are found by bisecting the sorted token list, so the cost stays
+linear in page size however many labels or team names the page has.
+
+    toks = tokenize(text, terms=['corinthians', 'ponte preta'])
+    markets = betano_markets(text, toks)
+"""
+import re
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+# longest alternatives first so 'total de escanteios' wins over 'total'
+_LABELS = (r"total(?:\s+de)?\s+(?:gols?|escanteios?)|escanteios?|corners?|over|under"
+           r"|mais\s+de|menos\s+de|total")
+_BASE = [
+    ('label', r"\b(?:" + _LABELS + r")\b"),
+    ('x', r"\bx\b"),
+    # odds, lines and 1X2 markers only: up to two integer digits, digits glued to letters
+    # ('x2', 'h100', hashes) are not numbers
+    ('num', r"\b[0-9]{1,2}(?:\.[0-9]{1,3})?\b"),
+]
+
+
+class Token(NamedTuple):
+    kind: str      # 'team', 'label', 'x' or 'num'
+    start: int
+    end: int
+    text: str      # lowercased match (the term itself for 'team')
+    value: Optional[float] = None
+    is_odd: bool = False   # a number in the 1.01-100 odds range
+
+
+def _is_odd(value: float) -> bool:
+    return 1.01 <= value <= 100.0
+
+
+# characters a label, a 1X2 marker or a number can start with
+_LEAD = '0-9tecoumx'
+
+
+@lru_cache(maxsize=64)
+def _pattern(terms: tuple) -> 're.Pattern':
+    parts = []
+    lead = _LEAD
+    if terms:
+        parts.append(('team', '|'.join(re.escape(t) for t in sorted(terms, key=len, reverse=True))))
+        lead += ''.join(sorted({re.escape(t[0]) for t in terms}))
+    parts.extend(_BASE)
+    # the leading class lets the engine skip markup and ordinary words before trying any branch
+    return re.compile(f"(?=[{lead}])(?:" + '|'.join(f"(?P<{k}>{p})" for k, p in parts) + ')', re.IGNORECASE)
+
+
+def tokenize(text: str, terms: Iterable[str] = ()) -> List[Token]:
+    """All team-name, label, 1X2-marker and number tokens of `text`, in document order.
+
+    `terms` are matched case-insensitively as plain substrings; a term nested in a
+    longer matched term (e.g. 'bragantino' in 'red bull bragantino') is reported too.
+    """
+    terms = tuple(sorted({t.strip().lower() for t in terms if t and t.strip()}))
+    out: List[Token] = []
+    add = out.append
+    make = Token._make
+    for m in _pattern(terms).finditer(text or ''):
+        kind = m.lastgroup
+        low = m.group().lower()
+        start, end = m.span()
+        if kind == 'num':
+            value = float(low)
+            add(make(('num', start, end, low, value, _is_odd(value))))
+        elif kind == 'team':
+            for t in terms:
+                i = low.find(t)
+                while i >= 0:
+                    add(make(('team', start + i, start + i + len(t), t, None, False)))
+                    i = low.find(t, i + 1)
+        else:
+            add(make((kind, start, end, ' '.join(low.split()), None, False)))
+    if terms:
+        out.sort(key=lambda t: t.start)
+    return out
+
+
+def odds_between(tokens: Sequence[Token], starts: Sequence[int], lo: int, hi: int) -> List[Token]:
+    """Odd tokens lying entirely inside text[lo:hi]; `starts` is [t.start for t in tokens]."""
+    i = bisect_left(starts, lo)
+    j = bisect_right(starts, hi)
+    return [t for t in tokens[i:j] if t.is_odd and t.end <= hi]
+
+
+def label_type(label: str) -> str:
+    if 'escante' in label or 'corner' in label:
+        return 'CORNERS'
+    if 'gol' in label or 'total' in label or 'over' in label or 'under' in label:
+        return 'GOALS'
+    return 'GENERIC'
+
+
+def _market(mtype, selection, odd, context, bookmaker=None, **extra) -> Dict[str, Any]:
+    m = {'market_type': mtype, 'selection': selection, 'odd': odd, 'context': context}
+    if bookmaker:
+        m['bookmaker'] = bookmaker
+    m.update(extra)
+    return m
+
+
+def _gap(text: str, a: Token, b: Token) -> str:
+    return text[a.end:b.start]
+
+
+def _one_x_two(text: str, tokens: Sequence[Token], bookmaker: str) -> List[Dict[str, Any]]:
+    """'1 <odd> X <odd> 2 <odd>' runs, each gap at most 8 characters."""
+    out = []
+    n = len(tokens)
+    i = 0
+    while i + 5 < n:
+        t0 = tokens[i]
+        if t0.text != '1' or t0.kind != 'num':
+            i += 1
+            continue
+        seq = tokens[i:i + 6]
+        if ([t.kind for t in seq] == ['num', 'num', 'x', 'num', 'num', 'num'] and seq[4].text == '2'
+                and all(len(_gap(text, a, b)) <= 8 for a, b in zip(seq, seq[1:]))):
+            ctx = text[max(0, t0.start - 60):seq[5].end + 60]
+            for sel, tok in (('1', seq[1]), ('X', seq[3]), ('2', seq[5])):
+                out.append(_market('1X2', sel, tok.value, ctx, bookmaker))
+            i += 6
+            continue
+        i += 1
+    return out
+
+
+def _over_under(text: str, tokens: Sequence[Token], bookmaker: str) -> List[Dict[str, Any]]:
+    """'<label> <line> ... <odd>': a goals/corners/over/under label, its line and the next odd."""
+    out = []
+    for i in range(len(tokens) - 2):
+        if tokens[i].kind != 'label':
+            continue
+        lab, line, odd = tokens[i:i + 3]
+        if line.kind != 'num' or odd.kind != 'num':
+            continue
+        if _gap(text, lab, line).strip(' \t\r\n:-') or len(_gap(text, line, odd)) > 12:
+            continue
+        if '.' in line.text and line.text.split('.')[1] not in ('0', '5'):
+            continue
+        if 'escante' in lab.text or 'corner' in lab.text:
+            mtype = 'CORNERS'
+        elif 'gol' in lab.text:
+            mtype = 'GOALS'
+        else:
+            mtype = 'OVER' if 'over' in lab.text or 'mais' in lab.text else 'UNDER'
+        ctx = text[max(0, lab.start - 80):odd.end + 80]
+        out.append(_market(mtype, line.text, odd.value, ctx, bookmaker))
+    return out
+
+
+def label_markets(text: str, tokens: Sequence[Token], accept, before: int = 80, after: int = 200,
+                  max_odd: float = 50, bookmaker: str = None, **extra) -> List[Dict[str, Any]]:
+    """Odds within [label-before, label+after] of every label token for which `accept(label)` holds."""
+    starts = [t.start for t in tokens]
+    out = []
+    for lab in tokens:
+        if lab.kind != 'label' or not accept(lab.text):
+            continue
+        lo, hi = max(0, lab.start - before), min(len(text), lab.end + after)
+        ctx = text[lo:hi]
+        mtype = label_type(lab.text)
+        for tok in odds_between(tokens, starts, lo, hi):
+            if tok.value <= max_odd:
+                out.append(_market(mtype, None, tok.value, ctx, bookmaker, **extra))
+    return out
+
+
+def generic_markets(text: str, tokens: Sequence[Token], bookmaker: str = None, width: int = 40,
+                    dedupe: bool = True) -> List[Dict[str, Any]]:
+    seen = set()
+    out = []
+    for tok in tokens:
+        if not tok.is_odd or (dedupe and tok.value in seen):
+            continue
+        seen.add(tok.value)
+        out.append(_market('GENERIC', None, tok.value, text[max(0, tok.start - width):tok.start + width], bookmaker))
+    return out
+
+
+def _is_corner_label(label: str) -> bool:
+    return 'escante' in label or 'corner' in label
+
+
+def betano_markets(text: str, tokens: Sequence[Token] = None, bookmaker: str = 'Betano_Market',
+                   fallback: bool = True) -> List[Dict[str, Any]]:
+    """1X2 runs, over/under lines and odds around corner labels.
+
+    With `fallback`, every odd on the page is returned (deduplicated) when none of those match.
+    """
+    if tokens is None:
+        tokens = tokenize(text)
+    out = _one_x_two(text, tokens, bookmaker)
+    out += _over_under(text, tokens, bookmaker)
+    out += label_markets(text, tokens, _is_corner_label, bookmaker=bookmaker)
+    if not out and fallback:
+        out = generic_markets(text, tokens, bookmaker)
+    return out
+
+
+_NEAR_TEAM_LABELS = ('total de gols', 'total gols', 'over', 'under', 'mais de', 'menos de')
+
+
+def _is_near_team_label(label: str) -> bool:
+    return label in _NEAR_TEAM_LABELS or _is_corner_label(label)
+
+
+def markets_near_terms(text: str, terms: Sequence[str], tokens: Sequence[Token] = None,
+                       window: int = 300, match_ref: str = None) -> List[Dict[str, Any]]:
+    """Odds around each occurrence of a team name.
+
+    Within `window` characters of the name, the first goals/corners/over/under label wins
+    and the odds right after it are taken; without a label every odd in the window is.
+    """
+    if tokens is None:
+        tokens = tokenize(text, terms)
+    starts = [t.start for t in tokens]
+    by_term: Dict[str, List[Token]] = {}
+    for tok in tokens:
+        if tok.kind == 'team':
+            by_term.setdefault(tok.text, []).append(tok)
+
+    out = []
+    for term in dict.fromkeys(t.strip().lower() for t in terms if t):
+        for occ in by_term.get(term, ()):
+            lo, hi = max(0, occ.start - window), min(len(text), occ.start + window)
+            i, j = bisect_left(starts, lo), bisect_right(starts, hi)
+            lab = next((t for t in tokens[i:j] if t.kind == 'label' and t.end <= hi
+                        and _is_near_team_label(t.text)), None)
+            if lab is not None:
+                lo2, hi2 = max(0, lab.start - 60), min(len(text), lab.end + 160)
+                ctx = text[lo2:hi2]
+                mtype = label_type(lab.text)
+                out.extend(_market(mtype, None, t.value, ctx, match=match_ref)
+                           for t in odds_between(tokens, starts, lo2, hi2) if t.value <= 50)
+                continue
+            ctx = text[lo:hi]
+            out.extend(_market('GENERIC', None, t.value, ctx, match=match_ref)
+                       for t in odds_between(tokens, starts, lo, hi))
+    return out
@@ -0,0 +1,167 @@
+"""Record/replay transport for offline, deterministic pipeline runs.
+
+In 'record' mode every page returned by `fetch_html`, `fetch_html_playwright` and every
+result of `extract_markets_near_labels` is written to a content-addressed archive:
+
+    <archive>/blobs/<sha256>      response bodies (deduplicated by content)
+    <archive>/index.json          "<kind> <canonical url> <extra>" -> sha256
+
+In 'replay' mode the same calls are answered from the archive only: no network and no
+browser, so `runner.py`, `scripts/analyze_matches.py` or `scripts/eval_paulistao_markets.py`
+run at a repeatable speed. A request missing from the archive raises ReplayMissError.
+
+Enable with the `replay` config section, `set_mode()`, or the environment:
+    RPA_REPLAY_MODE=record|replay  RPA_REPLAY_PATH=data/replay/<name>
+
+Local files (e.g. the bundled sample_*.html) can be added to an archive with:
+    python replay.py import --archive data/replay/samples --url <url> --file sample_sofa.html
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+
+from http_cache import canonical_url
+
+DEFAULT_ARCHIVE = os.path.join('data', 'replay', 'default')
+
+
+class ReplayMissError(requests.exceptions.ConnectionError):
+    """The request is not in the replay archive (replay mode never touches the network)."""
+
+
+class Archive:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._index: Dict[str, str] = {}
+        os.makedirs(os.path.join(path, 'blobs'), exist_ok=True)
+        idx = os.path.join(path, 'index.json')
+        if os.path.exists(idx):
+            with open(idx, 'r', encoding='utf-8') as fh:
+                self._index = json.load(fh)
+        self.counters = {'hits': 0, 'misses': 0, 'recorded': 0}
+
+    @staticmethod
+    def key(kind: str, url: str, extra: str = '') -> str:
+        return f"{kind} {canonical_url(url)} {extra}".rstrip()
+
+    def get(self, kind: str, url: str, extra: str = '') -> Optional[str]:
+        with self._lock:
+            digest = self._index.get(self.key(kind, url, extra))
+        if not digest:
+            self.counters['misses'] += 1
+            return None
+        with open(os.path.join(self.path, 'blobs', digest), 'r', encoding='utf-8') as fh:
+            body = fh.read()
+        self.counters['hits'] += 1
+        return body
+
+    def put(self, kind: str, url: str, body: str, extra: str = ''):
+        data = (body or '').encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        blob = os.path.join(self.path, 'blobs', digest)
+        with self._lock:
+            if not os.path.exists(blob):
+                with open(blob, 'wb') as fh:
+                    fh.write(data)
+            self._index[self.key(kind, url, extra)] = digest
+            tmp = os.path.join(self.path, 'index.json.tmp')
+            with open(tmp, 'w', encoding='utf-8') as fh:
+                json.dump(self._index, fh, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp, os.path.join(self.path, 'index.json'))
+        self.counters['recorded'] += 1
+
+    def __len__(self):
+        return len(self._index)
+
+
+_mode = 'off'
+_archive: Optional[Archive] = None
+
+
+def set_mode(mode: str, path: str = DEFAULT_ARCHIVE) -> Optional[Archive]:
+    """Switch to 'off', 'record' or 'replay' using the archive directory at `path`."""
+    global _mode, _archive
+    mode = (mode or 'off').lower()
+    if mode not in ('off', 'record', 'replay'):
+        raise ValueError(f"unknown replay mode: {mode}")
+    _mode = mode
+    _archive = Archive(path) if mode != 'off' else None
+    return _archive
+
+
+def configure_replay(cfg: Optional[Dict[str, Any]]):
+    """Apply a `replay` config section: {mode, path}. Environment variables take precedence."""
+    if os.environ.get('RPA_REPLAY_MODE'):
+        return
+    if cfg and cfg.get('mode'):
+        set_mode(cfg['mode'], cfg.get('path') or DEFAULT_ARCHIVE)
+
+
+def get_mode() -> str:
+    return _mode
+
+
+def replaying() -> bool:
+    return _mode == 'replay'
+
+
+def lookup(kind: str, url: str, extra: str = '') -> str:
+    """Replay-mode answer for a request; raises ReplayMissError when it was never recorded."""
+    body = _archive.get(kind, url, extra) if _archive else None
+    if body is None:
+        raise ReplayMissError(f"not in replay archive: {kind} {url} {extra}".rstrip())
+    return body
+
+
+def record(kind: str, url: str, body: str, extra: str = ''):
+    """Store a response when recording (no-op in other modes)."""
+    if _mode == 'record' and _archive is not None and body is not None:
+        _archive.put(kind, url, body, extra)
+
+
+def lookup_json(kind: str, url: str, extra: str = '') -> Any:
+    return json.loads(lookup(kind, url, extra))
+
+
+def record_json(kind: str, url: str, value: Any, extra: str = ''):
+    if _mode == 'record':
+        record(kind, url, json.dumps(value, ensure_ascii=False), extra)
+
+
+def replay_stats() -> Optional[Dict[str, Any]]:
+    if _archive is None:
+        return None
+    return {'mode': _mode, 'path': _archive.path, 'entries': len(_archive), **_archive.counters}
+
+
+if os.environ.get('RPA_REPLAY_MODE'):
+    set_mode(os.environ['RPA_REPLAY_MODE'], os.environ.get('RPA_REPLAY_PATH') or DEFAULT_ARCHIVE)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    p = argparse.ArgumentParser(description='Manage record/replay archives')
+    sub = p.add_subparsers(dest='cmd', required=True)
+    imp = sub.add_parser('import', help='Add a local HTML file to an archive')
+    imp.add_argument('--archive', default=DEFAULT_ARCHIVE)
+    imp.add_argument('--url', required=True, help='URL the file should answer for')
+    imp.add_argument('--file', required=True)
+    imp.add_argument('--kind', default='requests', choices=['requests', 'playwright'])
+    ls = sub.add_parser('list', help='List archived requests')
+    ls.add_argument('--archive', default=DEFAULT_ARCHIVE)
+    args = p.parse_args()
+
+    arch = Archive(args.archive)
+    if args.cmd == 'import':
+        with open(args.file, 'r', encoding='utf-8') as fh:
+            arch.put(args.kind, args.url, fh.read())
+        print('Imported', args.file, 'as', Archive.key(args.kind, args.url))
+    else:
+        for k, v in sorted(arch._index.items()):
+            print(v[:12], k)
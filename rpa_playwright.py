@@ -1,128 +1,1056 @@
-from playwright.sync_api import sync_playwright
+"""Playwright rendering for pages that need a real browser.
 
-# Module-level reusable Playwright objects to avoid cold-starts
-_playwright = None
-_browser = None
-_context = None
+Playwright's sync API is bound to the thread that started it, so a single global
+browser cannot be shared by the scrapers' worker threads. Renders go through a
+`BrowserPool` instead: N worker threads, each owning its own Playwright instance,
+browser and context, fed by one job queue. A job is a function of the worker's
+context; callers wait for it with a per-job timeout. Workers are started on demand,
+so a run that never renders never launches a browser.
 
+    html = fetch_html_playwright(url)          # submitted to the shared pool
+    set_workers(8)                             # or the `playwright.workers` config key
 
-def _ensure_playwright(headless: bool = True):
-    global _playwright, _browser, _context
-    if _playwright is None:
-        _playwright = sync_playwright().start()
-    if _browser is None:
-        _browser = _playwright.chromium.launch(
-            headless=headless, args=["--no-sandbox"])
-    if _context is None:
-        _context = _browser.new_context()
-    return _context
+Batches use the asyncio engine instead: one browser drives up to `pages` tabs at
+once (`AsyncRenderer`), so rendering 40 pages costs about as much as the slowest few:
 
+    for url, html in fetch_many_rendered(urls): ...
+    labels_by_url = extract_markets_many(urls, ['Escanteios', 'Total de gols'])
 
-def close_playwright():
-    """Close any open Playwright browser/context to free resources."""
-    global _playwright, _browser, _context
-    try:
-        if _context:
-            _context.close()
-            _context = None
-        if _browser:
-            _browser.close()
-            _browser = None
-        if _playwright:
-            _playwright.stop()
-            _playwright = None
-    except Exception:
-        pass
+Scrapers that need several things from one page (labels, then the DOM HTML, then
+custom extractors) share a `PageSession`, which navigates once and keeps the page open
+on a pool worker while it is in use; results are kept per run, so a URL asked for again
+is answered without another navigation:
 
+    with session_for(url) as page:
+        blocks = page.labels(['Escanteios'])
+        html = page.html()
 
-def fetch_html_playwright(url: str, wait_for: str = None, timeout: int = 15000, headless: bool = True) -> str:
-    """Fetch a page using Playwright and return the page content HTML.
+Every page is routed through a block profile (images, fonts, media, trackers and the
+consent bundle by default; per-site overrides under `playwright.profiles` or a site's
+`playwright` block), and its load time and transferred bytes are kept for `render_stats()`.
+"""
+import asyncio
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-    Reuses a single browser instance across calls to avoid expensive cold starts.
+try:
+    from playwright.sync_api import sync_playwright
+except ImportError:  # requests-only installs; replay mode needs no browser
+    sync_playwright = None
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    async_playwright = None
 
-    wait_for: optional selector to wait for before returning content.
-    timeout: milliseconds
-    """
-    ctx = _ensure_playwright(headless=headless)
-    page = ctx.new_page()
-    page.goto(url, timeout=timeout)
-    if wait_for:
+import http_cache
+import host_policy
+import replay
+
+DEFAULT_WORKERS = 2
+DEFAULT_JOB_TIMEOUT = 60.0
+DEFAULT_PAGES = 8
+DEFAULT_SESSION_IDLE = 30.0
+
+_STOP = object()
+
+
+class BrowserPool:
+    """Worker threads with one browser each, fed by a shared job queue."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, headless: bool = True,
+                 job_timeout: float = DEFAULT_JOB_TIMEOUT):
+        self.max_workers = max(1, int(workers))
+        self.headless = headless
+        self.job_timeout = job_timeout
+        self._jobs: 'queue.Queue' = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._idle = 0
+        self._closed = False
+        self.counters = {'jobs': 0, 'errors': 0, 'timeouts': 0, 'launches': 0}
+
+    def _spawn_if_needed(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('browser pool is closed')
+            self._threads = [t for t in self._threads if t.is_alive()]
+            if self._idle > self._jobs.qsize() or len(self._threads) >= self.max_workers:
+                return
+            t = threading.Thread(target=self._work, name=f'playwright-{len(self._threads)}', daemon=True)
+            # started under the lock: an unstarted thread would look dead to the pruning above
+            t.start()
+            self._threads.append(t)
+
+    def _launch(self):
+        if sync_playwright is None:
+            raise ImportError("playwright is not installed: pip install playwright && playwright install")
+        pw = sync_playwright().start()
         try:
-            page.wait_for_selector(wait_for, timeout=timeout)
+            browser = pw.chromium.launch(headless=self.headless, args=["--no-sandbox"])
+        except Exception:
+            pw.stop()
+            raise
+        self.counters['launches'] += 1
+        return pw, browser, browser.new_context()
+
+    def _work(self):
+        pw = browser = context = None
+        try:
+            while True:
+                with self._lock:
+                    self._idle += 1
+                try:
+                    job = self._jobs.get()
+                finally:
+                    with self._lock:
+                        self._idle -= 1
+                if job is _STOP:
+                    return
+                fn, fut = job
+                if not fut.set_running_or_notify_cancel():
+                    continue  # the caller gave up before a worker was free
+                try:
+                    if context is None:
+                        pw, browser, context = self._launch()
+                    fut.set_result(fn(context))
+                except BaseException as e:
+                    self.counters['errors'] += 1
+                    fut.set_exception(e)
+                    if browser is not None and not browser.is_connected():
+                        # crashed browser: relaunch on the next job
+                        pw, browser, context = _shutdown(pw, browser, context)
+        finally:
+            _shutdown(pw, browser, context)
+
+    def submit(self, fn: Callable[[Any], Any]) -> Future:
+        """Queue `fn(context)` for the next free worker; returns its Future."""
+        if sync_playwright is None:
+            raise ImportError("playwright is not installed: pip install playwright && playwright install")
+        fut: Future = Future()
+        self._spawn_if_needed()
+        self.counters['jobs'] += 1
+        self._jobs.put((fn, fut))
+        return fut
+
+    def run(self, fn: Callable[[Any], Any], timeout: Optional[float] = None) -> Any:
+        """Submit `fn` and wait for its result; TimeoutError after `timeout` (default job_timeout) seconds."""
+        fut = self.submit(fn)
+        try:
+            return fut.result(timeout=timeout or self.job_timeout)
+        except FutureTimeout:
+            self.counters['timeouts'] += 1
+            fut.cancel()
+            raise TimeoutError(f"playwright job timed out after {timeout or self.job_timeout}s")
+
+    def close(self, wait: float = 10.0):
+        """Stop the workers (each closes its own browser) once queued jobs are done."""
+        with self._lock:
+            self._closed = True
+            threads = list(self._threads)
+        for _ in threads:
+            self._jobs.put(_STOP)
+        deadline = time.monotonic() + wait
+        for t in threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            alive = sum(1 for t in self._threads if t.is_alive())
+        return {**self.counters, 'workers': alive, 'max_workers': self.max_workers, 'queued': self._jobs.qsize()}
+
+
+def _shutdown(pw, browser, context):
+    for obj, method in ((context, 'close'), (browser, 'close'), (pw, 'stop')):
+        if obj is not None:
+            try:
+                getattr(obj, method)()
+            except Exception:
+                pass
+    return None, None, None
+
+
+# --- request interception and per-page accounting ---------------------------------------------
+
+DEFAULT_BLOCK = {
+    'resource_types': ['image', 'font', 'media'],
+    'deny_hosts': ['googletagmanager.com', 'google-analytics.com', 'doubleclick.net', 'googlesyndication.com',
+                   'facebook.net', 'hotjar.com', 'clarity.ms', 'scorecardresearch.com',
+                   'cookielaw.org', 'onetrust.com'],
+    # when non-empty, only the page's own host and these hosts may load anything
+    'allow_hosts': [],
+}
+
+_intercept = True
+_block: Dict[str, Any] = dict(DEFAULT_BLOCK)
+_profiles: Dict[str, Dict[str, Any]] = {}
+_page_log: 'deque' = deque(maxlen=200)
+_totals: Dict[str, Dict[str, Any]] = {}
+_stats_lock = threading.Lock()
+
+
+def set_interception(enabled: bool):
+    global _intercept
+    _intercept = bool(enabled)
+
+
+def set_profile(host: str, **profile):
+    """Block settings for pages of `host` (and its subdomains), overriding the default keys given."""
+    _profiles[host_policy.host_of('https://' + host.lower())] = profile
+
+
+def configure_profiles(cfg: Dict[str, Any]):
+    """Load `playwright.block`, `playwright.profiles` and per-site `playwright` blocks from a config dict."""
+    global _block
+    section = cfg.get('playwright') or {}
+    if 'intercept' in section:
+        set_interception(section['intercept'])
+    if isinstance(section.get('block'), dict):
+        _block = {**DEFAULT_BLOCK, **section['block']}
+    for host, profile in (section.get('profiles') or {}).items():
+        if isinstance(profile, dict):
+            set_profile(host, **profile)
+    for site in cfg.get('sites') or []:
+        if isinstance(site.get('playwright'), dict) and site.get('url'):
+            set_profile(host_policy.host_of(site['url']), **site['playwright'])
+
+
+def _host_matches(host: str, patterns) -> bool:
+    return any(host == p or host.endswith('.' + p) for p in patterns or ())
+
+
+def profile_for(url: str) -> Dict[str, Any]:
+    """Effective block profile for a page: the default with the most specific host profile on top."""
+    parts = host_policy.host_of(url).split('.')
+    for i in range(len(parts) - 1):
+        prof = _profiles.get('.'.join(parts[i:]))
+        if prof is not None:
+            return {**_block, **prof}
+    return _block
+
+
+class _PageStats:
+    """Requests, blocked requests and transferred bytes (response headers + encoded body) of one page."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.host = host_policy.host_of(url)
+        self.profile = profile_for(url) if _intercept else None
+        self.requests = self.blocked = self.bytes = 0
+        self.start = time.monotonic()
+
+    def blocks(self, req_url: str, resource_type: str) -> bool:
+        prof = self.profile
+        if prof is None:
+            return False
+        if resource_type in (prof.get('resource_types') or ()):
+            return True
+        host = host_policy.host_of(req_url)
+        if _host_matches(host, prof.get('deny_hosts')):
+            return True
+        allow = prof.get('allow_hosts')
+        return bool(allow) and not (_host_matches(host, [self.host]) or _host_matches(host, allow))
+
+    def add_sizes(self, sizes: Dict[str, int], response=None):
+        """Count a finished request: `request.sizes()`, else the declared content-length."""
+        try:
+            if sizes:
+                self.bytes += max(0, sizes.get('responseBodySize') or 0) + max(0, sizes.get('responseHeadersSize') or 0)
+            elif response is not None:
+                self.bytes += int(response.headers.get('content-length') or 0)
         except Exception:
             pass
-    html = page.content()
+
+    def on_finished(self, request):
+        try:
+            sizes = request.sizes()
+        except Exception:
+            sizes = None
+        self.add_sizes(sizes, None if sizes else _response_of(request))
+
+    async def aon_finished(self, request):
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            sizes = None
+        self.add_sizes(sizes, None if sizes else await _aresponse_of(request))
+
+    def finish(self, ok: bool = True):
+        ms = (time.monotonic() - self.start) * 1000
+        rec = {'url': self.url, 'ms': round(ms), 'requests': self.requests, 'blocked': self.blocked,
+               'bytes': self.bytes, 'intercept': self.profile is not None, 'ok': ok}
+        with _stats_lock:
+            _page_log.append(rec)
+            tot = _totals.setdefault(self.host, {'pages': 0, 'ms': 0, 'requests': 0, 'blocked': 0, 'bytes': 0})
+            tot['pages'] += 1
+            for k in ('ms', 'requests', 'blocked', 'bytes'):
+                tot[k] += rec[k]
+        return rec
+
+
+def _response_of(request):
     try:
-        page.close()
+        return request.response()
     except Exception:
-        pass
-    return html
+        return None
 
 
-def extract_markets_near_labels(url: str, labels: list, timeout: int = 15000, headless: bool = True) -> list:
-    """Use Playwright to find occurrences of text labels and extract nearby numeric values (odds).
+async def _aresponse_of(request):
+    try:
+        return await request.response()
+    except Exception:
+        return None
 
-    Reuses the browser to improve performance.
 
-    Returns list of dicts: {'label': label_text, 'odds': [{'text': matched_text, 'value': float, 'html': node_outerHTML}], 'source_url': url}
+def _watch(page, url: str) -> _PageStats:
+    """Route and account every request of a sync-API page."""
+    st = _PageStats(url)
+
+    def handle(route):
+        req = route.request
+        st.requests += 1
+        if st.blocks(req.url, req.resource_type):
+            st.blocked += 1
+            route.abort()
+        else:
+            route.continue_()
+
+    if st.profile is not None:
+        page.route('**/*', handle)
+    else:
+        page.on('request', lambda req: setattr(st, 'requests', st.requests + 1))
+    # sizes are final (compressed and chunked bodies included) once the request has finished
+    page.on('requestfinished', st.on_finished)
+    return st
+
+
+async def _awatch(page, url: str) -> _PageStats:
+    """`_watch` for async-API pages."""
+    st = _PageStats(url)
+
+    async def handle(route):
+        req = route.request
+        st.requests += 1
+        if st.blocks(req.url, req.resource_type):
+            st.blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    if st.profile is not None:
+        await page.route('**/*', handle)
+    else:
+        page.on('request', lambda req: setattr(st, 'requests', st.requests + 1))
+    page.on('requestfinished', st.aon_finished)
+    return st
+
+
+def render_stats(recent: int = 0) -> Dict[str, Any]:
+    """Per-host totals of rendered pages (time, requests, blocked, bytes); `recent` adds the last N pages."""
+    with _stats_lock:
+        out: Dict[str, Any] = {'hosts': {h: {**t, 'avg_ms': round(t['ms'] / t['pages']) if t['pages'] else 0,
+                                             'avg_kb': round(t['bytes'] / 1024 / t['pages'], 1) if t['pages'] else 0}
+                                         for h, t in _totals.items()}}
+        if recent:
+            out['pages'] = list(_page_log)[-recent:]
+    return out
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+_workers = DEFAULT_WORKERS
+_headless = True
+_job_timeout = DEFAULT_JOB_TIMEOUT
+_pages = DEFAULT_PAGES
+
+
+def get_pool() -> BrowserPool:
+    """The shared pool, created on first use with the configured size."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(_workers, headless=_headless, job_timeout=_job_timeout)
+        return _pool
+
+
+def set_workers(n: int):
+    """Browsers to run in parallel; a running pool is resized for the next renders."""
+    global _workers
+    _workers = max(1, int(n))
+    with _pool_lock:
+        if _pool is not None:
+            _pool.max_workers = _workers
+
+
+def set_pages(n: int):
+    """Concurrent pages per browser for the batch (async) APIs."""
+    global _pages
+    _pages = max(1, int(n))
+
+
+def configure_playwright(cfg: Optional[Dict[str, Any]]):
+    """Apply a `playwright` config section: {workers, pages, headless, job_timeout, session_idle, label_caps}.
+
+    Block profiles need the whole config (per-site blocks): see `configure_profiles`.
     """
-    results = []
-    ctx = _ensure_playwright(headless=headless)
-    page = ctx.new_page()
-    page.goto(url, timeout=timeout)
+    global _headless, _job_timeout, _session_idle
+    if not cfg:
+        return
+    if cfg.get('workers'):
+        set_workers(cfg['workers'])
+    if cfg.get('pages'):
+        set_pages(cfg['pages'])
+    if 'headless' in cfg:
+        _headless = bool(cfg['headless'])
+    if cfg.get('job_timeout'):
+        _job_timeout = float(cfg['job_timeout'])
+    if cfg.get('session_idle'):
+        _session_idle = float(cfg['session_idle'])
+    caps = cfg.get('label_caps') or {}
+    if caps:
+        set_label_caps(caps.get('matches'), caps.get('odds'), caps.get('per_label'))
+
 
-    # limit per-page search to avoid very expensive scans
-    for label in labels:
+def pool_stats() -> Optional[Dict[str, Any]]:
+    return _pool.stats() if _pool is not None else None
+
+
+def close_playwright():
+    """Close the pool's browsers to free resources (a later render starts a new pool)."""
+    global _pool
+    clear_sessions()
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
         try:
-            loc = page.locator(f"text={label}")
-            count = loc.count()
+            pool.close()
         except Exception:
-            count = 0
-        for i in range(count):
+            pass
+
+
+def _job_timeout_for(timeout_ms: int) -> float:
+    # navigation + selector wait + content, plus time spent queued behind other renders
+    return max(_job_timeout, 3 * timeout_ms / 1000.0)
+
+
+def fetch_html_playwright(url: str, wait_for: str = None, timeout: int = 15000, headless: bool = True,
+                          use_cache: bool = True) -> str:
+    """Fetch a page using Playwright and return the page content HTML.
+
+    Rendered on the shared browser pool, so calls from several threads load pages in
+    parallel. Rendered pages are stored in the persistent cache (when enabled) under the
+    'playwright' transport, so a fresh copy skips the browser entirely.
+
+    wait_for: optional selector to wait for before returning content.
+    timeout: milliseconds
+    """
+    if replay.replaying():
+        return replay.lookup('playwright', url, wait_for or '')
+    disk = http_cache.get_disk_cache() if use_cache else None
+    if disk:
+        entry = disk.get(url, transport='playwright')
+        if entry and entry['fresh']:
+            replay.record('playwright', url, entry['body'], wait_for or '')
+            return entry['body']
+
+    def job(ctx):
+        page = ctx.new_page()
+        st = _watch(page, url)
+        ok = False
+        try:
+            with host_policy.limit(url):
+                page.goto(url, timeout=timeout)
+            if wait_for:
+                try:
+                    page.wait_for_selector(wait_for, timeout=timeout)
+                except Exception:
+                    pass
+            html = page.content()
+            ok = True
+            return html
+        finally:
+            st.finish(ok)
             try:
-                el = loc.nth(i)
-                # evaluate in page: search nearby (container or parent subtree) for numeric tokens that look like odds
-                js = r'''
-(node) => {
-  const res = [];
-  const container = node.closest('[class*="market"], [class*="odd"], [class*="odds"], [class*="selection"], [class*="price"], [id*="market"]') || node.parentElement || node;
-  const walker = document.createTreeWalker(container, NodeFilter.SHOW_ELEMENT, null, false);
-  let hits = 0;
+                page.close()
+            except Exception:
+                pass
+
+    def render():
+        html = get_pool().run(job, timeout=_job_timeout_for(timeout))
+        if disk:
+            disk.put(url, html, transport='playwright')
+        return html
+
+    # identical in-flight renders (same URL and wait selector) share one page load
+    html = http_cache.single_flight(f"playwright:{wait_for or ''}", url, render)
+    replay.record('playwright', url, html, wait_for or '')
+    return html
+
+
+# Finds every label, walks each match's market container and collects odds-looking numbers in one
+# page.evaluate: `text=<label>` locators cost a browser round trip per label plus one per match.
+# A match is the element owning a text node that contains the label (case-insensitive), which is
+# what Playwright's text= selector returns unless the label spans several elements.
+_LABELS_JS = r'''
+(args) => {
+  const t0 = performance.now();
+  const labels = args.labels.map((l) => [l, l.toLowerCase()]);
+  const caps = args.caps || {};
+  const found = labels.map(() => []);
+  const seen = labels.map(() => new Set());
+  const skip = {SCRIPT: 1, STYLE: 1, NOSCRIPT: 1, TEMPLATE: 1};
+  const walker = document.createTreeWalker(document.body || document.documentElement, NodeFilter.SHOW_TEXT, null, false);
+  let nodes = 0;
   while (walker.nextNode()) {
-    try {
-      const txt = (walker.currentNode.innerText || '').trim();
-      const m = txt.match(/[0-9]{1,3}(?:[.,][0-9]{1,3})/);
-      if (m) {
-        res.push({text: m[0], html: walker.currentNode.outerHTML});
-        hits++;
+    const node = walker.currentNode;
+    const el = node.parentElement;
+    nodes++;
+    if (!el || skip[el.tagName]) continue;
+    const txt = node.data.toLowerCase();
+    for (let i = 0; i < labels.length; i++) {
+      const cap = caps[labels[i][0]] === undefined ? args.matches : caps[labels[i][0]];
+      if (found[i].length >= cap || !txt.includes(labels[i][1]) || seen[i].has(el)) continue;
+      seen[i].add(el);
+      found[i].push(el);
+    }
+  }
+  const t1 = performance.now();
+  const results = [];
+  let containers = 0;
+  const re = /[0-9]{1,3}(?:[.,][0-9]{1,3})/;
+  for (let i = 0; i < labels.length; i++) {
+    for (const node of found[i]) {
+      const container = node.closest('[class*="market"], [class*="odd"], [class*="odds"], [class*="selection"], [class*="price"], [id*="market"]') || node.parentElement || node;
+      const odds = [];
+      const w = document.createTreeWalker(container, NodeFilter.SHOW_ELEMENT, null, false);
+      containers++;
+      while (w.nextNode()) {
+        try {
+          const m = (w.currentNode.innerText || '').trim().match(re);
+          if (m) odds.push({text: m[0], html: w.currentNode.outerHTML});
+        } catch (e) { continue; }
+        if (odds.length >= args.odds) break;
       }
-    } catch (e) { continue; }
-    if (hits > 8) break;
+      results.push({label: labels[i][0], odds: odds});
+    }
   }
-  return res;
+  const t2 = performance.now();
+  return {results: results, timing: {find_ms: t1 - t0, walk_ms: t2 - t1, text_nodes: nodes, containers: containers}};
 }
 '''
-                found = el.evaluate(js)
-                parsed = []
-                for item in found:
-                    txt = item.get('text')
-                    # normalize comma decimals
-                    if txt and isinstance(txt, str):
-                        try:
-                            v = float(txt.replace(',', '.'))
-                        except Exception:
-                            continue
-                        # coarse filter: plausible range for odds (narrower to avoid cookie/modal noise)
-                        if 1.01 <= v <= 15:
-                            parsed.append(
-                                {'text': txt, 'value': v, 'html': item.get('html')})
-                if parsed:
-                    results.append(
-                        {'label': label, 'odds': parsed, 'source_url': url})
+
+DEFAULT_LABEL_MATCHES = 50
+DEFAULT_LABEL_ODDS = 9
+
+_label_matches = DEFAULT_LABEL_MATCHES
+_label_odds = DEFAULT_LABEL_ODDS
+_label_caps: Dict[str, int] = {}
+_label_timing = {'pages': 0, 'labels': 0, 'containers': 0, 'find_ms': 0.0, 'walk_ms': 0.0,
+                 'evaluate_ms': 0.0, 'parse_ms': 0.0}
+
+
+def set_label_caps(matches: int = None, odds: int = None, per_label: Dict[str, int] = None):
+    """Limits of the in-page label scan: matches per label, odds per match, and per-label match caps."""
+    global _label_matches, _label_odds
+    if matches is not None:
+        _label_matches = max(0, int(matches))
+    if odds is not None:
+        _label_odds = max(1, int(odds))
+    if per_label is not None:
+        _label_caps.clear()
+        _label_caps.update({str(k): max(0, int(v)) for k, v in per_label.items()})
+
+
+def _labels_args(labels: list) -> Dict[str, Any]:
+    return {'labels': list(labels), 'matches': _label_matches, 'odds': _label_odds,
+            'caps': {l: _label_caps[l] for l in labels if l in _label_caps}}
+
+
+def _labels_result(raw: Dict[str, Any], url: str, evaluate_ms: float) -> list:
+    t0 = time.monotonic()
+    results = []
+    for block in (raw or {}).get('results') or []:
+        parsed = _parse_odds(block.get('odds'))
+        if parsed:
+            results.append({'label': block.get('label'), 'odds': parsed, 'source_url': url})
+    timing = (raw or {}).get('timing') or {}
+    with _stats_lock:
+        _label_timing['pages'] += 1
+        _label_timing['labels'] += len(results)
+        _label_timing['containers'] += int(timing.get('containers') or 0)
+        _label_timing['find_ms'] += float(timing.get('find_ms') or 0)
+        _label_timing['walk_ms'] += float(timing.get('walk_ms') or 0)
+        _label_timing['evaluate_ms'] += evaluate_ms
+        _label_timing['parse_ms'] += (time.monotonic() - t0) * 1000
+    return results
+
+
+def label_stats() -> Dict[str, Any]:
+    """Time spent in label extraction: in-page find/walk, the evaluate round trip and odds parsing."""
+    with _stats_lock:
+        out = dict(_label_timing)
+    for k in ('find_ms', 'walk_ms', 'evaluate_ms', 'parse_ms'):
+        out[k] = round(out[k], 1)
+    return out
+
+
+def _parse_odds(found: list) -> list:
+    parsed = []
+    for item in found or []:
+        txt = item.get('text')
+        # normalize comma decimals
+        if txt and isinstance(txt, str):
+            try:
+                v = float(txt.replace(',', '.'))
             except Exception:
                 continue
-    try:
-        page.close()
-    except Exception:
-        pass
+            # coarse filter: plausible range for odds (narrower to avoid cookie/modal noise)
+            if 1.01 <= v <= 15:
+                parsed.append({'text': txt, 'value': v, 'html': item.get('html')})
+    return parsed
+
+
+def _labels_on_page(page, url: str, labels: list) -> list:
+    t0 = time.monotonic()
+    raw = page.evaluate(_LABELS_JS, _labels_args(labels))
+    return _labels_result(raw, url, (time.monotonic() - t0) * 1000)
+
+
+def extract_markets_near_labels(url: str, labels: list, timeout: int = 15000, headless: bool = True) -> list:
+    """Use Playwright to find occurrences of text labels and extract nearby numeric values (odds).
+
+    Runs on the shared browser pool like `fetch_html_playwright`.
+
+    Returns list of dicts: {'label': label_text, 'odds': [{'text': matched_text, 'value': float, 'html': node_outerHTML}], 'source_url': url}
+    """
+    replay_key = '|'.join(labels)
+    if replay.replaying():
+        return replay.lookup_json('labels', url, replay_key)
+
+    def job(ctx):
+        page = ctx.new_page()
+        st = _watch(page, url)
+        ok = False
+        try:
+            with host_policy.limit(url):
+                page.goto(url, timeout=timeout)
+            results = _labels_on_page(page, url, labels)
+            ok = True
+            return results
+        finally:
+            st.finish(ok)
+            try:
+                page.close()
+            except Exception:
+                pass
+
+    results = get_pool().run(job, timeout=_job_timeout_for(timeout))
+    replay.record_json('labels', url, results, replay_key)
     return results
+
+
+# --- one-navigation page sessions --------------------------------------------------------------
+
+_session_idle = DEFAULT_SESSION_IDLE
+
+
+class PageSession:
+    """A page rendered once and queried many times: DOM HTML, label blocks, custom extractors.
+
+    The page is opened lazily on a pool worker and held there (sync Playwright objects are
+    bound to their thread) until the last `with` block exits or it sits idle for
+    `session_idle` seconds; queries are shipped to that worker. Results are memoized, so
+    they outlive the page: asking again after close costs nothing, and only a query that
+    was never answered navigates again.
+    """
+
+    def __init__(self, url: str, timeout: int = 15000, use_cache: bool = True):
+        self.url = url
+        self.timeout = timeout
+        self.use_cache = use_cache
+        self._lock = threading.RLock()
+        self._calls: Optional['queue.Queue'] = None
+        self._memo: Dict[Any, Any] = {}
+        self._users = 0
+        self.counters = {'navigations': 0, 'calls': 0, 'reused': 0}
+
+    def __enter__(self):
+        with self._lock:
+            self._users += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self._users -= 1
+            if self._users <= 0:
+                self._users = 0
+                self.close()
+
+    @property
+    def is_open(self) -> bool:
+        return self._calls is not None
+
+    def _open(self):
+        calls: 'queue.Queue' = queue.Queue()
+        ready: Future = Future()
+
+        def hold(ctx):
+            page = ctx.new_page()
+            st = _watch(page, self.url)
+            ok = False
+            try:
+                with host_policy.limit(self.url):
+                    page.goto(self.url, timeout=self.timeout)
+                ok = True
+                ready.set_result(True)
+                while True:
+                    try:
+                        item = calls.get(timeout=_session_idle)
+                    except queue.Empty:
+                        item = _STOP
+                    if item is _STOP:
+                        break
+                    fn, fut = item
+                    if not fut.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        fut.set_result(fn(page))
+                    except BaseException as e:
+                        fut.set_exception(e)
+            except BaseException as e:
+                if not ready.done():
+                    ready.set_exception(e)
+                raise
+            finally:
+                with self._lock:
+                    if self._calls is calls:
+                        self._calls = None
+                # queries that raced the idle close fail instead of waiting forever
+                while True:
+                    try:
+                        item = calls.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not _STOP and item[1].set_running_or_notify_cancel():
+                        item[1].set_exception(RuntimeError('page session closed'))
+                st.finish(ok)
+                try:
+                    page.close()
+                except Exception:
+                    pass
+
+        get_pool().submit(hold)
+        self.counters['navigations'] += 1
+        try:
+            ready.result(timeout=_job_timeout_for(self.timeout))
+        except FutureTimeout:
+            calls.put(_STOP)
+            raise TimeoutError(f"playwright navigation to {self.url} timed out")
+        self._calls = calls
+
+    def run(self, fn: Callable[[Any], Any], key: Any = None, timeout: Optional[float] = None) -> Any:
+        """Run `fn(page)` on the rendered page; with `key`, the result is memoized under it."""
+        if key is not None:
+            with self._lock:
+                if key in self._memo:
+                    self.counters['reused'] += 1
+                    return self._memo[key]
+        fut: Future = Future()
+        with self._lock:
+            if self._calls is None:
+                self._open()
+            self._calls.put((fn, fut))
+            self.counters['calls'] += 1
+        try:
+            result = fut.result(timeout=timeout or _job_timeout_for(self.timeout))
+        except FutureTimeout:
+            fut.cancel()
+            raise TimeoutError(f"playwright query on {self.url} timed out")
+        if key is not None:
+            with self._lock:
+                self._memo[key] = result
+        return result
+
+    def evaluate(self, expression: str, arg: Any = None, key: Any = None) -> Any:
+        """`page.evaluate(expression, arg)` on the rendered page."""
+        return self.run(lambda page: page.evaluate(expression, arg), key=key)
+
+    def html(self, wait_for: str = None) -> str:
+        """The rendered DOM HTML (disk cache and replay like `fetch_html_playwright`)."""
+        key = ('html', wait_for or '')
+        if replay.replaying():
+            return replay.lookup('playwright', self.url, wait_for or '')
+        with self._lock:
+            if key in self._memo:
+                self.counters['reused'] += 1
+                return self._memo[key]
+            disk = http_cache.get_disk_cache() if self.use_cache else None
+            if disk and not self.is_open:
+                entry = disk.get(self.url, transport='playwright')
+                if entry and entry['fresh']:
+                    self._memo[key] = entry['body']
+                    replay.record('playwright', self.url, entry['body'], wait_for or '')
+                    return entry['body']
+
+        def content(page):
+            if wait_for:
+                try:
+                    page.wait_for_selector(wait_for, timeout=self.timeout)
+                except Exception:
+                    pass
+            return page.content()
+
+        html = self.run(content, key=key)
+        if disk:
+            disk.put(self.url, html, transport='playwright')
+        replay.record('playwright', self.url, html, wait_for or '')
+        return html
+
+    def labels(self, labels: list) -> list:
+        """`extract_markets_near_labels` on the rendered page."""
+        replay_key = '|'.join(labels)
+        if replay.replaying():
+            return replay.lookup_json('labels', self.url, replay_key)
+        results = self.run(lambda page: _labels_on_page(page, self.url, labels), key=('labels', tuple(labels)))
+        replay.record_json('labels', self.url, results, replay_key)
+        return results
+
+    def close(self):
+        """Release the page (memoized results stay available)."""
+        with self._lock:
+            calls, self._calls = self._calls, None
+        if calls is not None:
+            calls.put(_STOP)
+
+
+_sessions: 'OrderedDict[str, PageSession]' = OrderedDict()
+_sessions_lock = threading.Lock()
+_max_sessions = 64
+
+
+def session_for(url: str, session: Optional[PageSession] = None, timeout: int = 15000) -> PageSession:
+    """`session` when given, else this run's shared session for `url` (created on first use)."""
+    if session is not None:
+        return session
+    with _sessions_lock:
+        s = _sessions.get(url)
+        if s is None:
+            s = _sessions[url] = PageSession(url, timeout=timeout)
+            while len(_sessions) > _max_sessions:
+                _, old = _sessions.popitem(last=False)
+                old.close()
+        else:
+            _sessions.move_to_end(url)
+        return s
+
+
+def clear_sessions():
+    """Close and forget every shared session (the next query on a URL navigates again)."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for s in sessions:
+        s.close()
+
+
+def session_stats() -> Dict[str, Any]:
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+    out = {'sessions': len(sessions), 'open': sum(1 for s in sessions if s.is_open)}
+    for key in ('navigations', 'calls', 'reused'):
+        out[key] = sum(s.counters[key] for s in sessions)
+    return out
+
+
+# --- asyncio engine: many pages per browser ---------------------------------------------------
+
+@asynccontextmanager
+async def _alimit(url: str):
+    """host_policy.limit for coroutines: the blocking slot wait runs off the event loop."""
+    lim = host_policy.get_limiter(url)
+    if lim is None:
+        yield
+        return
+    fut = asyncio.get_running_loop().run_in_executor(None, lim.acquire)
+    try:
+        await asyncio.shield(fut)
+    except asyncio.CancelledError:
+        # the executor thread still gets the slot: hand it back as soon as it does
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception() is not None or lim.release())
+        raise
+    try:
+        yield
+    finally:
+        lim.release()
+
+
+class AsyncRenderer:
+    """One headless browser driving up to `pages` pages concurrently.
+
+        async with AsyncRenderer(pages=12) as r:
+            html = await r.render(url)
+    """
+
+    def __init__(self, pages: int = None, headless: bool = None):
+        self.pages = max(1, int(pages or _pages))
+        self.headless = _headless if headless is None else headless
+        self._pw = self._browser = self._context = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self.counters = {'pages': 0, 'errors': 0}
+
+    async def __aenter__(self):
+        if async_playwright is None:
+            raise ImportError("playwright is not installed: pip install playwright && playwright install")
+        self._sem = asyncio.Semaphore(self.pages)
+        self._pw = await async_playwright().start()
+        try:
+            self._browser = await self._pw.chromium.launch(headless=self.headless, args=["--no-sandbox"])
+            self._context = await self._browser.new_context()
+        except BaseException:
+            await self.close()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        for obj, method in ((self._context, 'close'), (self._browser, 'close'), (self._pw, 'stop')):
+            if obj is not None:
+                try:
+                    await getattr(obj, method)()
+                except Exception:
+                    pass
+        self._pw = self._browser = self._context = None
+
+    async def _with_page(self, url: str, timeout: int, fn):
+        async with self._sem:
+            self.counters['pages'] += 1
+            page = await self._context.new_page()
+            st = await _awatch(page, url)
+            ok = False
+            try:
+                async with _alimit(url):
+                    await page.goto(url, timeout=timeout)
+                result = await fn(page)
+                ok = True
+                return result
+            except BaseException:
+                self.counters['errors'] += 1
+                raise
+            finally:
+                st.finish(ok)
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+
+    async def render(self, url: str, wait_for: str = None, timeout: int = 15000) -> str:
+        async def content(page):
+            if wait_for:
+                try:
+                    await page.wait_for_selector(wait_for, timeout=timeout)
+                except Exception:
+                    pass
+            return await page.content()
+        return await self._with_page(url, timeout, content)
+
+    async def labels(self, url: str, labels: list, timeout: int = 15000) -> list:
+        async def run(page):
+            t0 = time.monotonic()
+            raw = await page.evaluate(_LABELS_JS, _labels_args(labels))
+            return _labels_result(raw, url, (time.monotonic() - t0) * 1000)
+        return await self._with_page(url, timeout, run)
+
+
+async def _as_completed(coros: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+    async def one(key, coro):
+        try:
+            return key, await coro
+        except Exception:
+            return key, None
+
+    tasks = [asyncio.ensure_future(one(k, c)) for k, c in coros.items()]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+async def arender_many(urls: Iterable[str], wait_for: str = None, timeout: int = 15000, pages: int = None,
+                       use_cache: bool = True) -> AsyncIterator[Tuple[str, Optional[str]]]:
+    """Render `urls` concurrently in one browser and yield `(url, html)` in completion order.
+
+    Replay archives and fresh disk-cache entries are served without the browser, which is only
+    launched when something is left to render. A page that fails yields `(url, None)`.
+    """
+    todo = list(dict.fromkeys(u for u in urls if u))
+    disk = http_cache.get_disk_cache() if use_cache else None
+    left = []
+    for u in todo:
+        if replay.replaying():
+            try:
+                yield u, replay.lookup('playwright', u, wait_for or '')
+            except Exception:
+                yield u, None
+            continue
+        entry = disk.get(u, transport='playwright') if disk else None
+        if entry and entry['fresh']:
+            replay.record('playwright', u, entry['body'], wait_for or '')
+            yield u, entry['body']
+        else:
+            left.append(u)
+    if not left:
+        return
+    async with AsyncRenderer(pages=pages) as r:
+        async for u, html in _as_completed({u: r.render(u, wait_for=wait_for, timeout=timeout) for u in left}):
+            if html is not None:
+                if disk:
+                    disk.put(u, html, transport='playwright')
+                replay.record('playwright', u, html, wait_for or '')
+            yield u, html
+
+
+async def aextract_markets_many(urls: Iterable[str], labels: list, timeout: int = 15000,
+                                pages: int = None) -> AsyncIterator[Tuple[str, Optional[list]]]:
+    """`extract_markets_near_labels` for many pages at once, yielding `(url, results)` as they finish."""
+    todo = list(dict.fromkeys(u for u in urls if u))
+    replay_key = '|'.join(labels)
+    if replay.replaying():
+        for u in todo:
+            try:
+                yield u, replay.lookup_json('labels', u, replay_key)
+            except Exception:
+                yield u, None
+        return
+    if not todo:
+        return
+    async with AsyncRenderer(pages=pages) as r:
+        async for u, results in _as_completed({u: r.labels(u, labels, timeout=timeout) for u in todo}):
+            if results is not None:
+                replay.record_json('labels', u, results, replay_key)
+            yield u, results
+
+
+def fetch_many_rendered(urls: Iterable[str], wait_for: str = None, timeout: int = 15000, pages: int = None,
+                        use_cache: bool = True) -> Iterator[Tuple[str, Optional[str]]]:
+    """Synchronous generator over `arender_many`: `(url, html)` as pages finish rendering."""
+    from async_fetch import iterate
+
+    urls = list(urls)
+    return iterate(lambda: arender_many(urls, wait_for=wait_for, timeout=timeout, pages=pages, use_cache=use_cache))
+
+
+def extract_markets_many(urls: Iterable[str], labels: list, timeout: int = 15000,
+                         pages: int = None) -> Dict[str, List[dict]]:
+    """Label extraction for many pages concurrently: {url: results} (failed pages map to [])."""
+    from async_fetch import iterate
+
+    urls = list(urls)
+    return {u: res or [] for u, res in iterate(lambda: aextract_markets_many(urls, labels, timeout=timeout, pages=pages))}
@@ -1,20 +1,29 @@
 import re
+import threading
 import requests
 from bs4 import BeautifulSoup
+from functools import cached_property
 from typing import Dict, Any
-
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                  "(KHTML, like Gecko) Chrome/115.0 Safari/537.36",
-    "Accept-Language": "pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-}
+from urllib.parse import urlsplit, urlunsplit
+
+import embedded_state
+import fixture_index
+import http_cache
+import html_parser
+import market_scan
+import http_client
+import host_policy
+import replay
+import sofascore_api
+import stats_db
+from http_client import HEADERS
+from async_fetch import afetch_many, fetch_many
 
 
 # Simple runtime modes/caches to speed up repeated runs
 _FAST_MODE = False
 _CACHE_ENABLED = False
-_html_cache = {}
+_html_cache = http_cache.MemoryCache()
 
 
 def set_fast_mode(val: bool):
@@ -22,63 +31,237 @@ def set_fast_mode(val: bool):
     _FAST_MODE = bool(val)
 
 
-def set_cache_enabled(val: bool):
+def set_cache_enabled(val: bool, max_bytes: int = None, ttl: float = None):
+    """Toggle the in-memory page cache; optionally resize its byte budget / entry TTL."""
     global _CACHE_ENABLED
     _CACHE_ENABLED = bool(val)
+    if max_bytes is not None:
+        _html_cache.max_bytes = int(max_bytes)
+    if ttl is not None:
+        _html_cache.ttl = ttl
 
 
 def clear_cache():
-    global _html_cache
-    _html_cache = {}
+    _html_cache.clear()
+    _match_pages.clear()
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Hit/miss/eviction counters and size of the in-memory page cache, plus coalesced fetches."""
+    return {**_html_cache.stats(), 'coalesced': http_cache.inflight_stats()['saved']}
+
+
+def fetch_summary() -> Dict[str, Any]:
+    """Cache, rate-limit, retry and circuit-breaker counters for the run summary."""
+    disk = http_cache.get_disk_cache()
+    hosts: Dict[str, Dict[str, Any]] = {}
+    for h, st in host_policy.limiter_stats().items():
+        hosts.setdefault(h, {})['limits'] = st
+    for h, st in host_policy.breaker_stats().items():
+        hosts.setdefault(h, {})['breaker'] = st
+    neg = http_cache.get_negative_cache()
+    return {'memory_cache': cache_stats(), 'disk_cache': dict(disk.counters) if disk else None,
+            'negative_cache': dict(neg.counters) if neg else None, 'replay': replay.replay_stats(),
+            'sofascore_api': sofascore_api.api_stats(), 'reduction': html_parser.reduction_stats(),
+            'playwright': _playwright_stats(),
+            'hosts': hosts}
+
+
+def _playwright_stats():
+    try:
+        import rpa_playwright
+    except Exception:
+        return None
+    return {'pool': rpa_playwright.pool_stats(), 'sessions': rpa_playwright.session_stats(),
+            'labels': rpa_playwright.label_stats(), 'render': rpa_playwright.render_stats()['hosts']}
+
+
+def set_disk_cache(path=http_cache.DEFAULT_DB_PATH, ttls=None, default_ttl=http_cache.DEFAULT_TTL):
+    """Enable the persistent on-disk page cache (path=None disables it)."""
+    return http_cache.set_disk_cache(path, ttls=ttls, default_ttl=default_ttl)
+
+
+def configure(cfg: Dict[str, Any]):
+    """Apply fetch-layer settings from a loaded config (config.local.yaml)."""
+    if not cfg:
+        return
+    replay.configure_replay(cfg.get('replay'))
+    host_policy.configure_limits(cfg)
+    host_policy.configure_retries(cfg)
+    if 'host_strategy' in cfg:
+        host_policy.configure_strategy(cfg.get('host_strategy'))
+    if 'http_cache' in cfg:
+        http_cache.configure_disk_cache(cfg.get('http_cache'))
+    if 'negative_cache' in cfg:
+        http_cache.configure_negative_cache(cfg.get('negative_cache'))
+    if 'sofascore_api' in cfg:
+        sofascore_api.configure_api(cfg.get('sofascore_api'))
+    if 'fixture_index' in cfg:
+        fixture_index.configure_fixtures(cfg.get('fixture_index'))
+    meta = cfg.get('match_meta') or {}
+    if not meta.get('enabled', True):
+        set_match_meta_db(False)
+    elif meta.get('db_path') or cfg.get('stats_db_path'):
+        set_match_meta_db(meta.get('db_path') or cfg.get('stats_db_path'))
+    if 'html_parser' in cfg:
+        html_parser.configure_parser(cfg.get('html_parser'))
+    if 'playwright' in cfg or any(isinstance(x, dict) and 'playwright' in x for x in cfg.get('sites') or []):
+        import rpa_playwright
+        rpa_playwright.configure_playwright(cfg.get('playwright'))
+        rpa_playwright.configure_profiles(cfg)
+    pool = cfg.get('http_pool') or {}
+    if pool.get('pool_size'):
+        http_client.set_pool_size(pool['pool_size'])
+    mem = cfg.get('memory_cache')
+    if mem:
+        set_cache_enabled(mem.get('enabled', _CACHE_ENABLED),
+                          max_bytes=int(float(mem.get('max_mb', 256)) * 1024 * 1024),
+                          ttl=mem.get('ttl'))
 
 
 def fetch_html(url: str, timeout: int = 10, use_cache: bool = True) -> str:
-    """Try to fetch using requests first; if it fails with 403 or other server-side block,
-    fallback to Playwright headless browser to retrieve dynamic content.
+    """Fetch a page with the transport that works best for its host.
+
+    Normally requests is tried first; if it fails with 403 or another server-side block
+    the Playwright headless browser retrieves the dynamic content. Hosts that keep
+    blocking plain requests are remembered (host_policy) and go to Playwright first,
+    with an occasional re-probe of the cheap path.
+
+    When the persistent cache is enabled, fresh entries are served from disk and stale
+    ones are revalidated with If-None-Match / If-Modified-Since.
 
     When _FAST_MODE is enabled, do NOT fallback to Playwright and prefer cached/requests-only path.
+    In replay mode (see replay.py) pages come only from the recorded archive.
     """
+    if replay.replaying():
+        return replay.lookup('requests', url)
+    if use_cache and _CACHE_ENABLED:
+        cached = _html_cache.get(url)
+        if cached is not None:
+            replay.record('requests', url, cached)
+            return cached
+    # concurrent callers for the same page wait on a single download
+    html = http_cache.single_flight('requests', url, lambda: _fetch_html_uncached(url, timeout, use_cache))
+    if use_cache and _CACHE_ENABLED:
+        _html_cache.put(url, html)
+    replay.record('requests', url, html)
+    return html
+
+
+def _fetch_html_uncached(url: str, timeout: int, use_cache: bool) -> str:
     import time
-    if use_cache and _CACHE_ENABLED and url in _html_cache:
-        return _html_cache[url]
+    disk = http_cache.get_disk_cache() if use_cache else None
+    entry = disk.get(url) if disk else None
+    if entry and entry['fresh']:
+        return entry['body']
 
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=timeout)
-        resp.raise_for_status()
-        text = resp.text
-        # quick check for bot-block pages
-        if resp.status_code == 200 and ("access denied" in text.lower() or "forbidden" in text.lower()):
-            raise requests.HTTPError("Possibly blocked by site (custom check)")
-        if use_cache and _CACHE_ENABLED:
-            _html_cache[url] = text
-        return text
-    except requests.HTTPError as e:
-        # try Playwright fallback unless fast mode is enabled
-        if _FAST_MODE:
-            raise
-        try:
-            from rpa_playwright import fetch_html_playwright
-        except Exception:
-            raise
-        try:
-            html = fetch_html_playwright(url)
-            if use_cache and _CACHE_ENABLED:
-                _html_cache[url] = html
-            return html
-        except Exception:
-            raise e
-    except Exception:
-        # any other error, re-raise to let caller handle/log
+        host_policy.check_circuit(url)
+    except host_policy.CircuitOpenError:
+        # host is cooling off: a stale copy beats failing
+        if entry:
+            return entry['body']
         raise
 
+    order = ['requests'] if _FAST_MODE else host_policy.transport_order(url)
+    first_error = None
+    missing = None
+    for transport in order:
+        start = time.monotonic()
+        try:
+            if transport == 'requests':
+                html = _fetch_via_requests(url, timeout, disk, entry)
+            else:
+                from rpa_playwright import fetch_html_playwright
+                # the Playwright fetch reads/writes the disk cache on its own
+                html = fetch_html_playwright(url, use_cache=use_cache)
+        except ImportError as e:
+            # Playwright not installed: nothing to record, prefer the real fetch error
+            missing = e
+            continue
+        except requests.HTTPError as e:
+            status = getattr(e.response, 'status_code', None)
+            if _is_block(e):
+                # only a block says this transport does not work for the host
+                host_policy.record(url, transport, False, time.monotonic() - start)
+            elif status in (404, 410):
+                # a missing page (e.g. a guessed candidate URL) was still served fine
+                host_policy.record(url, transport, True, time.monotonic() - start)
+            if host_policy.is_retryable(e):
+                # 429/5xx are the circuit breaker's business, not the transport's
+                host_policy.report_failure(url)
+            else:
+                # a 403/404/block page still proves the host is up
+                host_policy.report_success(url)
+            first_error = first_error or e
+            continue
+        except Exception as e:
+            # timeouts/connection errors say nothing about the transport: the circuit breaker
+            # counts them, the strategy table does not
+            host_policy.report_failure(url)
+            if transport == 'requests':
+                # not blocks: let the caller handle/log them
+                raise
+            first_error = first_error or e
+            continue
+        host_policy.record(url, transport, True, time.monotonic() - start)
+        host_policy.report_success(url)
+        return html
+    raise first_error or missing
+
+
+def _is_block(exc: Exception) -> bool:
+    """403, or a 200 page that looks like a bot block (see `_request_once`)."""
+    resp = getattr(exc, 'response', None)
+    return (resp is not None and resp.status_code == 403) or 'blocked by site' in str(exc)
 
-def extract_with_selector(soup: BeautifulSoup, selector: str):
+
+def _fetch_via_requests(url: str, timeout: int, disk, entry) -> str:
+    """requests transport with jittered exponential backoff on transient errors (timeouts, 429/5xx)."""
+    import time
+    attempts = host_policy.retry_attempts()
+    for attempt in range(attempts):
+        try:
+            return _request_once(url, timeout, disk, entry)
+        except Exception as e:
+            if attempt + 1 >= attempts or not host_policy.is_retryable(e):
+                raise
+            host_policy.note_retry(url)
+            time.sleep(host_policy.backoff_delay(attempt))
+
+
+def _request_once(url: str, timeout: int, disk, entry) -> str:
+    headers = {}
+    if entry and entry['transport'] == 'requests':
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    with host_policy.limit(url):
+        resp = http_client.get(url, headers=headers, timeout=timeout)
+    if resp.status_code == 304 and entry:
+        disk.touch(url)
+        return entry['body']
+    resp.raise_for_status()
+    text = resp.text
+    # quick check for bot-block pages
+    if resp.status_code == 200 and ("access denied" in text.lower() or "forbidden" in text.lower()):
+        raise requests.HTTPError("Possibly blocked by site (custom check)")
+    if disk:
+        disk.put(url, text, status=resp.status_code, etag=resp.headers.get('ETag'),
+                 last_modified=resp.headers.get('Last-Modified'))
+    return text
+
+
+def extract_with_selector(doc, selector: str):
+    """Text of the first element matching `selector` in an html_parser Document (or a soup)."""
     if not selector:
         return None
-    el = soup.select_one(selector)
-    if not el:
-        return None
-    return el.get_text(strip=True)
+    if isinstance(doc, BeautifulSoup):
+        el = doc.select_one(selector)
+        return el.get_text(strip=True) if el else None
+    return doc.select_text(selector)
 
 
 def parse_number(text: str):
@@ -98,23 +281,16 @@ def scrape_stats(url: str, selectors: Dict[str, str]) -> Dict[str, Any]:
     selectors: mapping like {'team_name': '.team .name', 'win_rate': '.win-rate'}
     """
     html = fetch_html(url)
-    soup = BeautifulSoup(html, "html.parser")
+    doc = html_parser.parse(html_parser.reduce_html(html))
     result: Dict[str, Any] = {}
     for key, sel in (selectors or {}).items():
-        text = extract_with_selector(soup, sel)
+        text = extract_with_selector(doc, sel)
         num = parse_number(text)
         result[key] = num if num is not None else text
 
     # If no selectors provided, try some sensible defaults (team name from h1/title)
     if not result:
-        title = None
-        h1 = soup.find("h1")
-        if h1 and h1.get_text(strip=True):
-            title = h1.get_text(strip=True)
-        if not title:
-            t = soup.title
-            if t and t.get_text(strip=True):
-                title = t.get_text(strip=True)
+        title = doc.heading()
         if title:
             result["team_name"] = title
     return result
@@ -124,67 +300,49 @@ def scrape_multiple(url: str, field_selectors: Dict[str, str]):
     return scrape_stats(url, field_selectors)
 
 
-def extract_team_urls_from_sofascore_league(url: str, max_teams: int = 20):
-    """Return a list of team page URLs found on a SofaScore league/tournament page.
+def _sofascore_url(href: str) -> str:
+    """Absolute URL for a SofaScore href (relative paths resolve against www.sofascore.com)."""
+    if href.startswith('//'):
+        href = 'https:' + href
+    if href.startswith('/'):
+        return 'https://www.sofascore.com' + href
+    if href.startswith('http'):
+        parts = urlsplit(href)
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, parts.fragment))
+    return 'https://www.sofascore.com/' + href
 
-    Strategy: look for anchor hrefs with '/team/' and return absolute URLs (deduped).
-    """
+
+def _league_links(url: str, needle: str, limit: int) -> list:
+    # streaming scan of <a href> with early stop: no DOM for large tournament pages (and no
+    # reduction pass either, since only real <a> tags are matched)
     html = fetch_html(url)
-    soup = BeautifulSoup(html, "html.parser")
-    anchors = soup.find_all("a", href=True)
-    teams = []
-    for a in anchors:
-        href = a["href"]
-        if "/team/" in href:
-            # make absolute
-            if href.startswith("/"):
-                full = "https://www.sofascore.com" + href
-            elif href.startswith("http"):
-                full = href
-            else:
-                full = "https://www.sofascore.com/" + href
-            teams.append(full)
-    # dedupe preserving order
     seen = set()
     out = []
-    for t in teams:
-        if t not in seen:
-            seen.add(t)
-            out.append(t)
-        if len(out) >= max_teams:
+    for href in html_parser.iter_links(html, needle):
+        full = _sofascore_url(href)
+        if full in seen:
+            continue
+        seen.add(full)
+        out.append(full)
+        if len(out) >= limit:
             break
     return out
 
 
+def extract_team_urls_from_sofascore_league(url: str, max_teams: int = 20):
+    """Return a list of team page URLs found on a SofaScore league/tournament page.
+
+    Strategy: look for anchor hrefs with '/team/' and return absolute URLs (deduped).
+    """
+    return _league_links(url, '/team/', max_teams)
+
+
 def extract_match_urls_from_sofascore_league(url: str, max_matches: int = 50):
     """Return a list of match page URLs found on a SofaScore league/tournament page.
 
     Strategy: look for anchor hrefs with '/match/' and return absolute URLs (deduped).
     """
-    html = fetch_html(url)
-    soup = BeautifulSoup(html, "html.parser")
-    anchors = soup.find_all("a", href=True)
-    matches = []
-    for a in anchors:
-        href = a["href"]
-        if "/match/" in href:
-            if href.startswith("/"):
-                full = "https://www.sofascore.com" + href
-            elif href.startswith("http"):
-                full = href
-            else:
-                full = "https://www.sofascore.com/" + href
-            matches.append(full)
-    # dedupe preserving order
-    seen = set()
-    out = []
-    for m in matches:
-        if m not in seen:
-            seen.add(m)
-            out.append(m)
-        if len(out) >= max_matches:
-            break
-    return out
+    return _league_links(url, '/match/', max_matches)
 
 
 def get_match_date_from_match_page(url: str):
@@ -195,18 +353,32 @@ def get_match_date_from_match_page(url: str):
     - ISO-like timestamps in page scripts
     Returns a date string 'YYYY-MM-DD' or None if not found.
     """
+    return get_match_page(url).date
+
+
+def parse_match_date(html: str, doc=None, state=None):
+    """Extract the match date (YYYY-MM-DD) from already-fetched match page HTML."""
     import re
     from datetime import datetime
 
-    html = fetch_html(url)
-    soup = BeautifulSoup(html, "html.parser")
+    if not html:
+        return None
+
+    # 0) embedded page state (event startTimestamp)
+    if state is None:
+        state = embedded_state.extract_state(html)
+    date = embedded_state.event_info(embedded_state.find_event(state)).get('date')
+    if date:
+        return date
+
+    if doc is None:
+        doc = html_parser.parse(html_parser.reduce_html(html))
 
     # 1) look for <time datetime="...">
-    time_tag = soup.find("time")
-    if time_tag and time_tag.has_attr("datetime"):
+    stamp = doc.attr("time", "datetime")
+    if stamp:
         try:
-            dt = datetime.fromisoformat(
-                time_tag["datetime"].replace("Z", "+00:00"))
+            dt = datetime.fromisoformat(stamp.replace("Z", "+00:00"))
             return dt.date().isoformat()
         except Exception:
             pass
@@ -241,25 +413,16 @@ def scrape_odds(url: str, selectors: Dict[str, str]) -> Dict[str, Any]:
     return scrape_stats(url, selectors)
 
 
-# precompiled patterns for speed
-_ODD_PATTERN = re.compile(r"\b([0-9]{1,2}(?:\.[0-9]{1,3})?)\b")
-_SCRIPT_STYLE_RE = re.compile(r"<(script|style)[\s\S]*?<\\1>", re.IGNORECASE)
-
-
 def _find_odds_in_html(html: str):
-    # quick cleanup: remove script/style blocks to avoid extracting numeric CSS/JS tokens
+    """(position, value) of every odd-looking number in the reduced page (no script/style/banners)."""
     if not html:
         return []
-    cleaned = _SCRIPT_STYLE_RE.sub(' ', html)
-    o = []
-    for m in _ODD_PATTERN.finditer(cleaned):
-        try:
-            val = float(m.group(1))
-            if 1.01 <= val <= 100.0:
-                o.append((m.start(1), val))
-        except Exception:
-            pass
-    return o
+    cleaned = html_parser.reduce_html(html)
+    return [(t.start, t.value) for t in market_scan.tokenize(cleaned) if t.is_odd]
+
+
+_LINE_RE = re.compile(r"([0-9]+(?:\.[05])?)")
+_1X2_RE = re.compile(r"\b1\s*x\s*2\b|\b1x2\b")
 
 
 def sanitize_markets(markets: list) -> list:
@@ -271,7 +434,6 @@ def sanitize_markets(markets: list) -> list:
     - add 'context_text' cleaned plain-text snippet
     - validate 1X2 groups: require complete triple and reasonable implied probability sum
     """
-    from bs4 import BeautifulSoup
     cleaned = []
     for m in (markets or []):
         try:
@@ -288,23 +450,19 @@ def sanitize_markets(markets: list) -> list:
         # discard CSS/banner-like captures: width/px/%/z-index are signs we grabbed style instead of odds
         if any(css in ctx for css in ('width:', 'px', '%', 'z-index', 'otFloatingRoundedCorner')):
             continue
-        # derive a text snippet for grouping/inspection but avoid expensive parsing for huge contexts
-        try:
-            snippet = m.get('context', '')
-            if len(snippet) > 1000:
-                snippet = snippet[:1000]
-            text = BeautifulSoup(
-                snippet, 'html.parser').get_text(' ', strip=True)
-            m['context_text'] = text[:200]
-        except Exception:
-            m['context_text'] = (m.get('context') or '')[:200]
         cleaned.append(m)
 
+    # derive the text snippets in one batch: markets from the same window share a context,
+    # and html_parser.fragment_text decodes each distinct snippet once
+    for m in cleaned:
+        snippet = m.get('context') or ''
+        m['context_text'] = html_parser.fragment_text(snippet[:1000] if isinstance(snippet, str) else str(snippet))[:200]
+
     # Validate 1X2 groups: keep only complete triples with sane implied probability
     groups = {}
     for m in cleaned:
         if m.get('market_type') == '1X2':
-            key = m.get('context_text', '') or m.get('context', '')
+            key = m['context_text'] or m.get('context', '')
             groups.setdefault(key, []).append(m)
     to_remove = set()
     for g in groups.values():
@@ -324,19 +482,16 @@ def sanitize_markets(markets: list) -> list:
 
     cleaned2 = [m for m in cleaned if id(m) not in to_remove]
 
-    # attempt to further classify GENERIC markets by inspecting context_text
-    import re
-
-    def _classify(m):
+    # attempt to further classify GENERIC markets by inspecting the precomputed text
+    def _classify(m, txt):
         if m.get('market_type') and m.get('market_type') != 'GENERIC':
             return m
-        txt = (m.get('context_text') or m.get('context') or '').lower()
         if not txt:
             return m
         # look for corners/escanteios
         if 'escante' in txt or 'corner' in txt:
             # find numeric line (like 3.5 or 3)
-            mo = re.search(r"([0-9]+(?:\.[05])?)", txt)
+            mo = _LINE_RE.search(txt)
             if mo:
                 line = float(mo.group(1))
                 # decide over/under by presence of words
@@ -354,7 +509,7 @@ def sanitize_markets(markets: list) -> list:
                 m['market_type'] = 'CORNERS'
         # look for goals/total
         elif 'gol' in txt or 'total' in txt or 'over' in txt or 'under' in txt:
-            mo = re.search(r"([0-9]+(?:\.[05])?)", txt)
+            mo = _LINE_RE.search(txt)
             if mo:
                 line = float(mo.group(1))
                 if 'over' in txt or 'mais' in txt or '>' in txt:
@@ -369,7 +524,7 @@ def sanitize_markets(markets: list) -> list:
             else:
                 m['market_type'] = 'GOALS'
         # try detect 1X2 patterns like '1 x 2' nearby
-        elif re.search(r"\b1\s*x\s*2\b", txt) or re.search(r"\b1x2\b", txt):
+        elif _1X2_RE.search(txt):
             # if odds grouped elsewhere, leave selection empty; mark market_type
             m['market_type'] = '1X2'
         return m
@@ -377,188 +532,158 @@ def sanitize_markets(markets: list) -> list:
     cleaned3 = []
     for m in cleaned2:
         try:
-            cleaned3.append(_classify(m))
+            cleaned3.append(_classify(m, (m['context_text'] or m.get('context') or '').lower()))
         except Exception:
             cleaned3.append(m)
     return cleaned3
 
 
-def scrape_betano_odds(url: str) -> Dict[str, Any]:
+def scrape_betano_odds(url: str, session=None) -> Dict[str, Any]:
     """Generic odds extractor for Betano pages using Playwright DOM extraction when possible.
     Tries to extract structured markets: 1X2, Over/Under (e.g. over 2.5) and specifically goals/corners.
+    `session` (an rpa_playwright.PageSession) shares one page load with the caller; by default
+    the run's session for `url` is used, so labels and HTML come from a single navigation.
     Returns a mapping {'markets': [{'market_type', 'selection','odd', 'context'}, ...]}
     """
-    res = {"markets": []}
+    from rpa_playwright import session_for
+
     labels = ['Total de gols', 'Total gols', 'Total', 'Over',
               'Under', 'Escanteios', 'Escanteio', 'Corners']
+    with session_for(url, session) as page:
+        # Try Playwright DOM-run extraction for label-based markets
+        markets = _label_markets(url, page, labels, 'Betano_Market') or []
+        html = _session_html(page)
+    if html is None:
+        # outside the session: its page no longer holds the pool worker a fallback render needs
+        html = fetch_html(url)
+    return _betano_result(markets, html)
+
 
-    # Try Playwright DOM-run extraction for label-based markets
+def _label_markets(url: str, page, labels: list, bookmaker: str):
+    """Markets from the session's label blocks; None when the in-page extraction failed."""
     try:
-        from rpa_playwright import extract_markets_near_labels
-        found = extract_markets_near_labels(url, labels)
-        for block in found:
-            ltxt = block.get('label', '').lower()
-            if 'escante' in ltxt or 'corner' in ltxt:
-                mtype = 'CORNERS'
-            elif 'gol' in ltxt or 'total' in ltxt or 'over' in ltxt or 'under' in ltxt:
-                mtype = 'GOALS'
-            else:
-                mtype = 'GENERIC'
-            for o in block.get('odds', []):
-                val = o.get('value')
-                if val is None:
-                    continue
-                if val >= 1.01 and val <= 50:
-                    res['markets'].append({'market_type': mtype, 'selection': None, 'odd': val, 'context': o.get(
-                        'html'), 'source_url': url, 'bookmaker': 'Betano_Market'})
+        found = page.labels(labels)
     except Exception:
-        pass
+        return None
+    markets = []
+    for block in found:
+        ltxt = block.get('label', '').lower()
+        if 'escante' in ltxt or 'corner' in ltxt:
+            mtype = 'CORNERS'
+        elif 'gol' in ltxt or 'total' in ltxt or 'over' in ltxt or 'under' in ltxt:
+            mtype = 'GOALS'
+        else:
+            mtype = 'GENERIC'
+        for o in block.get('odds', []):
+            val = o.get('value')
+            if val is None:
+                continue
+            if val >= 1.01 and val <= 50:
+                markets.append({'market_type': mtype, 'selection': None, 'odd': val, 'context': o.get(
+                    'html'), 'source_url': url, 'bookmaker': bookmaker})
+    return markets
+
 
-    # If Playwright did not surface label-based markets, fallback to HTML heuristics for 1X2 and OU
+def _session_html(page):
     try:
-        from rpa_playwright import fetch_html_playwright
-        html = fetch_html_playwright(url)
+        return page.html()
     except Exception:
-        html = fetch_html(url)
-
-    import re
-    # find 1X2 sequences
-    seq_re = re.compile(
-        r"(?:1\D{0,8}([0-9]+(?:\.[0-9]+)?)\D{0,8}X\D{0,8}([0-9]+(?:\.[0-9]+)?)\D{0,8}2\D{0,8}([0-9]+(?:\.[0-9]+)?))", re.IGNORECASE)
-    for m in seq_re.finditer(html):
-        try:
-            o1 = float(m.group(1))
-            ox = float(m.group(2))
-            o2 = float(m.group(3))
-            ctx = html[max(0, m.start()-60):m.end()+60]
-            res['markets'].append(
-                {'market_type': '1X2', 'selection': '1', 'odd': o1, 'context': ctx, 'bookmaker': 'Betano_Market'})
-            res['markets'].append(
-                {'market_type': '1X2', 'selection': 'X', 'odd': ox, 'context': ctx, 'bookmaker': 'Betano_Market'})
-            res['markets'].append(
-                {'market_type': '1X2', 'selection': '2', 'odd': o2, 'context': ctx, 'bookmaker': 'Betano_Market'})
-        except Exception:
-            pass
+        return None
 
-    # Over/Under patterns
-    ou_re = re.compile(
-        r"((?:total(?: de)?\s*(?:gols|escanteios?)|over|under|mais de|menos de|total))\s*[:\-]??\s*([0-9]+(?:\.[05])?)\D{0,12}([0-9]+(?:\.[0-9]+)?)",
-        re.IGNORECASE)
-    for m in ou_re.finditer(html):
-        try:
-            label = m.group(1).lower()
-            line = m.group(2)
-            odd = float(m.group(3))
-            ctx = html[max(0, m.start()-80):m.end()+80]
-            if 'escante' in label or 'corner' in label:
-                mtype = 'CORNERS'
-            elif 'gol' in label or 'goal' in label:
-                mtype = 'GOALS'
-            else:
-                mtype = 'OVER' if 'over' in label or 'mais' in label else 'UNDER'
-            res['markets'].append(
-                {'market_type': mtype, 'selection': line, 'odd': odd, 'context': ctx, 'bookmaker': 'Betano_Market'})
-        except Exception:
-            pass
 
-    # Also search for explicit 'Escanteios' labels and numeric candidates nearby
-    label_re = re.compile(r"(escanteios?|corners?)", re.IGNORECASE)
-    for m in label_re.finditer(html):
-        try:
-            ctx_start = max(0, m.start()-80)
-            ctx_end = min(len(html), m.end()+200)
-            ctx = html[ctx_start:ctx_end]
-            odds = _find_odds_in_html(ctx)
-            for pos, val in odds:
-                if val >= 1.01 and val <= 50:
-                    res['markets'].append(
-                        {'market_type': 'CORNERS', 'selection': None, 'odd': val, 'context': ctx, 'bookmaker': 'Betano_Market'})
-        except Exception:
-            pass
+def _betano_result(markets: list, html: str) -> Dict[str, Any]:
+    # If Playwright did not surface label-based markets, fallback to HTML heuristics for 1X2 and OU:
+    # one tokenizing pass finds the 1X2 runs, over/under lines and corner labels together
+    markets = markets + market_scan.betano_markets(html_parser.reduce_html(html), fallback=not markets)
+    # sanitize markets before returning
+    return {'markets': sanitize_markets(markets)}
 
-    # Fallback: generic odds
-    if not res['markets']:
-        odds = _find_odds_in_html(html)
-        seen = set()
-        for pos, val in odds:
-            if val in seen:
-                continue
-            seen.add(val)
-            ctx = html[max(0, pos-40):pos+40]
-            res['markets'].append(
-                {'market_type': 'GENERIC', 'selection': None, 'odd': val, 'context': ctx, 'bookmaker': 'Betano_Market'})
 
-    # sanitize markets before returning
-    res['markets'] = sanitize_markets(res['markets'])
-    return res
+def scrape_superbet_odds(url: str, session=None) -> Dict[str, Any]:
+    """Odds extractor for Superbet; prefer Playwright DOM-based extraction to reliably capture goals/corners markets.
 
+    `session` works as in `scrape_betano_odds`; the HTML fallbacks reuse the same page.
+    """
+    from rpa_playwright import session_for
 
-def scrape_superbet_odds(url: str) -> Dict[str, Any]:
-    """Odds extractor for Superbet; prefer Playwright DOM-based extraction to reliably capture goals/corners markets."""
-    res = {'markets': []}
     labels = ['Total de gols', 'Total gols', 'Total', 'Over', 'Under',
               'Escanteios', 'Escanteio', 'Corners', 'Escanteios totais']
+    with session_for(url, session) as page:
+        markets = _label_markets(url, page, labels, 'Superbet_Market')
+        html = None if markets else _session_html(page)
     try:
-        from rpa_playwright import extract_markets_near_labels
-        found = extract_markets_near_labels(url, labels)
-        for block in found:
-            ltxt = block.get('label', '').lower()
-            if 'escante' in ltxt or 'corner' in ltxt:
-                mtype = 'CORNERS'
-            elif 'gol' in ltxt or 'total' in ltxt or 'over' in ltxt or 'under' in ltxt:
-                mtype = 'GOALS'
-            else:
-                mtype = 'GENERIC'
-            for o in block.get('odds', []):
-                val = o.get('value')
-                if val is None:
-                    continue
-                if val >= 1.01 and val <= 50:
-                    res['markets'].append({'market_type': mtype, 'selection': None, 'odd': val, 'context': o.get(
-                        'html'), 'source_url': url, 'bookmaker': 'Superbet_Market'})
-    except Exception:
-        # fallback to HTML scanning
-        try:
-            html = fetch_html(url)
-            import re
-            for label in (r'total de gols', r'total gols', r'total', r'over|under', r'escanteios?', r'corners?'):
-                for m in re.finditer(label, html, re.IGNORECASE):
-                    ctx_start = max(0, m.start()-80)
-                    ctx_end = min(len(html), m.end()+200)
-                    ctx = html[ctx_start:ctx_end]
-                    odds = _find_odds_in_html(ctx)
-                    for pos, val in odds:
-                        if val >= 1.01 and val <= 50:
-                            ltxt = m.group(0).lower()
-                            if 'escante' in ltxt or 'corner' in ltxt:
-                                mtype = 'CORNERS'
-                            elif 'gol' in ltxt or 'total' in ltxt or 'over' in ltxt or 'under' in ltxt:
-                                mtype = 'GOALS'
-                            else:
-                                mtype = 'GENERIC'
-                            res['markets'].append(
-                                {'market_type': mtype, 'selection': None, 'odd': val, 'context': ctx, 'source_url': url, 'bookmaker': 'Superbet_Market'})
-        except Exception:
-            pass
-
-    # if still nothing found, fallback to Betano-like scan
-    if not res['markets']:
+        if markets is None:
+            # fallback to HTML scanning
+            markets = []
+            text = html_parser.reduce_html(html if html is not None else fetch_html(url))
+            markets.extend(market_scan.label_markets(
+                text, market_scan.tokenize(text), lambda label: label not in ('mais de', 'menos de'),
+                source_url=url, bookmaker='Superbet_Market'))
+    except Exception as e:
+        if _is_transient(e):
+            raise  # not an empty page: keep scrape_candidate_odds from caching it as one
+        markets = []
+
+    # if still nothing found, fallback to Betano-like scan (its labels are a subset of the ones above)
+    if not markets:
         try:
-            return scrape_betano_odds(url)
-        except Exception:
+            return _betano_result([], html if html is not None else fetch_html(url))
+        except Exception as e:
+            if _is_transient(e):
+                raise
             return {'markets': []}
     # sanitize markets
-    res['markets'] = sanitize_markets(res['markets'])
+    return {'markets': sanitize_markets(markets)}
+
+
+def scrape_candidate_odds(url: str, scraper=None) -> Dict[str, Any]:
+    """Run a bookmaker scraper on a guessed (slug-built) URL, skipping known-dead candidates.
+
+    scraper defaults to scrape_betano_odds / scrape_superbet_odds by host. Candidates that
+    were fetched but have no markets, or answer 404/410, are recorded in the negative cache
+    (when enabled) with the reason, so later runs skip them until the entry expires.
+    Timeouts, connection errors, 429/5xx and an open circuit are not: the page may be fine.
+    Returns {'markets': [...]}; a skipped URL returns {'markets': [], 'skipped': reason}.
+    """
+    if scraper is None:
+        scraper = scrape_superbet_odds if 'superbet' in url else scrape_betano_odds
+    neg = http_cache.get_negative_cache()
+    reason = neg.lookup(url) if neg else None
+    if reason:
+        return {'markets': [], 'skipped': reason}
+    try:
+        res = scraper(url)
+    except Exception as e:
+        status = getattr(getattr(e, 'response', None), 'status_code', None)
+        if neg and isinstance(e, requests.HTTPError) and status in (404, 410):
+            neg.add(url, f"not found: {status}")
+        raise
+    if neg and not (res and res.get('markets')):
+        neg.add(url, 'no markets')
     return res
 
 
-def find_odds_for_match_on_bookmaker(match: Dict[str, Any], bookmaker_url: str) -> Dict[str, Any]:
+def _is_transient(exc: Exception) -> bool:
+    """Errors that say nothing about the page itself (it may load fine on the next try)."""
+    return (isinstance(exc, (host_policy.CircuitOpenError, TimeoutError, requests.Timeout, requests.ConnectionError))
+            or host_policy.is_retryable(exc))
+
+
+def find_odds_for_match_on_bookmaker(match: Dict[str, Any], bookmaker_url: str, session=None) -> Dict[str, Any]:
     """Attempt to find odds for a given match on a bookmaker page.
 
     Heuristic: fetch the bookmaker page, search for team names (from match info) and capture odds nearby.
+    With `session` (an rpa_playwright.PageSession of `bookmaker_url`) its rendered HTML is used instead
+    of a plain fetch, so a page already rendered for other scrapers is not loaded again.
     Returns {'markets': [{'name', 'odd', 'context', 'match':match_url_or_names}]}
     """
-    html = fetch_html(bookmaker_url)
+    html = None
+    if session is not None:
+        from rpa_playwright import session_for
+        with session_for(bookmaker_url, session) as page:
+            html = _session_html(page)
+    if html is None:
+        html = fetch_html(bookmaker_url)
     # build search terms from match (team names or match_url)
     names = []
     if match.get('source_url'):
@@ -585,65 +710,13 @@ def find_odds_for_match_on_bookmaker(match: Dict[str, Any], bookmaker_url: str)
         except Exception:
             pass
 
-    found = {"markets": []}
     if not terms:
         # fallback: extract all odds but return structured list
         return {'markets': [{'market_type': 'GENERIC', 'selection': None, 'odd': v, 'context': '', 'bookmaker': 'Unknown'} for _, v in _find_odds_in_html(html)]}
 
-    # scan for occurrences of team names and extract nearest odds
-    import re
-    for term in terms:
-        for m in re.finditer(re.escape(term), html, re.IGNORECASE):
-            pos = m.start()
-            window_start = max(0, pos - 300)
-            window_end = min(len(html), pos + 300)
-            ctx = html[window_start:window_end]
-
-            # Prefer explicit goals/escanteios labels near the team occurrence
-            label_re = re.compile(
-                r"(total de gols|total gols|over|under|mais de|menos de|escanteios?|corners?)", re.IGNORECASE)
-            lmatch = label_re.search(ctx)
-            if lmatch:
-                # extract odds near label
-                ctx2_start = max(0, window_start + lmatch.start() - 60)
-                ctx2_end = min(len(html), window_start + lmatch.end() + 160)
-                ctx2 = html[ctx2_start:ctx2_end]
-                odds = _find_odds_in_html(ctx2)
-                for _, val in odds:
-                    if val >= 1.01 and val <= 50:
-                        ltxt = lmatch.group(0).lower()
-                        if 'escante' in ltxt or 'corner' in ltxt:
-                            mtype = 'CORNERS'
-                        elif 'gol' in ltxt or 'over' in ltxt or 'under' in ltxt or 'total' in ltxt:
-                            mtype = 'GOALS'
-                        else:
-                            mtype = 'GENERIC'
-                        found['markets'].append(
-                            {'market_type': mtype, 'selection': None, 'odd': val, 'context': ctx2, 'match': match.get('source_url')})
-                # continue to next occurrence
-                continue
-
-            # fallback to any odds in the window
-            odds = _find_odds_in_html(ctx)
-            for _, val in odds:
-                if val >= 1.01 and val <= 100:
-                    found['markets'].append({'market_type': 'GENERIC', 'selection': None,
-                                            'odd': val, 'context': ctx, 'match': match.get('source_url')})
-
-    # sanitize found markets and return
-    found['markets'] = sanitize_markets(found['markets'])
-    return found
-
-    # dedupe by odd+name
-    seen = set()
-    out = []
-    for m in found['markets']:
-        key = (m.get('name'), m.get('odd'))
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append(m)
-    return {'markets': out}
+    # a single tokenizing pass finds team names, labels and odds; markets come from their proximity
+    markets = market_scan.markets_near_terms(html_parser.reduce_html(html), terms, match_ref=match.get('source_url'))
+    return {'markets': sanitize_markets(markets)}
 
 
 def _normalize_label(label: str) -> str:
@@ -662,100 +735,323 @@ def parse_match_teams_from_match_page(url: str) -> list:
     Returns list [home, away] or empty list if not found.
     """
     try:
-        html = fetch_html(url)
+        return list(get_match_page(url).teams)
     except Exception:
         return []
-    from bs4 import BeautifulSoup
-    soup = BeautifulSoup(html, 'html.parser')
-    title = None
-    h1 = soup.find('h1')
-    if h1 and h1.get_text(strip=True):
-        title = h1.get_text(strip=True)
-    if not title:
-        t = soup.title
-        if t and t.get_text(strip=True):
-            title = t.get_text(strip=True)
-    if not title:
-        return []
-    # try common separators
-    import re
-    sep_patterns = [r'\s+vs\s+', r'\s+v\s+',
-                    r'\s+-\s+', r'\s+x\s+', r'\s+–\s+']
-    for pat in sep_patterns:
-        m = re.split(pat, title, flags=re.IGNORECASE)
-        if len(m) == 2:
-            return [m[0].strip(), m[1].strip()]
-    # fallback split on ' – '
-    parts = title.split('–')
-    if len(parts) == 2:
-        return [parts[0].strip(), parts[1].strip()]
-
-    # fallback: try to extract team anchors from page
-    teams_map = extract_team_urls_from_match_page(url)
-    if teams_map:
-        names = list(teams_map.keys())
-        if len(names) >= 2:
-            return [names[0], names[1]]
-
-    return []
 
 
-def extract_team_urls_from_match_page(url: str) -> dict:
+def extract_team_urls_from_match_page(url: str, session=None) -> dict:
     """Return a mapping of team display name -> team URL found on a SofaScore match page.
 
     This helps locate team pages to scrape team-level stats when R10Score lacks data.
+    `session` (an rpa_playwright.PageSession of `url`) serves the rendered-page fallback.
     """
     try:
-        html = fetch_html(url)
+        return dict(get_match_page(url, session=session).team_urls)
     except Exception:
         return {}
-    from bs4 import BeautifulSoup
-    soup = BeautifulSoup(html, 'html.parser')
-    anchors = soup.find_all('a', href=True)
+
+
+def _team_anchors(doc) -> dict:
     res = {}
-    for a in anchors:
-        href = a['href']
-        txt = a.get_text(strip=True)
+    for href, txt in doc.anchors():
         if not txt:
             continue
         if '/team/' in href:
-            if href.startswith('/'):
-                full = 'https://www.sofascore.com' + href
-            elif href.startswith('http'):
-                full = href
-            else:
-                full = 'https://www.sofascore.com/' + href
-            res[txt] = full
+            res[txt] = _sofascore_url(href)
+    return res
+
 
-    # If no team anchors found in static HTML, try a Playwright-rendered page and re-parse
-    if not res:
+def extract_score_from_html(html: str):
+    """Return (home_goals, away_goals) found in a match page, or None."""
+    # try to find explicit final/FT markers first
+    patterns = [
+        r"(?:final|full time|ft)[^\d]{0,30}(\d{1,2})\s*[:\-–]\s*(\d{1,2})",
+        r"(\d{1,2})\s*[:\-–]\s*(\d{1,2})\s*(?:final|ft)",
+        r"title\W[^>]{0,200}(\d{1,2})\s*[:\-–]\s*(\d{1,2})",
+    ]
+    for p in patterns:
+        m = re.search(p, html, re.IGNORECASE)
+        if m:
+            try:
+                return int(m.group(1)), int(m.group(2))
+            except Exception:
+                pass
+
+    # fallback: first reasonable score appearance
+    m2 = re.search(r"(\d{1,2})\s*[:\-–]\s*(\d{1,2})", html)
+    if m2:
         try:
-            from rpa_playwright import fetch_html_playwright
-            rendered = fetch_html_playwright(url, wait_for='a')
-            soup2 = BeautifulSoup(rendered, 'html.parser')
-            for a in soup2.find_all('a', href=True):
-                href = a['href']
-                txt = a.get_text(strip=True)
-                if not txt:
-                    continue
-                if '/team/' in href:
-                    if href.startswith('/'):
-                        full = 'https://www.sofascore.com' + href
-                    elif href.startswith('http'):
-                        full = href
-                    else:
-                        full = 'https://www.sofascore.com/' + href
-                    res[txt] = full
+            return int(m2.group(1)), int(m2.group(2))
         except Exception:
-            pass
+            return None
+    return None
 
-    return res
+
+class MatchPage:
+    """A SofaScore match page fetched and parsed once.
+
+    Date, teams, team URLs, event id and score are computed lazily, preferring the
+    SofaScore API event (or `info` given by the caller, e.g. from a fixture listing),
+    then the embedded JSON state, then the parsed document, so the per-match helpers
+    above no longer fetch and re-parse the page for each field. Date, teams and team
+    URLs never change once known and are read through the stats_db `match_meta` table.
+    Use `get_match_page(url)` to share instances within a run.
+    """
+
+    def __init__(self, url: str, html: str = None, info: dict = None, session=None):
+        self.url = url
+        self._html = html
+        self._info = info
+        # rpa_playwright.PageSession for the rendered fallback (default: the run's session for url)
+        self.session = session
+
+    @property
+    def html(self) -> str:
+        if self._html is None:
+            # fetch errors propagate (and are retried on the next access)
+            self._html = fetch_html(self.url)
+            _resize_match_page(self)
+        return self._html
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held: the raw page plus its reduced/parsed forms."""
+        return 1024 + 2 * len(self._html or '')
+
+    def merge_info(self, info: dict):
+        """Take fresher event data (API/fixture) from a later caller; derived fields are recomputed."""
+        if not info:
+            return
+        old = self._info or {}
+        if old.get('id') is not None and info.get('id') is not None and str(old['id']) != str(info['id']):
+            return  # another event that shares this URL
+        merged = {**old, **{k: v for k, v in info.items() if v is not None}}
+        if merged == old:
+            return
+        self._info = merged
+        for name in ('info', 'meta', 'score'):
+            self.__dict__.pop(name, None)
+
+    @property
+    def reduced(self) -> str:
+        """The page without scripts, styles and banners (embedded state stays in `html`)."""
+        return html_parser.reduce_html(self.html)
+
+    @cached_property
+    def doc(self):
+        return html_parser.parse(self.reduced)
+
+    @cached_property
+    def state(self):
+        return embedded_state.extract_state(self.html)
+
+    @cached_property
+    def info(self) -> dict:
+        if self._info:
+            return self._info
+        eid = sofascore_api.event_id_from_url(self.url) if sofascore_api.preferred() else None
+        if eid:
+            try:
+                ev = sofascore_api.event(eid)
+                if ev:
+                    return embedded_state.event_info(ev)
+            except Exception:
+                pass
+        return embedded_state.event_info(embedded_state.find_event(self.state))
+
+    @cached_property
+    def meta(self) -> dict:
+        """Stable match metadata (date, home, away, team URLs), stored once resolved."""
+        stored = _load_match_meta(self.url, self._info)
+        if stored:
+            # a rescheduled game: the event data already at hand wins over the stored date
+            known = (self._info or self.__dict__.get('info') or {})
+            if known.get('date') and known['date'] != stored.get('date'):
+                stored = {**stored, 'date': known['date'], 'event_id': stored.get('event_id') or known.get('id')}
+                _store_match_meta(stored)
+            return stored
+        teams = self._parse_teams()
+        meta = {'url': self.url, 'event_id': self.event_id, 'date': self._parse_date(),
+                'home': teams[0] if len(teams) == 2 else None, 'away': teams[1] if len(teams) == 2 else None,
+                'home_url': self.info.get('home_url'), 'away_url': self.info.get('away_url'),
+                'team_urls': self._parse_team_urls()}
+        _store_match_meta(meta)
+        return meta
+
+    @property
+    def date(self):
+        return self.meta.get('date')
+
+    @property
+    def team_urls(self) -> dict:
+        return self.meta.get('team_urls') or {}
+
+    @property
+    def teams(self) -> tuple:
+        home, away = self.meta.get('home'), self.meta.get('away')
+        if home and away and not _is_placeholder(home) and not _is_placeholder(away):
+            return (home, away)
+        # placeholder headings ('Comparar equipes'): fall back to the URL slug
+        slug_home, slug_away = stats_db.slug_teams(
+            self.url, home=None if _is_placeholder(home) else home, away=None if _is_placeholder(away) else away)
+        if home and away:
+            return (slug_home if _is_placeholder(home) and slug_home else home,
+                    slug_away if _is_placeholder(away) and slug_away else away)
+        return (slug_home, slug_away) if slug_home and slug_away else ()
+
+    def _parse_date(self):
+        return self.info.get('date') or parse_match_date(self.html, doc=self.doc, state=self.state)
+
+    def _parse_team_urls(self) -> dict:
+        # the two teams of the embedded event come first, then any team anchors in the page
+        info = self.info
+        res = {info[side]: info[side + '_url'] for side in ('home', 'away')
+               if info.get(side) and info.get(side + '_url')}
+        if len(res) == 2:
+            return res
+        for name, href in _team_anchors(self.doc).items():
+            res.setdefault(name, href)
+        # If no team anchors found in static HTML, try a Playwright-rendered page and re-parse
+        if not res:
+            try:
+                from rpa_playwright import session_for
+                with session_for(self.url, self.session) as page:
+                    rendered = page.html(wait_for='a')
+                res = _team_anchors(html_parser.parse(html_parser.reduce_html(rendered)))
+            except Exception:
+                pass
+        return res
+
+    def _parse_teams(self) -> tuple:
+        if self.info.get('home') and self.info.get('away'):
+            return (self.info['home'], self.info['away'])
+        title = self.doc.heading()
+        if not title:
+            return ()
+        # try common separators
+        sep_patterns = [r'\s+vs\s+', r'\s+v\s+',
+                        r'\s+-\s+', r'\s+x\s+', r'\s+–\s+']
+        for pat in sep_patterns:
+            m = re.split(pat, title, flags=re.IGNORECASE)
+            if len(m) == 2:
+                return (m[0].strip(), m[1].strip())
+        # fallback split on ' – '
+        parts = title.split('–')
+        if len(parts) == 2:
+            return (parts[0].strip(), parts[1].strip())
+
+        # fallback: team anchors from the page
+        names = list(self._parse_team_urls().keys())
+        if len(names) >= 2:
+            return (names[0], names[1])
+        return ()
+
+    @cached_property
+    def event_id(self):
+        m = re.search(r'id:(\d+)', self.url)
+        if m:
+            return m.group(1)
+        if self.info.get('id') is not None:
+            return str(self.info['id'])
+        m = re.search(r'"event"\s*:\s*\{[^{}]*?"id"\s*:\s*(\d+)', self.html)
+        return m.group(1) if m else None
+
+    @cached_property
+    def score(self):
+        if self.info:
+            # the event data is authoritative: only a finished match has a final score
+            if self.info.get('status') not in (None, 'finished'):
+                return None
+            return self.info.get('score')
+        return extract_score_from_html(self.reduced)
+
+
+def _is_placeholder(name: str) -> bool:
+    return 'comparar' in (name or '').lower()
+
+
+# stats_db path for the match_meta read-through (None = stats_db default, False = disabled)
+_MATCH_META_DB = None
+
+
+def set_match_meta_db(path):
+    """Use `path` (None: STATS_DB_PATH / stats.db) for match metadata; False turns it off."""
+    global _MATCH_META_DB
+    _MATCH_META_DB = path
+
+
+def _load_match_meta(url: str, info: dict = None):
+    if _MATCH_META_DB is False:
+        return None
+    try:
+        eid = (info or {}).get('id') or sofascore_api.event_id_from_url(url)
+        meta = stats_db.get_match_meta(url, event_id=eid, db_path=_MATCH_META_DB)
+    except Exception:
+        return None
+    if meta and meta.get('date') and meta.get('home') and meta.get('away'):
+        return meta
+    return None
+
+
+def _store_match_meta(meta: dict):
+    # only fully resolved matches are kept, so unresolved ones are retried next run
+    if _MATCH_META_DB is False or not (meta.get('date') and meta.get('home') and meta.get('away')):
+        return
+    if _is_placeholder(meta['home']) or _is_placeholder(meta['away']):
+        return
+    try:
+        stats_db.upsert_match_meta(meta, db_path=_MATCH_META_DB)
+    except Exception:
+        pass
+
+
+# per-run memo of parsed match pages, bounded by the memory their documents hold
+_MATCH_PAGE_BYTES = 96 * 1024 * 1024
+_match_pages = http_cache.MemoryCache(max_bytes=_MATCH_PAGE_BYTES)
+_match_pages_lock = threading.Lock()
+
+
+def _match_page_key(url: str, info: dict = None) -> str:
+    # games between the same two teams share a URL: the event id tells them apart
+    eid = sofascore_api.event_id_from_url(url) or (info or {}).get('id')
+    key = http_cache.canonical_url(url)
+    return f"{key}#{eid}" if eid is not None else key
+
+
+def _resize_match_page(page: 'MatchPage'):
+    """Re-account a memoized page once its document has been fetched."""
+    key = _match_page_key(page.url, page._info)
+    with _match_pages_lock:
+        if key in _match_pages and _match_pages.get(key) is page:
+            _match_pages.put(key, page, size=page.nbytes)
+
+
+def get_match_page(url: str, info: dict = None, session=None) -> MatchPage:
+    """Return the shared MatchPage for `url` (same page for any spelling of the same event).
+
+    `info` (an embedded_state.event_info / sofascore_api.fixture dict) seeds a new page
+    so date, teams and team URLs need no fetch at all; given for a page already in memory,
+    it is merged in, so fresher API data wins. `session` is kept for its rendered fallback.
+    """
+    key = _match_page_key(url, info)
+    with _match_pages_lock:
+        page = _match_pages.get(key)
+        if page is not None:
+            page.merge_info(info)
+            if session is not None and page.session is None:
+                page.session = session
+            return page
+        page = MatchPage(url, info=info, session=session)
+        _match_pages.put(key, page, size=page.nbytes)
+        return page
 
 
 def scrape_sofascore_team_stats(url: str) -> Dict[str, Any]:
     """Scrape approximate per-game stats from a SofaScore team page.
 
-    Tries to find labels/numbers indicating averages for 'gols', 'escanteios', 'chutes' etc.
+    Reads the statistics embedded in the page state (__NEXT_DATA__) when available; otherwise
+    tries to find labels/numbers indicating averages for 'gols', 'escanteios', 'chutes' etc.
     Returns a dict with normalized keys like 'goals_per_game', 'corners_per_game', 'shots_per_game'.
     """
     try:
@@ -767,16 +1063,18 @@ def scrape_sofascore_team_stats(url: str) -> Dict[str, Any]:
             html = fetch_html_playwright(url)
         except Exception:
             return {}
-    from bs4 import BeautifulSoup
-    soup = BeautifulSoup(html, 'html.parser')
-    out: Dict[str, Any] = {}
+    # structured stats embedded in the page state, when present, are exact
+    out: Dict[str, Any] = embedded_state.team_stats(embedded_state.extract_state(html))
+    if out:
+        return out
+
+    doc = html_parser.parse(html_parser.reduce_html(html))
     import re
 
     # Look for explicit labels with nearby numeric values
     kv_re = re.compile(
         r"([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,40})[:\-]?\s*([0-9]+(?:[\.,][0-9]+)?)", re.IGNORECASE)
-    for tag in soup.find_all(['p', 'span', 'div', 'li', 'td', 'th']):
-        text = tag.get_text(" ", strip=True)
+    for text in doc.texts(['p', 'span', 'div', 'li', 'td', 'th']):
         for m in kv_re.finditer(text):
             label = m.group(1).strip().lower()
             val = m.group(2).replace(',', '.')
@@ -797,18 +1095,7 @@ def scrape_sofascore_team_stats(url: str) -> Dict[str, Any]:
     # try to find elements that contain the word 'Média' and a nearby number
     # Limit scanning of 'Média' occurrences to avoid expensive DOM traversals
     max_hits = 30
-    hits = 0
-    for el in soup.find_all(string=lambda s: s and 'média' in s.lower()):
-        hits += 1
-        if hits > max_hits:
-            break
-        try:
-            parent = el.parent
-            if not parent:
-                continue
-            txt = parent.get_text(" ", strip=True)
-        except Exception:
-            continue
+    for txt in doc.parents_of_text('média', limit=max_hits):
         nums = re.findall(r"([0-9]+(?:[\.,][0-9]+)?)", txt)
         for n in nums:
             try:
@@ -827,43 +1114,24 @@ def scrape_sofascore_team_stats(url: str) -> Dict[str, Any]:
     return out
 
 
-def scrape_r10_stats(url: str) -> Dict[str, Any]:
-    """Scrape statistics from r10score pages.
-
-    Strategy: attempt to find tables, definition lists, or label:value pairs; parse numbers and return a flat dict of stats.
-    """
-    html = fetch_html(url)
-    soup = BeautifulSoup(html, "html.parser")
-    out: Dict[str, Any] = {}
-
+def _collect_r10_stats(doc, out: Dict[str, Any]):
+    """Fill `out` with label -> value pairs from tables, dt/dd lists and 'Label: value' text."""
     # 1) parse tables with two columns
-    tables = soup.find_all('table')
-    for table in tables:
-        for tr in table.find_all('tr'):
-            tds = tr.find_all(['td', 'th'])
-            if len(tds) >= 2:
-                label = tds[0].get_text(strip=True)
-                val = tds[1].get_text(strip=True)
-                labeln = _normalize_label(label)
-                num = parse_number(val)
-                out[labeln] = num if num is not None else val
+    for cells in doc.table_rows():
+        if len(cells) >= 2:
+            labeln = _normalize_label(cells[0])
+            num = parse_number(cells[1])
+            out[labeln] = num if num is not None else cells[1]
 
     # 2) parse definition lists dt/dd
-    for dl in soup.find_all('dl'):
-        dts = dl.find_all('dt')
-        dds = dl.find_all('dd')
-        for dt, dd in zip(dts, dds):
-            label = dt.get_text(strip=True)
-            val = dd.get_text(strip=True)
-            labeln = _normalize_label(label)
-            num = parse_number(val)
-            out[labeln] = num if num is not None else val
+    for label, val in doc.dl_pairs():
+        labeln = _normalize_label(label)
+        num = parse_number(val)
+        out[labeln] = num if num is not None else val
 
     # 3) parse pairs like 'Escanteios: 4.5' in paragraphs/spans
-    import re
     kv_re = re.compile(r"([A-Za-zÀ-ÖØ-öø-ÿ0-9\s]+)[:\-]\s*([0-9.,%]+)")
-    for tag in soup.find_all(['p', 'span', 'div', 'li']):
-        text = tag.get_text(" ", strip=True)
+    for text in doc.texts(['p', 'span', 'div', 'li']):
         for m in kv_re.finditer(text):
             label = m.group(1)
             val = m.group(2)
@@ -871,55 +1139,30 @@ def scrape_r10_stats(url: str) -> Dict[str, Any]:
             num = parse_number(val)
             out[labeln] = num if num is not None else val
 
+
+def scrape_r10_stats(url: str) -> Dict[str, Any]:
+    """Scrape statistics from r10score pages.
+
+    Strategy: attempt to find tables, definition lists, or label:value pairs; parse numbers and return a flat dict of stats.
+    """
+    html = fetch_html(url)
+    doc = html_parser.parse(html_parser.reduce_html(html))
+    out: Dict[str, Any] = {}
+    _collect_r10_stats(doc, out)
+
     # If nothing found, try Playwright-rendered HTML (single-page app) and re-parse
     if not out:
         try:
             from rpa_playwright import fetch_html_playwright
             html2 = fetch_html_playwright(url)
-            soup2 = BeautifulSoup(html2, "html.parser")
-
-            # 1) parse tables with two columns
-            tables = soup2.find_all('table')
-            for table in tables:
-                for tr in table.find_all('tr'):
-                    tds = tr.find_all(['td', 'th'])
-                    if len(tds) >= 2:
-                        label = tds[0].get_text(strip=True)
-                        val = tds[1].get_text(strip=True)
-                        labeln = _normalize_label(label)
-                        num = parse_number(val)
-                        out[labeln] = num if num is not None else val
-
-            # 2) parse definition lists dt/dd
-            for dl in soup2.find_all('dl'):
-                dts = dl.find_all('dt')
-                dds = dl.find_all('dd')
-                for dt, dd in zip(dts, dds):
-                    label = dt.get_text(strip=True)
-                    val = dd.get_text(strip=True)
-                    labeln = _normalize_label(label)
-                    num = parse_number(val)
-                    out[labeln] = num if num is not None else val
-
-            # 3) parse pairs like 'Escanteios: 4.5' in paragraphs/spans
-            import re
-            kv_re = re.compile(r"([A-Za-zÀ-ÖØ-öø-ÿ0-9\s]+)[:\-]\s*([0-9.,%]+)")
-            for tag in soup2.find_all(['p', 'span', 'div', 'li']):
-                text = tag.get_text(" ", strip=True)
-                for m in kv_re.finditer(text):
-                    label = m.group(1)
-                    val = m.group(2)
-                    labeln = _normalize_label(label)
-                    num = parse_number(val)
-                    out[labeln] = num if num is not None else val
-
+            _collect_r10_stats(html_parser.parse(html_parser.reduce_html(html2)), out)
         except Exception:
             pass
 
     # If still nothing found, fall back to extracting title
     if not out:
-        h1 = soup.find('h1')
-        if h1:
-            out['page_title'] = h1.get_text(strip=True)
+        title = doc.select_text('h1')
+        if title is not None:
+            out['page_title'] = title
 
     return out
@@ -2,7 +2,7 @@ import os
 import yaml
 from typing import List, Dict, Any
 
-from rpa_scraper import scrape_stats, scrape_odds
+from rpa_scraper import scrape_stats, scrape_odds, configure
 from ai_eval import evaluate_matches
 
 
@@ -17,6 +17,7 @@ def load_config(path: str = "config.local.yaml") -> Dict[str, Any]:
 
 def main():
     cfg = load_config()
+    configure(cfg)
     sites = cfg.get("sites", [])
     collected: List[Dict[str, Any]] = []
 
@@ -106,11 +107,32 @@ def main():
                     f"Filtrando partidas para datas: {sorted(list(allowed_dates))}")
 
             try:
-                from rpa_scraper import extract_match_urls_from_sofascore_league, get_match_date_from_match_page, find_odds_for_match_on_bookmaker
-                match_urls = extract_match_urls_from_sofascore_league(
-                    lg_url, max_matches=300)
-                print(
-                    f"Encontradas {len(match_urls)} partidas na página da liga (raw).")
+                from rpa_scraper import extract_match_urls_from_sofascore_league, get_match_date_from_match_page, find_odds_for_match_on_bookmaker, get_match_page
+                import fixture_index
+                # date filter as an in-memory query on the local fixture index (refreshed incrementally)
+                fixtures = None
+                if allowed_dates:
+                    try:
+                        idx = fixture_index.get_index(lg_url)
+                        idx.refresh()
+                        fixtures = idx.on_dates(allowed_dates)
+                        print(
+                            f"Índice de partidas: {len(fixtures)} de {len(idx)} partidas nas datas filtradas.")
+                    except Exception as e:
+                        print(
+                            f"Falha no índice de partidas ({e}); verificando cada página de partida.")
+                if fixtures is not None:
+                    match_urls = []
+                    for fx in fixtures:
+                        if fx.get('url'):
+                            # seeded pages answer date/teams without fetching the match page
+                            get_match_page(fx['url'], info=fx)
+                            match_urls.append(fx['url'])
+                else:
+                    match_urls = extract_match_urls_from_sofascore_league(
+                        lg_url, max_matches=300)
+                    print(
+                        f"Encontradas {len(match_urls)} partidas na página da liga (raw).")
                 kept = 0
                 for mu in match_urls:
                     try:
@@ -119,11 +141,16 @@ def main():
                             continue
                         if allowed_dates and mdate not in allowed_dates:
                             continue
-                        # fetch basic match info
-                        try:
-                            info = scrape_stats(mu, {})
-                        except Exception:
-                            info = {"match_url": mu}
+                        # basic match info: team names from the event data, else the page heading
+                        ev = get_match_page(mu).info
+                        if ev.get('home') and ev.get('away'):
+                            info = {"team_name": f"{ev['home']} x {ev['away']}",
+                                    "home_team": ev['home'], "away_team": ev['away']}
+                        else:
+                            try:
+                                info = scrape_stats(mu, {})
+                            except Exception:
+                                info = {"match_url": mu}
                         info["match_date"] = mdate
                         info["source_name"] = f"{lg_name} - match"
                         info["source_url"] = mu
@@ -138,7 +165,7 @@ def main():
                                 # attempt bookmaker-specific direct match page construction for better match hits
                                 direct_markets = None
                                 try:
-                                    from rpa_scraper import parse_match_teams_from_match_page, scrape_betano_odds, scrape_superbet_odds
+                                    from rpa_scraper import parse_match_teams_from_match_page, scrape_betano_odds, scrape_superbet_odds, scrape_candidate_odds
 
                                     teams = parse_match_teams_from_match_page(mu) or [
                                     ]
@@ -163,8 +190,8 @@ def main():
                                             cand = bm_url.rstrip(
                                                 '/') + f"/odds/{home}-{away}/"
                                             try:
-                                                found = scrape_betano_odds(
-                                                    cand)
+                                                found = scrape_candidate_odds(
+                                                    cand, scrape_betano_odds)
                                                 if found and found.get('markets'):
                                                     direct_markets = found['markets']
                                             except Exception:
@@ -174,8 +201,8 @@ def main():
                                             cand = bm_url.rstrip(
                                                 '/') + f"/odds/futebol/{home}-x-{away}/"
                                             try:
-                                                found = scrape_superbet_odds(
-                                                    cand)
+                                                found = scrape_candidate_odds(
+                                                    cand, scrape_superbet_odds)
                                                 if found and found.get('markets'):
                                                     direct_markets = found['markets']
                                             except Exception:
@@ -201,7 +228,7 @@ def main():
                                     f"Erro coletando odds em {bm.get('name')}: {e}")
                                 # if markets empty or mostly GENERIC, attempt Playwright DOM extraction per-bookmaker
                                 try:
-                                    from rpa_playwright import extract_markets_near_labels
+                                    from rpa_playwright import session_for
                                     need_pw = False
                                     if not markets:
                                         need_pw = True
@@ -215,8 +242,9 @@ def main():
                                             try:
                                                 labels = [
                                                     'escanteios', 'corners', 'over', 'under', 'mais de', 'menos de', 'o/u', 'total', '1', 'x', '2']
-                                                pw = extract_markets_near_labels(
-                                                    mu, labels)
+                                                # one navigation of the match page serves every bookmaker
+                                                with session_for(mu) as page:
+                                                    pw = page.labels(labels)
                                                 for entry in pw:
                                                     for od in entry.get('odds', []):
                                                         mk = {'market_type': 'GENERIC', 'selection': None, 'odd': od.get('value'), 'context': od.get(
@@ -247,6 +275,29 @@ def main():
     results = evaluate_matches(
         collected, use_openai=use_openai, openai_api_key=api_key, stats_db_path=stats_db_path)
 
+    from rpa_scraper import fetch_summary
+    print("\n--- Resumo de rede (cache / limites / retries / circuit breaker) ---\n")
+    summary = fetch_summary()
+    print(f"cache memória: {summary['memory_cache']}")
+    print(f"cache disco: {summary['disk_cache']}")
+    print(f"API SofaScore: {summary['sofascore_api']}")
+    red = summary['reduction']
+    print(f"redução de HTML: {red['pages']} páginas, {red['saved'] / 1024:.0f} KB removidos ({red['saved_pct']}%), "
+          f"{red['cache_hits']} reaproveitadas")
+    sess = (summary.get('playwright') or {}).get('sessions')
+    if sess and sess['sessions']:
+        print(f"sessões de página: {sess['sessions']} URLs, {sess['navigations']} navegações, "
+              f"{sess['calls']} consultas, {sess['reused']} reaproveitadas")
+    lab = (summary.get('playwright') or {}).get('labels')
+    if lab and lab['pages']:
+        print(f"rótulos: {lab['pages']} páginas, {lab['containers']} mercados, busca {lab['find_ms']} ms, "
+              f"varredura {lab['walk_ms']} ms, evaluate {lab['evaluate_ms']} ms, parse {lab['parse_ms']} ms")
+    for host, st in ((summary.get('playwright') or {}).get('render') or {}).items():
+        print(f"renderização {host}: {st['pages']} páginas, média {st['avg_ms']} ms / {st['avg_kb']} KB, "
+              f"{st['blocked']} de {st['requests']} requisições bloqueadas")
+    for host, st in summary['hosts'].items():
+        print(f"{host}: {st}")
+
     print("\n--- Recomendações / Scores ---\n")
     for r in results:
         print(r)
@@ -63,6 +63,7 @@ with open(args.odds, 'r', encoding='utf-8') as fh:
 cfg_path = os.path.join(os.path.dirname(__file__), '..', 'config.local.yaml')
 with open(cfg_path, 'r', encoding='utf-8') as fh:
     cfg = yaml.safe_load(fh)
+_rpa_scraper.configure(cfg)
 
 value_margin = float(cfg.get('value_detection', {}).get('value_margin', 0.03))
 use_openai_cfg = bool(cfg.get('openai', {}).get('use_openai', False))
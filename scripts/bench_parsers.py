@@ -0,0 +1,65 @@
+"""Mede o tempo de parsing por página para cada backend de `html_parser`.
+
+Uso:
+  python scripts/bench_parsers.py
+  python scripts/bench_parsers.py --files sample_sofa.html sample_r10.html --repeat 10
+
+Para cada arquivo e backend instalado (selectolax, lxml, html.parser) imprime o tempo
+médio de `parse()` e de uma passada típica de extração (âncoras + textos + tabelas).
+"""
+import os
+import sys
+import time
+import argparse
+
+# Garante que a raiz do projeto esteja no caminho antes de importar módulos locais
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+import html_parser  # noqa: E402
+
+
+def _bench(html, backend, repeat):
+    t_parse = t_extract = 0.0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        doc = html_parser.parse(html, backend=backend)
+        t1 = time.perf_counter()
+        doc.anchors()
+        doc.texts(['p', 'span', 'div', 'li', 'td', 'th'])
+        doc.table_rows()
+        doc.heading()
+        t2 = time.perf_counter()
+        t_parse += t1 - t0
+        t_extract += t2 - t1
+    return t_parse / repeat, t_extract / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark dos backends de parsing HTML')
+    parser.add_argument('--files', nargs='+',
+                        default=[os.path.join(ROOT, 'sample_sofa.html'), os.path.join(ROOT, 'sample_r10.html')],
+                        help='Arquivos HTML a medir')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetições por backend')
+    args = parser.parse_args(argv)
+
+    backends = html_parser.available_backends()
+    print('Backends instalados:', ', '.join(backends), '| auto =', html_parser.get_backend())
+    for path in args.files:
+        if not os.path.exists(path):
+            print('Arquivo não encontrado:', path)
+            continue
+        with open(path, 'r', encoding='utf-8') as fh:
+            html = fh.read()
+        print(f"\n{os.path.basename(path)} ({len(html) / 1024:.0f} KB)")
+        totals = {}
+        for b in backends:
+            p, e = _bench(html, b, max(1, args.repeat))
+            totals[b] = p + e
+            print(f"  {b:<12} parse {p * 1000:8.1f} ms  extração {e * 1000:8.1f} ms  total {(p + e) * 1000:8.1f} ms")
+        if len(totals) > 1:
+            print(f"  ganho de {backends[0]} vs html.parser: {totals['html.parser'] / totals[backends[0]]:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Compara o carregamento de páginas no Playwright com e sem o bloqueio de requisições.
+
+Uso:
+  python scripts/bench_render.py https://www.betano.bet.br/ https://superbet.bet.br/
+  python scripts/bench_render.py --repeat 3 --config config.local.yaml URL...
+  python scripts/bench_render.py --labels "Total de gols,Escanteios" https://www.betano.bet.br/...
+
+Cada URL é renderizada `--repeat` vezes sem interceptação e depois com os perfis de
+bloqueio do config (`playwright.block` / `playwright.profiles` / bloco `playwright` do
+site). Os caches de HTML não são usados: toda renderização vai à rede.
+Os bytes são os transferidos de fato (cabeçalhos + corpo como veio da rede, comprimido ou
+em chunks), lidos de `request.sizes()` ao fim de cada requisição.
+Com `--labels` os rótulos também são extraídos nos dois modos e os mercados comparados: um perfil
+que muda o resultado (ex.: bloquear `stylesheet` altera o `innerText` lido pela varredura de
+rótulos) é apontado como divergente e não deve ser usado em páginas com extração de rótulos.
+"""
+import os
+import sys
+import asyncio
+import argparse
+
+# Garante que a raiz do projeto esteja no caminho antes de importar módulos locais
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import yaml  # noqa: E402
+
+import rpa_playwright  # noqa: E402
+import rpa_scraper  # noqa: E402
+
+
+async def _render_all(urls, repeat, timeout, labels=None):
+    found = {}
+    async with rpa_playwright.AsyncRenderer(pages=1) as r:
+        for _ in range(repeat):
+            for url in urls:
+                try:
+                    await r.render(url, timeout=timeout)
+                except Exception as e:
+                    print(f"  falha em {url}: {e}")
+        for url in urls if labels else ():
+            try:
+                found[url] = _markets(await r.labels(url, labels, timeout=timeout))
+            except Exception as e:
+                print(f"  falha nos rótulos de {url}: {e}")
+    return found
+
+
+def _markets(blocks):
+    # (rótulo, odd) de cada ocorrência, sem o HTML do nó, que varia entre renderizações
+    return sorted((b.get('label'), o.get('value')) for b in blocks or () for o in b.get('odds') or ())
+
+
+def _measure(urls, repeat, timeout, intercept, labels=None):
+    rpa_playwright.set_interception(intercept)
+    found = asyncio.run(_render_all(urls, repeat, timeout, labels))
+    pages = [p for p in rpa_playwright.render_stats(recent=200)['pages'] if p['intercept'] == intercept]
+    out = {}
+    for url in urls:
+        runs = [p for p in pages if p['url'] == url and p['ok']]
+        if runs:
+            out[url] = {k: sum(p[k] for p in runs) / len(runs) for k in ('ms', 'bytes', 'requests', 'blocked')}
+            out[url]['markets'] = found.get(url)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bytes e tempo de carga com e sem bloqueio de requisições')
+    parser.add_argument('urls', nargs='+')
+    parser.add_argument('--config', default='config.local.yaml')
+    parser.add_argument('--repeat', type=int, default=2, help='Renderizações por URL em cada modo')
+    parser.add_argument('--timeout', type=int, default=30000, help='Timeout de navegação (ms)')
+    parser.add_argument('--labels', default='', help='Rótulos separados por vírgula: compara os mercados extraídos')
+    args = parser.parse_args(argv)
+
+    cfg = {}
+    if os.path.exists(args.config):
+        with open(args.config, 'r', encoding='utf-8') as fh:
+            cfg = yaml.safe_load(fh) or {}
+    rpa_scraper.configure(cfg)
+
+    labels = [t.strip() for t in args.labels.split(',') if t.strip()]
+    before = _measure(args.urls, args.repeat, args.timeout, False, labels)
+    after = _measure(args.urls, args.repeat, args.timeout, True, labels)
+    diverged = False
+    for url in args.urls:
+        b, a = before.get(url), after.get(url)
+        print(url)
+        if not b or not a:
+            print("  sem medições válidas nos dois modos")
+            continue
+        print(f"  sem bloqueio: {b['ms']:.0f} ms, {b['bytes'] / 1024:.0f} KB, {b['requests']:.0f} requisições")
+        print(f"  com bloqueio: {a['ms']:.0f} ms, {a['bytes'] / 1024:.0f} KB, {a['requests']:.0f} requisições "
+              f"({a['blocked']:.0f} bloqueadas)")
+        if b['bytes'] and b['ms']:
+            print(f"  economia: {100 * (1 - a['bytes'] / b['bytes']):.0f}% dos bytes, "
+                  f"{100 * (1 - a['ms'] / b['ms']):.0f}% do tempo")
+        if labels:
+            if a['markets'] == b['markets']:
+                print(f"  rótulos: {len(b['markets'] or ())} mercados iguais nos dois modos")
+            else:
+                diverged = True
+                print(f"  rótulos DIVERGENTES: {len(b['markets'] or ())} sem bloqueio, "
+                      f"{len(a['markets'] or ())} com bloqueio (perfil: {rpa_playwright.profile_for(url)})")
+    return 1 if diverged else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
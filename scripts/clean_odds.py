@@ -3,12 +3,16 @@
 Uso:
   python scripts/clean_odds.py --input data/paulistao_odds_new.json \
     --output data/paulistao_odds_clean.json
+  python scripts/clean_odds.py --profile --repeat 50
+
+Com `--profile` mede `sanitize_markets` sobre o arquivo (repetido `--repeat` vezes) e compara
+a extração de `context_text` do `html_parser.fragment_text` com um BeautifulSoup por mercado.
 
 As mensagens e instruções foram traduzidas para Português (pt-BR).
 """
-from rpa_scraper import sanitize_markets
 import os
 import sys
+import copy
 import time
 import json
 import argparse
@@ -16,6 +20,40 @@ import argparse
 # Garante que a raiz do projeto esteja no caminho antes de importar módulos locais
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import html_parser  # noqa: E402
+from rpa_scraper import sanitize_markets  # noqa: E402
+
+
+def profile(src, repeat):
+    """Tempo do sanitize_markets e da derivação de context_text (atual x BeautifulSoup)."""
+    from bs4 import BeautifulSoup
+
+    batches = [m.get('markets', []) for m in src.get('matches', [])]
+    n = sum(len(b) for b in batches) * repeat
+    snippets = [(mk.get('context') or '')[:1000] for b in batches for mk in b] * repeat
+
+    html_parser.fragment_text.cache_clear()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for b in copy.deepcopy(batches):
+            sanitize_markets(b)
+    t_sanitize = time.perf_counter() - t0
+
+    html_parser.fragment_text.cache_clear()
+    t0 = time.perf_counter()
+    fast = [html_parser.fragment_text(s)[:200] for s in snippets]
+    t_fast = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    soup = [BeautifulSoup(s, 'html.parser').get_text(' ', strip=True)[:200] for s in snippets]
+    t_soup = time.perf_counter() - t0
+
+    info = html_parser.fragment_text.cache_info()
+    print(f"Mercados processados: {n} ({repeat}x)")
+    print(f"sanitize_markets: {t_sanitize * 1000:.1f} ms ({t_sanitize * 1e6 / max(n, 1):.1f} µs/mercado)")
+    print(f"context_text com fragment_text: {t_fast * 1000:.1f} ms (cache: {info.hits} acertos, {info.misses} distintos)")
+    print(f"context_text com BeautifulSoup: {t_soup * 1000:.1f} ms ({t_soup / max(t_fast, 1e-9):.0f}x mais lento)")
+    print('Textos idênticos:', sum(a == b for a, b in zip(fast, soup)), 'de', len(snippets))
+
 
 def main(argv=None):
     parser = argparse.ArgumentParser(
@@ -27,7 +65,9 @@ def main(argv=None):
                         default='data/paulistao_odds_clean.json',
                         help='Caminho do arquivo de saída (JSON)')
     parser.add_argument('--profile', action='store_true',
-                        help='Imprime estatísticas rápidas de execução')
+                        help='Imprime estatísticas rápidas de execução e o benchmark do sanitize')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Repetições do benchmark (com --profile)')
     args = parser.parse_args(argv)
 
     with open(args.infile, 'r', encoding='utf-8') as f:
@@ -62,6 +102,7 @@ def main(argv=None):
     if args.profile:
         print('Markets mantidos:', kept, 'Markets removidos:', removed,
               'Tempo (s):', round(time.time() - start, 2))
+        profile(src, max(1, args.repeat))
 
 
 if __name__ == '__main__':
@@ -7,7 +7,8 @@ from datetime import date, timedelta
 import re
 import json
 from ai_eval import evaluate_markets_for_match, _norm_name
-from rpa_scraper import extract_match_urls_from_sofascore_league, get_match_date_from_match_page, parse_match_teams_from_match_page, find_odds_for_match_on_bookmaker, scrape_betano_odds, scrape_superbet_odds, fetch_html
+import fixture_index
+from rpa_scraper import get_match_page, parse_match_teams_from_match_page, find_odds_for_match_on_bookmaker, scrape_betano_odds, scrape_superbet_odds, scrape_candidate_odds, fetch_html, configure
 import yaml
 import os
 import sys
@@ -22,6 +23,7 @@ sys.path.insert(0, os.path.abspath(
 cfg_path = 'config.local.yaml'
 with open(cfg_path, 'r', encoding='utf-8') as fh:
     cfg = yaml.safe_load(fh)
+configure(cfg)
 
 
 def _normalize(s: str) -> str:
@@ -39,14 +41,6 @@ if not league:
     raise SystemExit('Paulistão não configurado em config.local.yaml')
 
 lg_url = league['url']
-print('Discovering matches from', lg_url)
-match_urls = extract_match_urls_from_sofascore_league(lg_url, max_matches=200)
-print('Found', len(match_urls), 'raw match links')
-# filter only football matches (exclude basketball, etc.)
-orig_count = len(match_urls)
-match_urls = [u for u in match_urls if '/football/' in u]
-print('Kept', len(match_urls),
-      'football match links (removed', orig_count - len(match_urls), ')')
 
 # Filter dates: support explicit --dates (comma-separated, ISO or dd.mm.YYYY) or fallback to match_filter.days_ahead
 
@@ -78,17 +72,16 @@ else:
 
 print('Filtering for dates:', sorted(list(allowed)))
 
+# date filter on the local fixture index instead of fetching every match page
+print('Refreshing fixture index for', lg_url)
+idx = fixture_index.get_index(lg_url)
+idx.refresh()
 kept = []
-for mu in match_urls:
-    try:
-        mdate = get_match_date_from_match_page(mu)
-        if not mdate:
-            continue
-        if mdate in allowed:
-            kept.append(mu)
-    except Exception:
-        continue
-print('Kept', len(kept), 'matches after date filter')
+for fx in idx.on_dates(allowed):
+    # seeded pages answer teams/team URLs without another fetch
+    get_match_page(fx['url'], info=fx)
+    kept.append(fx['url'])
+print('Kept', len(kept), 'of', len(idx), 'indexed matches after date filter')
 
 # prepare bookmakers
 bookmakers = [x for x in cfg.get('sites', []) if x.get('type') == 'bookmaker']
@@ -156,9 +149,9 @@ def report_for_match(mu: str):
         for c in cands:
             try:
                 if 'betano' in base:
-                    res = scrape_betano_odds(c)
+                    res = scrape_candidate_odds(c, scrape_betano_odds)
                 elif 'superbet' in base:
-                    res = scrape_superbet_odds(c)
+                    res = scrape_candidate_odds(c, scrape_superbet_odds)
                 else:
                     # generic scraper
                     res = find_odds_for_match_on_bookmaker(
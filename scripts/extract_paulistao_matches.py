@@ -2,7 +2,8 @@
 Usage: python scripts/extract_paulistao_matches.py --dates 11.01.2026,12.01.2026
 """
 import unicodedata
-from rpa_scraper import extract_match_urls_from_sofascore_league, get_match_date_from_match_page
+from rpa_scraper import configure
+import fixture_index
 import os
 import sys
 import json
@@ -18,6 +19,7 @@ sys.path.insert(0, os.path.abspath(
 cfg_path = os.path.join(os.path.dirname(__file__), '..', 'config.local.yaml')
 with open(cfg_path, 'r', encoding='utf-8') as fh:
     cfg = yaml.safe_load(fh)
+configure(cfg)
 
 
 # Get Paulistão league (normalize accents)
@@ -41,6 +43,10 @@ parser.add_argument(
     '--dates', help='Comma-separated dates (YYYY-MM-DD or DD.MM.YYYY)')
 parser.add_argument('--out', help='Output file',
                     default='data/paulistao_matches.json')
+parser.add_argument('--workers', type=int, default=8,
+                    help='Concurrent match page fetches')
+parser.add_argument('--refresh', action='store_true',
+                    help='Refresh the fixture index even if it is recent')
 args = parser.parse_args()
 
 # build allowed set
@@ -64,26 +70,14 @@ else:
 print('Allowed dates:', sorted(list(allowed)))
 
 lg_url = league['url']
-print('Discovering matches from', lg_url)
-match_urls = extract_match_urls_from_sofascore_league(lg_url, max_matches=400)
-print('Found', len(match_urls), 'raw match links')
 
-# Keep only football
-match_urls = [u for u in match_urls if '/football/' in u]
-print('Filtered to', len(match_urls), 'football links')
-
-# collect metadata
-out = []
-for u in match_urls:
-    try:
-        mdate = get_match_date_from_match_page(u)
-    except Exception:
-        mdate = None
-    if not mdate or mdate not in allowed:
-        continue
-    # only keep match URL and date (do not attempt to parse team names)
-    rec = {'url': u, 'date': mdate}
-    out.append(rec)
+# date filter on the local fixture index: only new/changed fixtures touch the network
+idx = fixture_index.get_index(lg_url)
+print('Refreshing fixture index for', lg_url)
+idx.refresh(force=args.refresh, workers=args.workers)
+out = [{'url': fx['url'], 'date': fx['date'], 'home': fx.get('home'), 'away': fx.get('away')}
+       for fx in idx.on_dates(allowed)]
+print('Index has', len(idx), 'fixtures')
 
 print('Kept', len(out), 'matches for dates')
 # ensure output dir
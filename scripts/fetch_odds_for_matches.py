@@ -8,7 +8,7 @@ from time import sleep
 import yaml
 import argparse
 import json
-from rpa_scraper import find_odds_for_match_on_bookmaker, scrape_betano_odds, scrape_superbet_odds
+from rpa_scraper import find_odds_for_match_on_bookmaker, scrape_betano_odds, scrape_superbet_odds, scrape_candidate_odds
 import os
 import sys
 # ensure repo root on path for imports
@@ -46,6 +46,18 @@ cfg_path = os.path.join(os.path.dirname(__file__), '..', 'config.local.yaml')
 with open(cfg_path, 'r', encoding='utf-8') as fh:
     cfg = yaml.safe_load(fh)
 
+from rpa_scraper import configure
+from http_client import set_pool_size
+configure(cfg)
+# one pooled keep-alive connection per worker thread and host
+set_pool_size(args.workers)
+# and one browser per worker, so Playwright renders run in parallel too
+try:
+    from rpa_playwright import set_workers
+    set_workers(args.workers)
+except Exception:
+    pass
+
 bookmakers = [x for x in cfg.get('sites', []) if x.get('type') == 'bookmaker']
 
 out = {'generated_at': __import__(
@@ -80,7 +92,7 @@ def process_one(m):
             if 'betano' in base:
                 for cand in [f"{base.rstrip('/')}/odds/{(home or '').lower().replace(' ', '-')}-{(away or '').lower().replace(' ', '-')}/"]:
                     try:
-                        r = scrape_betano_odds(cand)
+                        r = scrape_candidate_odds(cand, scrape_betano_odds)
                         if r and r.get('markets'):
                             for mk in r['markets']:
                                 mk['bookmaker'] = bm.get('name')
@@ -92,7 +104,7 @@ def process_one(m):
             if 'superbet' in base:
                 for cand in [f"{base.rstrip('/')}/odds/futebol/{(home or '').lower().replace(' ', '-')}-x-{(away or '').lower().replace(' ', '-')}/"]:
                     try:
-                        r = scrape_superbet_odds(cand)
+                        r = scrape_candidate_odds(cand, scrape_superbet_odds)
                         if r and r.get('markets'):
                             for mk in r['markets']:
                                 mk['bookmaker'] = bm.get('name')
@@ -130,6 +142,10 @@ with ThreadPoolExecutor(max_workers=args.workers) as ex:
 
 if args.profile:
     print('Elapsed', time.time() - start)
+    from host_policy import strategy_stats
+    from rpa_scraper import fetch_summary
+    print('Fetch summary', fetch_summary())
+    print('Host strategy', strategy_stats())
 
 os.makedirs(os.path.dirname(args.out), exist_ok=True)
 with open(args.out, 'w', encoding='utf-8') as fh:
@@ -141,5 +157,7 @@ try:
     close_playwright()
 except Exception:
     pass
+from http_client import close_sessions
+close_sessions()
 
 print('\nSaved odds to', args.out)
@@ -15,7 +15,6 @@ import re
 import sys
 from pathlib import Path
 
-import requests
 try:
     import pandas as pd
 except Exception:
@@ -23,19 +22,19 @@ except Exception:
 
 ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / 'data'
+sys.path.insert(0, str(ROOT))
+
+import sofascore_api  # noqa: E402
 
 
 def extract_event_id(sofa_url: str):
-    # try fragment id:15176506
-    m = re.search(r'id:(\d+)', sofa_url)
-    if m:
-        return m.group(1)
-    # else take last path segment if numeric
+    # '#id:15176506' fragment or a numeric last path segment
+    eid = sofascore_api.event_id_from_url(sofa_url)
+    if eid:
+        return eid
     parts = sofa_url.rstrip('/').split('/')
     if parts:
         last = parts[-1]
-        if last.isdigit():
-            return last
         # sometimes slug+id
         m2 = re.search(r'([a-z0-9]+)-?(\d+)$', last)
         if m2:
@@ -44,13 +43,11 @@ def extract_event_id(sofa_url: str):
 
 
 def fetch_event_api(event_id: str, session=None, timeout=10):
-    session = session or requests.Session()
-    url = f'https://api.sofascore.com/api/v1/event/{event_id}'
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (compatible; fetcher/1.0)', 'Accept': 'application/json'}
-    resp = session.get(url, headers=headers, timeout=timeout)
-    resp.raise_for_status()
-    return resp.json()
+    # pooled, rate-limited and cached through the shared client (`session` is kept for compatibility)
+    data = sofascore_api.get_json(f'/event/{event_id}', timeout=timeout)
+    if data is None:
+        raise LookupError(f'event {event_id} not found')
+    return data
 
 
 def normalize_event_json(ev_json):
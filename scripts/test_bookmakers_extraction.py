@@ -1,7 +1,7 @@
 """Quick tester to run Betano & Superbet extraction for existing matches and dump results.
 Usage: python scripts/test_bookmakers_extraction.py --matches data/paulistao_matches.json --out data/paulistao_odds_new.json
 """
-from rpa_scraper import scrape_betano_odds, scrape_superbet_odds, set_fast_mode, set_cache_enabled, clear_cache
+from rpa_scraper import scrape_betano_odds, scrape_superbet_odds, scrape_candidate_odds, set_fast_mode, set_cache_enabled, clear_cache
 import re
 import json
 import argparse
@@ -25,6 +25,9 @@ parser.add_argument('--profile', action='store_true',
                     help='Print timing information')
 args = parser.parse_args()
 
+from http_client import set_pool_size
+set_pool_size(args.workers)
+
 if args.cache:
     set_cache_enabled(True)
 if args.fast:
@@ -66,9 +69,9 @@ def process_match(m):
     for bu in b_urls:
         try:
             if 'betano' in bu:
-                res = scrape_betano_odds(bu)
+                res = scrape_candidate_odds(bu, scrape_betano_odds)
             else:
-                res = scrape_superbet_odds(bu)
+                res = scrape_candidate_odds(bu, scrape_superbet_odds)
             for mk in res.get('markets', []):
                 mk['source_url'] = bu
                 local_markets.append(mk)
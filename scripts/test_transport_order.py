@@ -0,0 +1,66 @@
+"""Checks that only blocks demote the 'requests' transport of a host.
+
+Uso:
+  python scripts/test_transport_order.py
+
+Sem rede: `_request_once` é substituído por falhas simuladas (timeout, conexão
+recusada, 503, 404 e 403) e a ordem de transportes do host é conferida depois de cada uma.
+"""
+import os
+import sys
+
+# Garante que a raiz do projeto esteja no caminho antes de importar módulos locais
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import requests  # noqa: E402
+
+import host_policy  # noqa: E402
+import rpa_scraper  # noqa: E402
+
+
+def _http_error(code):
+    resp = requests.Response()
+    resp.status_code = code
+    return requests.HTTPError(f"{code} error", response=resp)
+
+
+def _fail_with(exc):
+    def once(url, timeout, disk, entry):
+        raise exc
+    return once
+
+
+def check(name, exc, host, successes=0, expect_first='requests'):
+    url = f"https://{host}/pagina"
+    for _ in range(successes):
+        host_policy.record(url, 'requests', True, 0.2)
+    rpa_scraper._request_once = _fail_with(exc)
+    for _ in range(2):
+        try:
+            rpa_scraper.fetch_html(url, use_cache=False)
+        except Exception:
+            pass
+    order = host_policy.transport_order(url)
+    ok = order[0] == expect_first
+    print(f"{'OK ' if ok else 'FALHOU'} {name}: {order}")
+    return ok
+
+
+def main():
+    # no persistence, no waiting between retries, no rendered fallback
+    host_policy.backoff_delay = lambda attempt: 0
+    rpa_scraper.set_match_meta_db(False)
+    results = [
+        check('timeout em host novo', requests.Timeout('read timed out'), 'novo-timeout.test'),
+        check('timeout em host saudável', requests.Timeout('read timed out'), 'saudavel-timeout.test', successes=20),
+        check('conexão recusada', requests.ConnectionError('refused'), 'conexao.test'),
+        check('503 após as retentativas', _http_error(503), 'erro503.test'),
+        check('404 de URL candidata', _http_error(404), 'candidato404.test'),
+        check('403 (bloqueio)', _http_error(403), 'bloqueio403.test', expect_first='playwright'),
+    ]
+    if not all(results):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
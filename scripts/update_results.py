@@ -2,8 +2,9 @@
 
 Uso: python scripts/update_results.py [db_path]
 """
-from rpa_scraper import fetch_html
+from rpa_scraper import get_match_page
 import db
+import sofascore_api
 import sys
 import re
 from typing import Optional
@@ -11,31 +12,6 @@ from typing import Optional
 sys.path.insert(0, '.')
 
 
-def extract_score_from_html(html: str) -> Optional[tuple]:
-    # try to find explicit final/FT markers first
-    patterns = [
-        r"(?:final|full time|ft)[^\d]{0,30}(\d{1,2})\s*[:\-–]\s*(\d{1,2})",
-        r"(\d{1,2})\s*[:\-–]\s*(\d{1,2})\s*(?:final|ft)",
-        r"title\W[^>]{0,200}(\d{1,2})\s*[:\-–]\s*(\d{1,2})",
-    ]
-    for p in patterns:
-        m = re.search(p, html, re.IGNORECASE)
-        if m:
-            try:
-                return int(m.group(1)), int(m.group(2))
-            except Exception:
-                pass
-
-    # fallback: first reasonable score appearance
-    m2 = re.search(r"(\d{1,2})\s*[:\-–]\s*(\d{1,2})", html)
-    if m2:
-        try:
-            return int(m2.group(1)), int(m2.group(2))
-        except Exception:
-            return None
-    return None
-
-
 def evaluate_market_against_score(market: str, home: int, away: int) -> Optional[bool]:
     """Return True if bet WON, False if LOST, None if unknown/unparsable."""
     txt = (market or '').lower()
@@ -112,6 +88,17 @@ def main():
 
     pending = db.get_pending_bets(db_config=db_config)
     print(f"Encontradas {len(pending)} apostas pendentes em {db_config}")
+
+    # final scores for all pending matches in one batched API round (page scraping as fallback)
+    event_ids = {}
+    for b in pending:
+        eid = sofascore_api.event_id_from_url(b.get('match_url') or b.get('match') or '')
+        if eid:
+            event_ids[b['id']] = eid
+    api_scores = {}
+    if event_ids and sofascore_api.preferred():
+        api_scores = sofascore_api.final_scores(event_ids.values())
+
     for b in pending:
         mid = b['id']
         murl = b.get('match_url') or b.get('match')
@@ -119,11 +106,14 @@ def main():
             print(f"[{mid}] sem match_url, pulando")
             continue
         try:
-            html = fetch_html(murl)
+            eid = event_ids.get(mid)
+            if eid in api_scores:
+                sc = api_scores[eid]
+            else:
+                sc = get_match_page(murl).score
         except Exception as e:
             print(f"[{mid}] falha ao buscar {murl}: {e}")
             continue
-        sc = extract_score_from_html(html)
         if not sc:
             print(f"[{mid}] score nao encontrado em {murl}")
             continue
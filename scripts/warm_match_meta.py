@@ -0,0 +1,87 @@
+"""Preenche a tabela `match_meta` (stats_db) para um torneio inteiro.
+
+Uso:
+  python scripts/warm_match_meta.py
+  python scripts/warm_match_meta.py --league "https://www.sofascore.com/pt/torneio/futebol/brazil/paulista-serie-a1/372#id:86993" --workers 8
+
+As partidas vêm do índice local de partidas (API do SofaScore ou página da liga). Partidas
+já completas no índice são gravadas direto; as demais têm a página aberta uma única vez.
+Depois disso data, times e URLs dos times são lidos do banco, sem rede.
+"""
+import os
+import sys
+import time
+import argparse
+
+# Garante que a raiz do projeto esteja no caminho antes de importar módulos locais
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import yaml  # noqa: E402
+
+import fixture_index  # noqa: E402
+import rpa_scraper  # noqa: E402
+import stats_db  # noqa: E402
+
+
+def _complete(fx):
+    return fx.get('url') and fx.get('date') and fx.get('home') and fx.get('away')
+
+
+def warm_league(league_url, workers=8, refresh=False, db_path=None):
+    idx = fixture_index.get_index(league_url)
+    idx.refresh(force=refresh, workers=workers)
+    fixtures = idx.all()
+    ready = []
+    pending = []
+    for fx in fixtures:
+        if _complete(fx):
+            team_urls = {fx[side]: fx[side + '_url'] for side in ('home', 'away') if fx.get(side + '_url')}
+            ready.append({'url': fx['url'], 'event_id': fx.get('id'), 'date': fx['date'], 'home': fx['home'],
+                          'away': fx['away'], 'home_url': fx.get('home_url'), 'away_url': fx.get('away_url'),
+                          'team_urls': team_urls})
+        elif fx.get('url') and not stats_db.get_match_meta(fx['url'], event_id=fx.get('id'), db_path=db_path):
+            pending.append(fx['url'])
+    stored = stats_db.upsert_match_meta_many(ready, db_path=db_path)
+    fetched = 0
+    for url, html in rpa_scraper.fetch_many(pending, concurrency=workers):
+        if not html:
+            continue
+        page = rpa_scraper.MatchPage(url, html=html)
+        if page.meta.get('home') and page.meta.get('date'):
+            fetched += 1
+    return {'fixtures': len(fixtures), 'stored_from_index': stored, 'pages_to_fetch': len(pending),
+            'stored_from_pages': fetched}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Preenche match_meta para um torneio')
+    parser.add_argument('--league', help='URL da liga no SofaScore (padrão: ligas sofascore do config)')
+    parser.add_argument('--config', default='config.local.yaml')
+    parser.add_argument('--db-path', default=None, help='Banco stats_db (padrão: STATS_DB_PATH ou stats.db)')
+    parser.add_argument('--workers', type=int, default=8, help='Páginas buscadas em paralelo')
+    parser.add_argument('--refresh', action='store_true', help='Força a atualização do índice de partidas')
+    args = parser.parse_args(argv)
+
+    cfg = {}
+    if os.path.exists(args.config):
+        with open(args.config, 'r', encoding='utf-8') as fh:
+            cfg = yaml.safe_load(fh) or {}
+    rpa_scraper.configure(cfg)
+    db_path = args.db_path or cfg.get('stats_db_path')
+    if db_path:
+        rpa_scraper.set_match_meta_db(db_path)
+    stats_db.init_db(db_path)
+
+    leagues = [args.league] if args.league else [
+        lg['url'] for lg in cfg.get('leagues', []) if lg.get('source') == 'sofascore' and lg.get('url')]
+    if not leagues:
+        raise SystemExit('Nenhuma liga informada (--league) nem configurada em leagues')
+    for url in leagues:
+        t0 = time.time()
+        print('Aquecendo match_meta para', url)
+        summary = warm_league(url, workers=args.workers, refresh=args.refresh, db_path=db_path)
+        print(f"  {summary} em {time.time() - t0:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,331 @@
+"""Client for SofaScore's public JSON API (api.sofascore.com/api/v1).
+
+The pipeline used to scrape and regex match pages for data the API returns
+directly: tournament fixtures, event details (teams, kickoff, score) and team
+season statistics. Requests go through the same fetch layer as the HTML pages:
+
+- pooled keep-alive sessions (http_client) and the per-host rate limit (host_policy),
+- retries with jittered backoff and the per-host circuit breaker,
+- the in-memory and on-disk caches (transport 'api'; see DEFAULT_TTLS for the TTL),
+- record/replay archives (kind 'api').
+
+Batched calls (`events`, `final_scores`, `round_events`, `team_season_stats_many`)
+run on a bounded thread pool (`set_concurrency` / `sofascore_api.concurrency`).
+Successes and blocks are recorded per host as transport 'api' so `strategy_stats()`
+shows whether the API is usable from this network; callers fall back to the HTML
+scrapers when a call returns None.
+"""
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import requests
+
+import embedded_state
+import host_policy
+import http_cache
+import http_client
+import replay
+
+API_BASE = 'https://api.sofascore.com/api/v1'
+SITE = 'https://www.sofascore.com'
+
+_API_HEADERS = {
+    'Accept': 'application/json',
+    'Referer': SITE + '/',
+    'Origin': SITE,
+}
+
+_enabled = True
+_concurrency = 6
+_json_cache = http_cache.MemoryCache(max_bytes=32 * 1024 * 1024, ttl=600)
+counters = {'calls': 0, 'not_found': 0, 'errors': 0}
+
+
+def set_enabled(val: bool):
+    global _enabled
+    _enabled = bool(val)
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def preferred() -> bool:
+    """Ask the API before scraping pages? True unless disabled or blocked from here.
+
+    Uses the host capability memory: once 'api' calls are blocked (403 or a challenge
+    page instead of JSON) the HTML path wins, with the usual periodic re-probe of the API.
+    Timeouts and 5xx do not count; the circuit breaker handles those.
+    """
+    return _enabled and host_policy.transport_usable(API_BASE, 'api')
+
+
+def set_concurrency(n: int):
+    global _concurrency
+    _concurrency = max(1, int(n))
+
+
+def configure_api(cfg: Optional[Dict[str, Any]]):
+    """Apply a `sofascore_api` config section: {enabled, concurrency}."""
+    if not cfg:
+        return
+    if 'enabled' in cfg:
+        set_enabled(cfg['enabled'])
+    if cfg.get('concurrency'):
+        set_concurrency(cfg['concurrency'])
+
+
+def api_stats() -> Dict[str, Any]:
+    return {**counters, 'enabled': _enabled, 'memory': _json_cache.stats()}
+
+
+def get_json(path: str, timeout: int = 10, use_cache: bool = True) -> Optional[Any]:
+    """GET `API_BASE + path` and decode it; None when the resource does not exist (404).
+
+    Other failures raise (requests exceptions, CircuitOpenError, ReplayMissError).
+    """
+    url = API_BASE + path
+    if replay.replaying():
+        return replay.lookup_json('api', url)
+    if use_cache:
+        cached = _json_cache.get(url)
+        if cached is not None:
+            replay.record('api', url, cached)
+            return json.loads(cached)
+    text = http_cache.single_flight('api', url, lambda: _get_uncached(url, timeout, use_cache))
+    if text is None:
+        return None
+    if use_cache:
+        _json_cache.put(url, text)
+    replay.record('api', url, text)
+    return json.loads(text)
+
+
+def _get_uncached(url: str, timeout: int, use_cache: bool) -> Optional[str]:
+    disk = http_cache.get_disk_cache() if use_cache else None
+    entry = disk.get(url, transport='api') if disk else None
+    if entry and entry['fresh']:
+        return entry['body']
+    try:
+        host_policy.check_circuit(url)
+    except host_policy.CircuitOpenError:
+        if entry:
+            return entry['body']
+        raise
+
+    counters['calls'] += 1
+    start = time.monotonic()
+    attempts = host_policy.retry_attempts()
+    for attempt in range(attempts):
+        try:
+            with host_policy.limit(url):
+                resp = http_client.get(url, headers=_API_HEADERS, timeout=timeout)
+            if resp.status_code == 404:
+                counters['not_found'] += 1
+                host_policy.report_success(url)
+                return None
+            resp.raise_for_status()
+            text = resp.text
+            json.loads(text)  # an HTML challenge page is a failure, not data
+            break
+        except Exception as e:
+            if attempt + 1 < attempts and host_policy.is_retryable(e):
+                host_policy.note_retry(url)
+                time.sleep(host_policy.backoff_delay(attempt))
+                continue
+            counters['errors'] += 1
+            status = getattr(getattr(e, 'response', None), 'status_code', None)
+            if status == 403 or isinstance(e, ValueError):
+                # blocked, or a challenge page instead of JSON: the API does not work from here
+                host_policy.record(url, 'api', False, time.monotonic() - start)
+            if isinstance(e, requests.HTTPError) and not host_policy.is_retryable(e):
+                host_policy.report_success(url)
+            else:
+                host_policy.report_failure(url)
+            raise
+    host_policy.record(url, 'api', True, time.monotonic() - start)
+    host_policy.report_success(url)
+    if disk:
+        disk.put(url, text, transport='api')
+    return text
+
+
+def _try(fn: Callable, *args):
+    try:
+        return fn(*args)
+    except Exception:
+        return None
+
+
+def _map(fn: Callable, items: Iterable) -> List[Any]:
+    """Run `fn` over `items` on the bounded pool; failed items give None (order preserved)."""
+    items = list(items)
+    if len(items) <= 1:
+        return [_try(fn, it) for it in items]
+    if _concurrency > http_client.get_pool_size():
+        http_client.set_pool_size(_concurrency)
+    with ThreadPoolExecutor(max_workers=min(_concurrency, len(items))) as ex:
+        return list(ex.map(lambda it: _try(fn, it), items))
+
+
+# --- ids and URLs -------------------------------------------------------------------------------
+
+def event_id_from_url(url: str) -> Optional[str]:
+    """SofaScore event id from a match URL ('#id:15176506' fragment or a trailing numeric segment)."""
+    m = re.search(r'id:(\d+)', url or '')
+    if m:
+        return m.group(1)
+    last = (url or '').split('#')[0].rstrip('/').split('/')[-1]
+    if last.isdigit():
+        return last
+    return None
+
+
+def tournament_ids_from_url(url: str):
+    """(unique tournament id, season id or None) from a league URL like '.../paulista-serie-a1/372#id:86993'."""
+    path = (url or '').split('#')[0].rstrip('/')
+    ut = path.split('/')[-1]
+    if not ut.isdigit():
+        return None, None
+    m = re.search(r'#id:(\d+)', url)
+    return int(ut), (int(m.group(1)) if m else None)
+
+
+def match_url(event: Dict[str, Any]) -> Optional[str]:
+    """Public match page URL for an API event (same shape as the league page links)."""
+    if not event or event.get('id') is None:
+        return None
+    slug = event.get('slug') or 'match'
+    custom = event.get('customId') or ''
+    return f"{SITE}/football/match/{slug}/{custom}#id:{event['id']}"
+
+
+def fixture(event: Dict[str, Any]) -> Dict[str, Any]:
+    """event_info() plus the match URL and kickoff timestamp."""
+    info = embedded_state.event_info(event)
+    info['url'] = match_url(event)
+    info['start'] = event.get('startTimestamp')
+    return info
+
+
+# --- endpoints ----------------------------------------------------------------------------------
+
+def current_season(unique_tournament_id: int) -> Optional[int]:
+    data = get_json(f'/unique-tournament/{unique_tournament_id}/seasons')
+    seasons = (data or {}).get('seasons') or []
+    return seasons[0].get('id') if seasons else None
+
+
+def rounds(unique_tournament_id: int, season_id: int) -> Dict[str, Any]:
+    """{'current': n, 'rounds': [{'round': 1}, ..., {'round': 29, 'slug': 'quarterfinals'}]} for a season."""
+    data = get_json(f'/unique-tournament/{unique_tournament_id}/season/{season_id}/rounds') or {}
+    return {'current': (data.get('currentRound') or {}).get('round'),
+            'rounds': [{k: r[k] for k in ('round', 'slug') if r.get(k) is not None}
+                       for r in data.get('rounds') or [] if r.get('round') is not None]}
+
+
+def round_events(unique_tournament_id: int, season_id: int, round_list: Iterable) -> List[Dict[str, Any]]:
+    """Events of several rounds (numbers or `rounds()` entries), fetched concurrently."""
+    def one(r):
+        r = r if isinstance(r, dict) else {'round': r}
+        path = f"/unique-tournament/{unique_tournament_id}/season/{season_id}/events/round/{r['round']}"
+        if r.get('slug'):
+            path += f"/slug/{r['slug']}"
+        data = get_json(path)
+        return (data or {}).get('events') or []
+    return [ev for evs in _map(one, round_list) if evs for ev in evs]
+
+
+def season_events(unique_tournament_id: int, season_id: int, direction: str = 'next',
+                  max_pages: int = 5, stop: Callable[[List[dict]], bool] = None) -> List[Dict[str, Any]]:
+    """Paged upcoming ('next') or past ('last') events of a season; `stop(page)` ends paging early."""
+    out: List[Dict[str, Any]] = []
+    for page in range(max_pages):
+        data = get_json(f'/unique-tournament/{unique_tournament_id}/season/{season_id}/events/{direction}/{page}')
+        evs = (data or {}).get('events') or []
+        out.extend(evs)
+        if not evs or not (data or {}).get('hasNextPage') or (stop and stop(evs)):
+            break
+    return out
+
+
+def events_on_dates(unique_tournament_id: int, season_id: Optional[int], dates: Iterable[str]) -> List[Dict[str, Any]]:
+    """Fixtures (see `fixture`) of a season whose local kickoff date is in `dates`, in kickoff order."""
+    dates = set(dates)
+    if not dates:
+        return []
+    if season_id is None:
+        season_id = current_season(unique_tournament_id)
+        if season_id is None:
+            return []
+    last_day = max(dates)
+    today = date.today().isoformat()
+
+    def past_last_day(evs):
+        ts = evs[-1].get('startTimestamp') or 0
+        return datetime.fromtimestamp(ts).date().isoformat() > last_day
+
+    evs = season_events(unique_tournament_id, season_id, 'next', stop=past_last_day)
+    if min(dates) <= today:
+        # today's already finished games are only listed under 'last'
+        evs += season_events(unique_tournament_id, season_id, 'last', max_pages=1)
+    seen = set()
+    out = []
+    for ev in sorted(evs, key=lambda e: e.get('startTimestamp') or 0):
+        fx = fixture(ev)
+        if fx.get('date') in dates and fx['id'] not in seen:
+            seen.add(fx['id'])
+            out.append(fx)
+    return out
+
+
+def event(event_id) -> Optional[Dict[str, Any]]:
+    data = get_json(f'/event/{event_id}')
+    return (data or {}).get('event')
+
+
+def events(event_ids: Iterable) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Event details for many ids, fetched concurrently: {str(id): event or None}."""
+    ids = list(dict.fromkeys(str(i) for i in event_ids if i))
+    return dict(zip(ids, _map(event, ids)))
+
+
+def event_statistics(event_id) -> Optional[Dict[str, Any]]:
+    return get_json(f'/event/{event_id}/statistics')
+
+
+def final_score(event_id):
+    """(home_goals, away_goals) once the event is finished, else None."""
+    info = embedded_state.event_info(event(event_id))
+    if info.get('status') == 'finished':
+        return info.get('score')
+    return None
+
+
+def final_scores(event_ids: Iterable) -> Dict[str, Optional[tuple]]:
+    """Final scores for many events: {str(id): (home, away), or None while not finished}.
+
+    Events the API could not return are left out, so callers can fall back to the page.
+    """
+    out = {}
+    for eid, ev in events(event_ids).items():
+        if ev is None:
+            continue
+        info = embedded_state.event_info(ev)
+        out[eid] = info.get('score') if info.get('status') == 'finished' else None
+    return out
+
+
+def team_season_stats(team_id, unique_tournament_id, season_id) -> Dict[str, float]:
+    """Per-game averages (goals/corners/shots/fouls) of a team in a tournament season."""
+    data = get_json(f'/team/{team_id}/unique-tournament/{unique_tournament_id}/season/{season_id}/statistics/overall')
+    return embedded_state.team_stats(data or {})
+
+
+def team_season_stats_many(team_ids: Iterable, unique_tournament_id, season_id) -> Dict[str, Dict[str, float]]:
+    ids = list(dict.fromkeys(str(t) for t in team_ids if t))
+    return dict(zip(ids, _map(lambda t: team_season_stats(t, unique_tournament_id, season_id), ids)))
@@ -1,6 +1,7 @@
 import sqlite3
 import json
 import os
+import re
 from datetime import datetime
 
 
@@ -66,87 +67,166 @@ def init_db(db_path=None):
     )
     """
     )
+    _create_match_meta(cur)
     conn.commit()
     return conn
 
 
-def save_raw(source, filename, data, db_path=None):
-    conn = get_conn(db_path)
-    cur = conn.cursor()
+def _create_match_meta(cur):
+    # event_id '' = not known yet; SofaScore reuses one URL for every game of the same two teams
+    cols = {r[1]: r[5] for r in cur.execute("PRAGMA table_info(match_meta)").fetchall()}
+    if cols.get('url') == 1:
+        # older tables were keyed by url alone: rebuild them keyed by (event_id, url)
+        cur.execute("ALTER TABLE match_meta RENAME TO match_meta_old")
+        cur.execute("DROP INDEX IF EXISTS idx_match_meta_event")
     cur.execute(
-        "INSERT INTO raw_data (source, filename, loaded_at, data) VALUES (?, ?, ?, ?)",
-        (source, filename, datetime.utcnow().isoformat(),
-         json.dumps(data, ensure_ascii=False)),
+        """
+    CREATE TABLE IF NOT EXISTS match_meta (
+        url TEXT NOT NULL,
+        event_id TEXT NOT NULL DEFAULT '',
+        date TEXT,
+        home TEXT,
+        away TEXT,
+        home_url TEXT,
+        away_url TEXT,
+        team_urls TEXT,
+        slug_home TEXT,
+        slug_away TEXT,
+        updated_at TEXT,
+        UNIQUE(event_id, url)
     )
-    conn.commit()
-
-
-def save_match(match_dict, db_path=None):
-    conn = get_conn(db_path)
-    cur = conn.cursor()
-    src = match_dict.get('url') or match_dict.get('source_url')
-    date = match_dict.get('date')
-    home = match_dict.get('home')
-    away = match_dict.get('away')
-    home_goals = match_dict.get('home_goals')
-    away_goals = match_dict.get('away_goals')
-    raw = json.dumps(match_dict, ensure_ascii=False)
-    try:
+    """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_match_meta_url ON match_meta (url)")
+    if cols.get('url') == 1:
         cur.execute(
-            "INSERT OR IGNORE INTO matches (source_url, date, home, away, home_goals, away_goals, raw) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (src, date, home, away, home_goals, away_goals, raw),
+            "INSERT OR IGNORE INTO match_meta SELECT url, COALESCE(event_id, ''), date, home, away, home_url, "
+            "away_url, team_urls, slug_home, slug_away, updated_at FROM match_meta_old"
         )
-        conn.commit()
-    finally:
-        cur.close()
+        cur.execute("DROP TABLE match_meta_old")
 
 
-def list_raw(limit=20, db_path=None):
-    conn = get_conn(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT id, source, filename, loaded_at FROM raw_data ORDER BY id DESC LIMIT ?", (limit,))
-    return [dict(r) for r in cur.fetchall()]
+# --- match metadata (stable per match: teams, date, team URLs) -------------------------
 
+_meta_ready = set()
 
-def get_matches(db_path=None):
+
+def _meta_conn(db_path=None):
     conn = get_conn(db_path)
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM matches ORDER BY date DESC")
-    return [dict(r) for r in cur.fetchall()]
+    key = db_path or os.environ.get('STATS_DB_PATH', 'stats.db')
+    if key not in _meta_ready:
+        _create_match_meta(conn.cursor())
+        conn.commit()
+        _meta_ready.add(key)
+    return conn
 
 
-def get_team_stats(team, season=None, db_path=None):
-    conn = get_conn(db_path)
-    cur = conn.cursor()
-    if season:
-        cur.execute(
-            "SELECT * FROM team_stats WHERE team = ? AND season = ?", (team, season))
-    else:
-        cur.execute(
-            "SELECT * FROM team_stats WHERE team = ? ORDER BY season DESC LIMIT 1", (team,))
-    row = cur.fetchone()
-    return dict(row) if row else None
+def match_key(url):
+    """Canonical match URL: no fragment/query, no language prefix, lowercase host."""
+    if not url:
+        return url
+    path = url.split('#')[0].split('?')[0].rstrip('/')
+    m = re.match(r'^(?:https?://)?([^/]+)(/.*)?$', path)
+    if not m:
+        return path
+    host, rest = m.group(1).lower(), m.group(2) or ''
+    rest = re.sub(r'^/[a-z]{2}(?:-[a-z]{2})?(?=/football/)', '', rest)
+    return f"https://{host}{rest}"
 
 
-def upsert_team_stats(team, season, stats_dict, db_path=None):
-    conn = get_conn(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO team_stats (team, season, matches_played, wins, draws, losses, goals_for, goals_against, raw) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(team, season) DO UPDATE SET matches_played=excluded.matches_played, wins=excluded.wins, draws=excluded.draws, losses=excluded.losses, goals_for=excluded.goals_for, goals_against=excluded.goals_against, raw=excluded.raw",
-        (
-            team,
-            season,
-            stats_dict.get('matches_played', 0),
-            stats_dict.get('wins', 0),
-            stats_dict.get('draws', 0),
-            stats_dict.get('losses', 0),
-            stats_dict.get('goals_for', 0),
-            stats_dict.get('goals_against', 0),
-            json.dumps(stats_dict, ensure_ascii=False),
-        ),
+def _slugify(name):
+    import unicodedata
+    t = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode('ascii').lower()
+    return re.sub(r'[^a-z0-9]+', '-', t).strip('-')
+
+
+def slug_teams(url, home=None, away=None):
+    """(home, away) guessed from a '/match/<home>-<away>/' slug.
+
+    A team name that is already known is cut out of the slug so the other one is exact;
+    otherwise the slug is split in two halves on '-'.
+    """
+    try:
+        slug = url.split('/match/')[1].split('/')[0].lower()
+    except (AttributeError, IndexError):
+        return None, None
+    for known, at_end in ((away, True), (home, False)):
+        ks = _slugify(known)
+        if ks and slug != ks:
+            if at_end and slug.endswith('-' + ks):
+                return slug[:-len(ks) - 1].replace('-', ' ').title(), known
+            if not at_end and slug.startswith(ks + '-'):
+                return known, slug[len(ks) + 1:].replace('-', ' ').title()
+    parts = [p for p in slug.split('-') if p]
+    if len(parts) < 2:
+        return None, None
+    split = max(1, len(parts) // 2)
+    return (' '.join(parts[:split]).title(), ' '.join(parts[split:]).title())
+
+
+def get_match_meta(url=None, event_id=None, db_path=None):
+    """Stored metadata for a match by event id or URL (any language/fragment spelling), or None.
+
+    With an `event_id` only that event's row is used. SofaScore shares one URL between every
+    game of the same two teams, so a URL lookup is used only when no event id is known, and
+    only when it is not ambiguous.
+    """
+    conn = _meta_conn(db_path)
+    row = None
+    if event_id:
+        row = conn.execute("SELECT * FROM match_meta WHERE event_id = ?", (str(event_id),)).fetchone()
+    elif url:
+        rows = conn.execute("SELECT * FROM match_meta WHERE url = ? ORDER BY event_id != '' LIMIT 2",
+                            (match_key(url),)).fetchall()
+        if rows and (len(rows) == 1 or rows[0]['event_id'] == ''):
+            row = rows[0]
+    conn.close()
+    if row is None:
+        return None
+    meta = dict(row)
+    meta['event_id'] = meta['event_id'] or None
+    meta['team_urls'] = json.loads(meta['team_urls']) if meta.get('team_urls') else {}
+    return meta
+
+
+def upsert_match_meta(meta, db_path=None):
+    """Insert or update one match (keys: url, event_id, date, home, away, home_url, away_url, team_urls)."""
+    upsert_match_meta_many([meta], db_path=db_path)
+
+
+def upsert_match_meta_many(metas, db_path=None):
+    rows = []
+    now = datetime.utcnow().isoformat()
+    for m in metas:
+        url = match_key(m.get('url'))
+        if not url:
+            continue
+        slug_home, slug_away = slug_teams(url)
+        rows.append((url, str(m['event_id']) if m.get('event_id') else '', m.get('date'),
+                     m.get('home'), m.get('away'), m.get('home_url'), m.get('away_url'),
+                     json.dumps(m.get('team_urls') or {}, ensure_ascii=False), slug_home, slug_away, now))
+    if not rows:
+        return 0
+    conn = _meta_conn(db_path)
+    # a row stored before its event id was known becomes that event's row
+    conn.executemany(
+        "UPDATE OR IGNORE match_meta SET event_id = ? WHERE url = ? AND event_id = ''",
+        [(r[1], r[0]) for r in rows if r[1]],
+    )
+    # known values are never overwritten by missing ones
+    conn.executemany(
+        "INSERT INTO match_meta (url, event_id, date, home, away, home_url, away_url, team_urls, slug_home, slug_away, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(event_id, url) DO UPDATE SET "
+        "date=COALESCE(excluded.date, date), "
+        "home=COALESCE(excluded.home, home), away=COALESCE(excluded.away, away), "
+        "home_url=COALESCE(excluded.home_url, home_url), away_url=COALESCE(excluded.away_url, away_url), "
+        "team_urls=CASE WHEN excluded.team_urls = '{}' THEN team_urls ELSE excluded.team_urls END, "
+        "updated_at=excluded.updated_at",
+        rows,
     )
     conn.commit()
+    conn.close()
+    return len(rows)
 
 
 if __name__ == '__main__':